@@ -1,4 +1,8 @@
 from datetime import datetime, timedelta
+import pandas as pd
+
+import perf
+from facts import build_task_facts
 
 def get_weather_date(data):
     avg_temp_dict = {}
@@ -17,6 +21,7 @@ def get_weather_date(data):
     return avg_temp_dict, avg_humidity_dict
 
 
+@perf.timed("analysis.get_missing_dates")
 def get_missing_dates(data, start_date, end_date):
     present_dates = set(entry.get("date") for entry in data if entry.get("date"))
 
@@ -29,64 +34,176 @@ def get_missing_dates(data, start_date, end_date):
         current_date += timedelta(days=1)
     return missing_dates
 
-def get_worker_progress(data, workers):
+@perf.timed("analysis.get_worker_progress")
+def get_worker_progress(data, workers=None):
     """
     Given the data (list of dicts, each with 'date' and 'df' as list of worker dicts),
-    and a list of worker names, returns a dict:
+    and optionally a list of worker names, returns a dict:
     {worker_name: [ {date, Arrived, Num Tasks, Work Period, Sections, Work Type, Amount (kg), Advanced Payment, Payment}, ... ]}
+    Every row of a worker is kept, so duplicate rows on one day are not dropped.
+    Without workers, every worker found in the data is included, sorted by name.
     """
-    progress = {w: [] for w in workers}
+    progress = {w: [] for w in workers} if workers is not None else {}
+    # Single pass over the day rows, bucketed by worker name
     for day in data:
         date_str = day.get('date')
-        df = day.get('df', [])
-        for w in workers:
-            # Find this worker's record for the day
-            rec = next((row for row in df if row.get('Worker Name') == w), None)
-            if rec:
-                progress[w].append({
-                    'date': date_str,
-                    'Arrived': rec.get('Arrived'),
-                    'Num Tasks': rec.get('Num Tasks'),
-                    'Work Period': rec.get('Work Period'),
-                    'Sections': rec.get('Sections'),
-                    'Work Type': rec.get('Work Type'),
-                    'Amount (kg)': rec.get('Amount (kg)'),
-                    'Advanced Payment': rec.get('Advanced Payment'),
-                    'Payment': rec.get('Payment'),
-                })
-            else:
-                # If no record for this worker on this day, can append None or skip
-                pass
-    return progress
+        for rec in day.get('df', []):
+            name = rec.get('Worker Name')
+            records = progress.get(name)
+            if records is None:
+                if workers is not None or not name:
+                    continue
+                records = progress[name] = []
+            records.append({
+                'date': date_str,
+                'Arrived': rec.get('Arrived'),
+                'Num Tasks': rec.get('Num Tasks'),
+                'Work Period': rec.get('Work Period'),
+                'Sections': rec.get('Sections'),
+                'Work Type': rec.get('Work Type'),
+                'Amount (kg)': rec.get('Amount (kg)'),
+                'Advanced Payment': rec.get('Advanced Payment'),
+                'Payment': rec.get('Payment'),
+            })
+    return progress if workers is not None else dict(sorted(progress.items()))
+
+@perf.timed("analysis.get_worker_summary")
+def get_worker_summary(tasks):
+    """
+    Per-worker aggregates from the task fact table (facts.build_task_facts):
+    total plucked kg, days attended, average kg per plucking day and total pay.
+    """
+    columns = ['Total kg', 'Days Attended', 'Plucking Days', 'Avg kg / Plucking Day', 'Total Pay']
+    if tasks.empty:
+        return pd.DataFrame(columns=columns)
+    plucking = tasks[tasks['work_type'] == 'Tea_Plucking']
+    by_worker = tasks.groupby('worker', observed=True)
+    summary = pd.DataFrame({
+        'Total kg': plucking.groupby('worker', observed=True)['kg'].sum(),
+        'Days Attended': by_worker['date'].nunique(),
+        'Plucking Days': plucking.groupby('worker', observed=True)['date'].nunique(),
+        # Sum of the rounded day payments, so totals match the Payment column and Pay Summary
+        'Total Pay': by_worker['day_payment'].sum(),
+    })
+    summary['Total kg'] = summary['Total kg'].fillna(0)
+    summary['Plucking Days'] = summary['Plucking Days'].fillna(0).astype(int)
+    summary['Avg kg / Plucking Day'] = (summary['Total kg'] / summary['Plucking Days'].where(summary['Plucking Days'] > 0)).round(1)
+    return summary[columns]
 
-def get_section_progress(data, sections):
+@perf.timed("analysis.get_section_progress")
+def get_section_progress(data, sections, tasks=None):
     """
     For each section, returns a list of dicts with date, work_type, amount, and worker_name for all workers and all days.
     {section: [ {date, work_type, amount, worker_name}, ... ] }
+    Pass the task fact table as tasks to reuse an already exploded range.
     """
+    if tasks is None:
+        tasks = build_task_facts(data)
     progress = {s: [] for s in sections}
-    for day in data:
-        date_str = day.get('date')
-        df = day.get('df', [])
-        for row in df:
-            # Sections and Work Type may be comma-separated lists (for multi-task days)
-            worker = row.get('Worker Name')
-            sections_str = row.get('Sections', '')
-            work_types_str = row.get('Work Type', '')
-            amounts_str = row.get('Amount (kg)', '')
-            if not sections_str:
-                continue
-            section_list = [s.strip() for s in sections_str.split(',')]
-            work_type_list = [w.strip() for w in work_types_str.split(',')] if work_types_str else ['']*len(section_list)
-            amount_list = [a.strip() for a in amounts_str.split(',')] if amounts_str else ['']*len(section_list)
-            for i, section in enumerate(section_list):
-                if section in progress:
-                    progress[section].append({
-                        'date': date_str,
-                        'work_type': work_type_list[i] if i < len(work_type_list) else '',
-                        'amount': amount_list[i] if i < len(amount_list) else '',
-                        'worker_name': worker
-                    })
+    in_sections = tasks[tasks['section'].isin(sections)]
+    records = pd.DataFrame({
+        'section': in_sections['section'].astype(str),
+        'date': in_sections['date'].dt.strftime('%Y-%m-%d'),
+        'work_type': in_sections['work_type'].astype(object).fillna(''),
+        'amount': in_sections['kg'],
+        'worker_name': in_sections['worker'].astype(str),
+    })
+    for section, group in records.groupby('section', sort=False):
+        progress[section] = group.drop(columns='section').to_dict('records')
     return progress
 
+# Work types tracked for "days since last ..." per section
+SECTION_WORK_TYPES = ['Tea_Plucking', 'Fertilizing', 'Tea_Pruning', 'Weeding']
+
+@perf.timed("analysis.build_section_cube")
+def build_section_cube(tasks):
+    """
+    Section x date x work_type aggregate of the task fact table with total kg and
+    the number of workers, plus 'day_workers', the distinct workers in the section that
+    day over all work types (repeated on each work type of the day).
+    Sorted by section, so cube.loc[section] is a cheap lookup.
+    """
+    with_section = tasks.dropna(subset=['section', 'work_type'])
+    cube = with_section.groupby(['section', 'date', 'work_type'], observed=True).agg(
+        kg=('kg', 'sum'),
+        workers=('worker', 'nunique'),
+    )
+    day_workers = with_section.groupby(['section', 'date'], observed=True)['worker'].nunique().rename('day_workers')
+    return cube.join(day_workers).sort_index()
+
+def get_cube_sections(cube, known=()):
+    """
+    The known sections in their order, followed by any other section worked in the
+    cube (sorted), so sections new to the data show up without a config change.
+    """
+    found = cube.index.get_level_values('section').unique() if not cube.empty else []
+    known = list(known)
+    return known + sorted(set(map(str, found)) - set(known))
+
+@perf.timed("analysis.get_section_status")
+def get_section_status(cube, sections, as_of=None):
+    """
+    One row per section with plucked tea kg, worker-days and the number of days since the
+    last plucking, fertilizing, pruning and weeding (NaN if never seen in the cube).
+    """
+    as_of = pd.Timestamp(as_of if as_of is not None else datetime.today().date())
+    status = pd.DataFrame(index=pd.Index(sections, name='section'))
+    if cube.empty:
+        status['Tea kg'] = 0.0
+        status['Worker Days'] = 0
+    else:
+        flat = cube.reset_index()
+        flat['section'] = flat['section'].astype(str)
+        flat['work_type'] = flat['work_type'].astype(str)
+        tea_kg = flat[flat['work_type'] == 'Tea_Plucking'].groupby('section')['kg'].sum()
+        # A worker doing two jobs in a section on one day is still one worker-day
+        worker_days = flat.drop_duplicates(['section', 'date']).groupby('section')['day_workers'].sum()
+        status['Tea kg'] = tea_kg.reindex(status.index).fillna(0)
+        status['Worker Days'] = worker_days.reindex(status.index).fillna(0).astype(int)
+        last_done = flat.groupby(['section', 'work_type'])['date'].max().unstack('work_type')
+    for work_type in SECTION_WORK_TYPES:
+        if cube.empty or work_type not in last_done:
+            status[f'Days Since {work_type}'] = float('nan')
+        else:
+            status[f'Days Since {work_type}'] = (as_of - last_done[work_type].reindex(status.index)).dt.days
+    return status
+
+# Heatmap metrics on the Map page, with whether a higher value is better
+SECTION_MAP_METRICS = {
+    'Tea kg': True,
+    'Plucking Rounds': True,
+    'Days Since Tea_Plucking': False,
+    'Days Since Fertilizing': False,
+    'Days Since Weeding': False,
+}
+
+def section_map_id(section):
+    """Element id of a section on the estate SVG map ('1A -1' -> '_1A-1')."""
+    return '_' + section.replace(' ', '')
+
+@perf.timed("analysis.get_section_map_metrics")
+def get_section_map_metrics(cube, sections, as_of=None):
+    """
+    Compact per-section metrics for the map heatmap, computed from the section cube:
+    {'metrics': [names], 'higher_is_better': [bools], 'values': {svg id: [values]}},
+    with null where a section has no data. Plucking rounds count distinct plucking days.
+    """
+    status = get_section_status(cube, sections, as_of=as_of)
+    if cube.empty:
+        status['Plucking Rounds'] = 0
+    else:
+        flat = cube.reset_index()
+        plucking = flat[flat['work_type'].astype(str) == 'Tea_Plucking']
+        rounds = plucking.groupby(plucking['section'].astype(str))['date'].nunique()
+        status['Plucking Rounds'] = rounds.reindex(status.index).fillna(0).astype(int)
 
+    table = status[list(SECTION_MAP_METRICS)].round(1)
+    values = {
+        section_map_id(section): [None if pd.isna(v) else (int(v) if float(v).is_integer() else v) for v in row]
+        for section, row in zip(table.index, table.values.tolist())
+    }
+    return {
+        'metrics': list(SECTION_MAP_METRICS),
+        'higher_is_better': list(SECTION_MAP_METRICS.values()),
+        'values': values,
+    }
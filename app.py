@@ -1,24 +1,17 @@
 import streamlit as st
-import pandas as pd
-from datetime import date
+from datetime import date, timedelta
 import json
-from funcs import get_weather, write_to_gsheet, read_from_gsheet, read_info_from_gsheet
-from analysis import get_missing_dates, get_weather_date, get_worker_progress, get_section_progress
+import perf
+from config import get_config
+# pandas, the Sheets client, weather and the exporters are imported by the pages that
+# use them, so a cold start renders the login page without loading any of them
 
 # Streamlit page config
 st.set_page_config(page_title="Tea Estate Daily Report", layout="wide")
 
 users = st.secrets["users"]
-
-workers = [
-    "M1 - Kokila", "M2 - Sunil", "M3 - Nimal - Podi", "M4 - Nimal - Loku", "M6 - Sarath",
-    "M7 - Sirinayaka", "F1 - Seetha", "F3 - Soma", "F4 - Sawrna", "F6 - Nilanthi",
-    "F8 - Lakmali", "F11 - Samathi Udapotha", "F20 - Surangi", "F24 - Anusha",
-    "F23 - Deepa Kumari", "F26 - Dilshani", "F27 - Irosha",
-]
-sections = ["1A -1", "1A -2", "1A -3", "1B-1", "1B-2", "1B-3", "1B-4", "1C-1", "1C-2", "1C-3", "1D", "2A-1", "2B", "2C-1", "2C-2", "2C-3", "3A-1", "3A-2", "3B-1", "3B-2", "3B-3", "4"]
-work_periods = ["7.30-1.30", "7.30-10.30", "7.30-4.30"]
-work_types = ["Tea_Plucking", "Fertilizing", "Tea_Pruning", "Weeding"]
+# Usernames that see the performance panel
+admins = st.secrets.get("admins", [])
 
 
 # --- Session State Initialization ---
@@ -26,20 +19,6 @@ if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 if "username" not in st.session_state:
     st.session_state.username = ""
-if "all_worker_data" not in st.session_state:
-    st.session_state.all_worker_data = [
-        {
-            "Worker Name": worker,
-            "Arrived": False,
-            "Num Tasks": 0, 
-            "Work Period": None,
-            "Sections": None,
-            "Work Type": None,
-            "Amount (kg)": None,
-            "Advanced Payment": 0,
-        }
-        for worker in workers
-    ]
 if "transport_arrived_login_state" not in st.session_state:
     st.session_state.transport_arrived_login_state = False
 if "transport_arrived_logout_state" not in st.session_state:
@@ -114,16 +93,270 @@ def nav_buttons():
             logout()
 
 
+# --- WEATHER PANEL ---
+def weather_panel(target_date, polling):
+    from funcs import prefetch_weather, weather_pending
+
+    # While polling this also starts a failed lookup's retry once its backoff is over
+    weather_future = prefetch_weather(target_date, 6, 18)
+    if not weather_future.done():
+        st.subheader("🌦️ Weather")
+        st.info("⏳ Fetching weather data...")
+        return
+    if polling and not weather_pending(target_date, 6, 18):
+        # Settled (success or out of retries): one full rerun renders it and stops the polling
+        st.rerun()
+    w_start, w_end, w_word_range, w_temp_range, w_humidi_range, w_temp_24, w_humidi_24 = weather_future.result()
+    st.session_state.weather = [w_start, w_end, w_word_range, w_temp_range, w_humidi_range, w_temp_24, w_humidi_24]
+
+    st.subheader(f"🌦️ {w_start}.am to {w_end}.pm weather")
+    if w_temp_range is not None:
+        st.info(f"**Weather:** {w_word_range} | **Avg Temp:** {w_temp_range}°C | **Avg Humidity:** {w_humidi_range}%")
+    else:
+        st.warning(w_word_range)
+        if polling:
+            st.caption("🔁 Retrying in the background...")
+
+
+# --- WORKER CARD ---
+@st.fragment
+def worker_card(i):
+    """One worker's entry form. As a fragment, editing it only reruns this card."""
+    config = get_config()
+    work_periods, sections, work_types = config.work_periods, config.sections, config.work_types
+    w_data = st.session_state.all_worker_data[i]
+    worker = w_data["Worker Name"]
+    with st.expander(f"👷 {worker}"):
+        arrived = st.checkbox("Worker Arrived?", key=f"arrived_{worker}", value=w_data.get("Arrived", False))
+        st.session_state.all_worker_data[i]["Arrived"] = arrived
+
+        if arrived:
+            work_period = st.selectbox(
+                "Work Period",
+                work_periods,
+                index=work_periods.index(w_data.get("Work Period", work_periods[0])) if w_data.get("Work Period") in work_periods else 0,
+                key=f"period_{worker}"
+            )
+            st.session_state.all_worker_data[i]["Work Period"] = work_period
+
+            adv_payment = st.number_input(
+                "Advanced Payment (Rs)",
+                min_value=0,
+                step=1,
+                format="%d",
+                key=f"adv_payment_{worker}",
+                value=w_data.get("Advanced Payment", 0)
+            )
+            st.session_state.all_worker_data[i]["Advanced Payment"] = adv_payment
+
+            # Table mode takes any number of tasks; the card keeps room for those it was given
+            max_tasks = max(3, int(w_data.get("Num Tasks") or 0))
+            num_tasks = st.number_input("Number of Tasks", min_value=0, max_value=max_tasks, value=w_data.get("Num Tasks", 1), key=f"num_tasks_{worker}")
+            st.session_state.all_worker_data[i]["Num Tasks"] = num_tasks
+
+            # Default values if not present
+            sections_list = w_data.get("Sections", "").split(", ") if w_data.get("Sections") else []
+            work_types_list = w_data.get("Work Type", "").split(", ") if w_data.get("Work Type") else []
+            amount_list = w_data.get("Amount (kg)", "").split(", ") if w_data.get("Amount (kg)") else []
+
+            sections_result = []
+            work_types_result = []
+            amounts_result = []
+
+            if num_tasks > 0:
+                cols = st.columns(num_tasks)
+                for task_id in range(num_tasks):
+                    with cols[task_id]:
+                        st.markdown(f"**Task {task_id + 1}**")
+
+                        section_default = sections_list[task_id] if task_id < len(sections_list) else sections[0]
+                        section = st.selectbox(
+                            f"Section {task_id + 1}",
+                            sections,
+                            index=sections.index(section_default) if section_default in sections else 0,
+                            key=f"section_{worker}_{task_id}"
+                        )
+
+                        work_type_default = work_types_list[task_id] if task_id < len(work_types_list) else work_types[0]
+                        work_type = st.selectbox(
+                            f"Work Type {task_id + 1}",
+                            work_types,
+                            index=work_types.index(work_type_default) if work_type_default in work_types else 0,
+                            key=f"type_{worker}_{task_id}"
+                        )
+
+                        if work_type == "Tea_Plucking":
+                            default_amt = int(amount_list[task_id]) if task_id < len(amount_list) else 0
+                            amount = st.number_input(f"Tea (kg)", min_value=0, step=1, format="%d", value=default_amt, key=f"amount_{worker}_tea_{task_id}")
+                        elif work_type == "Fertilizing":
+                            default_amt = int(amount_list[task_id]) if task_id < len(amount_list) else 0
+                            amount = st.number_input(f"Fertilizer (kg)", min_value=0, step=1, format="%d", value=default_amt, key=f"amount_{worker}_fert_{task_id}")
+                        else:
+                            st.info("No quantity needed for Weeding or Tea_Pruning.")
+                            amount = 0
+
+                        sections_result.append(section)
+                        work_types_result.append(work_type)
+                        amounts_result.append(str(amount))
+
+            # Save updated flattened format
+            st.session_state.all_worker_data[i]["Sections"] = ", ".join(sections_result)
+            st.session_state.all_worker_data[i]["Work Type"] = ", ".join(work_types_result)
+            st.session_state.all_worker_data[i]["Amount (kg)"] = ", ".join(amounts_result)
+
+        else:
+            st.session_state.all_worker_data[i]["Work Period"] = ""
+            st.session_state.all_worker_data[i]["Advanced Payment"] = 0
+            st.session_state.all_worker_data[i]["Sections"] = ""
+            st.session_state.all_worker_data[i]["Work Type"] = ""
+            st.session_state.all_worker_data[i]["Amount (kg)"] = ""
+            st.session_state.all_worker_data[i]["Num Tasks"] = 0
+
+
+# --- BULK ENTRY TABLE ---
+def bulk_entry_table():
+    """One grid row per worker-task. Edits stay local until the form is applied in one batch."""
+    import pandas as pd
+    from funcs import TASK_ROW_COLUMNS, worker_data_to_task_rows, task_rows_to_worker_data
+
+    config = get_config()
+    worker_names = [d["Worker Name"] for d in st.session_state.all_worker_data]
+    task_rows = pd.DataFrame(worker_data_to_task_rows(st.session_state.all_worker_data), columns=TASK_ROW_COLUMNS)
+    with st.form("bulk_entry_form"):
+        st.caption("Add a row with the same worker name for each extra task.")
+        edited_rows = st.data_editor(
+            task_rows,
+            column_config={
+                "Worker Name": st.column_config.SelectboxColumn("Worker Name", options=worker_names, required=True),
+                "Arrived": st.column_config.CheckboxColumn("Arrived", default=False),
+                "Work Period": st.column_config.SelectboxColumn("Work Period", options=config.work_periods),
+                "Section": st.column_config.SelectboxColumn("Section", options=config.sections),
+                "Work Type": st.column_config.SelectboxColumn("Work Type", options=config.work_types),
+                "Amount (kg)": st.column_config.NumberColumn("Amount (kg)", min_value=0, step=1, format="%d", default=0),
+                "Advanced Payment": st.column_config.NumberColumn("Advance (Rs)", min_value=0, step=1, format="%d", default=0),
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            key="bulk_entry_editor",
+        )
+        if st.form_submit_button("✔️ Apply Table"):
+            st.session_state.all_worker_data = task_rows_to_worker_data(edited_rows, worker_names)
+            st.success("✅ Table applied.")
+
+
+# --- SUBMISSION QUEUE PANEL ---
+def submission_queue_panel():
+    import pandas as pd
+    from store import write_day
+    from submit_queue import flush_pending, list_submissions
+
+    queued = list_submissions()
+    failed = [entry for entry in queued if entry["status"] == "failed"]
+    with st.expander(f"📤 Submission Queue ({len(queued)} waiting)", expanded=bool(failed)):
+        if not queued:
+            st.success("✅ All submissions have been uploaded.")
+            return
+        queue_df = pd.DataFrame(queued)
+        queue_df["updated_at"] = pd.to_datetime(queue_df["updated_at"], unit="s")
+        st.dataframe(
+            queue_df[["sheet_name", "status", "attempts", "last_error", "updated_at"]],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if st.button("🔁 Retry Now"):
+            with st.spinner("Uploading queued submissions..."):
+                flush_pending(write_day, attempts=1)
+            st.rerun()
+
+
+# --- PAGED TABLES ---
+@st.fragment
+def paged_tables(names, get_table, key, page_size=5):
+    """
+    One dataframe per name, page_size names at a time. Tables are only built for the
+    page shown, and as a fragment, paging only reruns this block.
+    """
+    pages = max(1, -(-len(names) // page_size))
+    page_no = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=key) if pages > 1 else 1
+    for name in names[(page_no - 1) * page_size:page_no * page_size]:
+        st.write(f"#### {name}")
+        table = get_table(name)
+        if table is not None and not table.empty:
+            st.dataframe(table)
+        else:
+            st.warning("No data available.")
+
+
+# --- PERFORMANCE PANEL ---
+def perf_panel(run):
+    """Admin-only breakdown of where a render's time went, with earlier renders of this session."""
+    import pandas as pd
+
+    runs = st.session_state.setdefault("perf_runs", [])
+    runs.append(run)
+    del runs[:-perf.MAX_RUNS]
+    with st.expander(f"⏱️ Performance: {run.label} rendered in {run.seconds * 1000:.0f} ms"):
+        rows = run.rows()
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        else:
+            st.info("Nothing was recorded for this render.")
+        st.write("#### Earlier renders")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "page": r.label,
+                    "started": pd.to_datetime(r.started, unit="s"),
+                    "ms": round((r.seconds or 0) * 1000),
+                    "top call": r.rows()[0]["name"] if r.stats else "",
+                }
+                for r in reversed(runs)
+            ]),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.download_button(
+            "⬇️ Export JSON",
+            data=json.dumps([r.to_dict() for r in runs], indent=2),
+            file_name="performance.json",
+            mime="application/json",
+        )
+
+
 # --- MAIN CONTENT ---
 if not st.session_state.authenticated:
     login_page()
 else:
+    # Everything instrumented in this render is recorded into perf_run
+    perf_run = perf.start_run(st.session_state.page)
+    from store import start_submission_flusher
+
+    start_submission_flusher()
+    # Roster, sections and work options; re-read only when the config version changes
+    config = get_config()
+    if "all_worker_data" not in st.session_state:
+        st.session_state.all_worker_data = [
+            {
+                "Worker Name": worker,
+                "Arrived": False,
+                "Num Tasks": 0, 
+                "Work Period": None,
+                "Sections": None,
+                "Work Type": None,
+                "Amount (kg)": None,
+                "Advanced Payment": 0,
+            }
+            for worker in config.workers
+        ]
     st.markdown(f"👤 Logged in as: **{st.session_state.username}**")
     nav_buttons()
     page = st.session_state.page
 
     # --- Data Entry Page ---
     if page == "Data Entry":
+        from funcs import prefetch_weather, weather_pending
+
         st.title("🌿 Tea Estate Daily Report - Data Entry")
         st.markdown("---")
 
@@ -136,15 +369,11 @@ else:
             label=" ",
         )
 
-        # Get weather for the whole day
-        w_start, w_end, w_word_range, w_temp_range, w_humidi_range, w_temp_24, w_humidi_24 = get_weather(st.session_state.day_state, 6, 18)
-        st.session_state.weather = [w_start, w_end, w_word_range, w_temp_range, w_humidi_range, w_temp_24, w_humidi_24]
-
-        st.subheader(f"🌦️ {w_start}.am to {w_end}.pm weather")
-        if w_temp_range is not None:       
-            st.info(f"**Weather:** {w_word_range} | **Avg Temp:** {w_temp_range}°C | **Avg Humidity:** {w_humidi_range}%")
-        else:
-            st.warning(w_word_range)
+        # Get weather for the whole day in the background, the form renders meanwhile
+        prefetch_weather(st.session_state.day_state, 6, 18)
+        # Poll only while the lookup is running or a failed one will be retried
+        polling = weather_pending(st.session_state.day_state, 6, 18)
+        st.fragment(run_every=1 if polling else None)(weather_panel)(st.session_state.day_state, polling)
 
 
         st.markdown("---")
@@ -173,92 +402,12 @@ else:
                         st.success(f"Worker '{new_worker_name}' added successfully!")
 
         st.write("### ✍️ Fill Work Details for Each Worker")
-        for i, w_data in enumerate(st.session_state.all_worker_data):
-            worker = w_data["Worker Name"]
-            with st.expander(f"👷 {worker}"):
-                arrived = st.checkbox("Worker Arrived?", key=f"arrived_{worker}", value=w_data.get("Arrived", False))
-                st.session_state.all_worker_data[i]["Arrived"] = arrived
-
-                if arrived:
-                    work_period = st.selectbox(
-                        "Work Period",
-                        work_periods,
-                        index=work_periods.index(w_data.get("Work Period", work_periods[0])) if w_data.get("Work Period") in work_periods else 0,
-                        key=f"period_{worker}"
-                    )
-                    st.session_state.all_worker_data[i]["Work Period"] = work_period
-
-                    adv_payment = st.number_input(
-                        "Advanced Payment (Rs)",
-                        min_value=0,
-                        step=1,
-                        format="%d",
-                        key=f"adv_payment_{worker}",
-                        value=w_data.get("Advanced Payment", 0)
-                    )
-                    st.session_state.all_worker_data[i]["Advanced Payment"] = adv_payment
-
-                    num_tasks = st.number_input("Number of Tasks", min_value=0, max_value=3, value=w_data.get("Num Tasks", 1), key=f"num_tasks_{worker}")
-                    st.session_state.all_worker_data[i]["Num Tasks"] = num_tasks
-                   
-                    # Default values if not present
-                    sections_list = w_data.get("Sections", "").split(", ") if w_data.get("Sections") else []
-                    work_types_list = w_data.get("Work Type", "").split(", ") if w_data.get("Work Type") else []
-                    amount_list = w_data.get("Amount (kg)", "").split(", ") if w_data.get("Amount (kg)") else []
-
-                    sections_result = []
-                    work_types_result = []
-                    amounts_result = []
-
-                    if num_tasks > 0:
-                        cols = st.columns(num_tasks)
-                        for task_id in range(num_tasks):
-                            with cols[task_id]:
-                                st.markdown(f"**Task {task_id + 1}**")
-
-                                section_default = sections_list[task_id] if task_id < len(sections_list) else sections[0]
-                                section = st.selectbox(
-                                    f"Section {task_id + 1}",
-                                    sections,
-                                    index=sections.index(section_default) if section_default in sections else 0,
-                                    key=f"section_{worker}_{task_id}"
-                                )
-
-                                work_type_default = work_types_list[task_id] if task_id < len(work_types_list) else work_types[0]
-                                work_type = st.selectbox(
-                                    f"Work Type {task_id + 1}",
-                                    work_types,
-                                    index=work_types.index(work_type_default) if work_type_default in work_types else 0,
-                                    key=f"type_{worker}_{task_id}"
-                                )
-
-                                if work_type == "Tea_Plucking":
-                                    default_amt = int(amount_list[task_id]) if task_id < len(amount_list) else 0
-                                    amount = st.number_input(f"Tea (kg)", min_value=0, step=1, format="%d", value=default_amt, key=f"amount_{worker}_tea_{task_id}")
-                                elif work_type == "Fertilizing":
-                                    default_amt = int(amount_list[task_id]) if task_id < len(amount_list) else 0
-                                    amount = st.number_input(f"Fertilizer (kg)", min_value=0, step=1, format="%d", value=default_amt, key=f"amount_{worker}_fert_{task_id}")
-                                else:
-                                    st.info("No quantity needed for Weeding or Tea_Pruning.")
-                                    amount = 0
-
-                                sections_result.append(section)
-                                work_types_result.append(work_type)
-                                amounts_result.append(str(amount))
-
-                    # Save updated flattened format
-                    st.session_state.all_worker_data[i]["Sections"] = ", ".join(sections_result)
-                    st.session_state.all_worker_data[i]["Work Type"] = ", ".join(work_types_result)
-                    st.session_state.all_worker_data[i]["Amount (kg)"] = ", ".join(amounts_result)
-
-                else:
-                    st.session_state.all_worker_data[i]["Work Period"] = ""
-                    st.session_state.all_worker_data[i]["Advanced Payment"] = 0
-                    st.session_state.all_worker_data[i]["Sections"] = ""
-                    st.session_state.all_worker_data[i]["Work Type"] = ""
-                    st.session_state.all_worker_data[i]["Amount (kg)"] = ""
-                    st.session_state.all_worker_data[i]["Num Tasks"] = 0
-
+        entry_mode = st.radio("Entry Mode", ["Worker Cards", "Table"], horizontal=True, key="entry_mode")
+        if entry_mode == "Worker Cards":
+            for i in range(len(st.session_state.all_worker_data)):
+                worker_card(i)
+        else:
+            bulk_entry_table()
 
         st.markdown("---")
         st.write("### 🚚 transport Attendance")
@@ -301,6 +450,11 @@ else:
 
     # --- Data Verify Page ---
     elif page == "Data Verify":
+        import pandas as pd
+        from funcs import prefetch_weather, submission_payload
+        from store import write_day
+        from submit_queue import enqueue_submission, flush_submission
+
         st.title("🌿 Tea Estate Daily Report - Data Verify")
         st.markdown("---")
         if st.session_state.saved:
@@ -308,6 +462,9 @@ else:
 
             st.markdown("### 🌤️ Weather Information")
             st.write("🌦️ Whole Day Weather")
+            # Make sure the weather for the selected day is in the session before Final Submit
+            with st.spinner("Fetching weather data..."):
+                st.session_state.weather = list(prefetch_weather(st.session_state.day_state, 6, 18).result())
             w_start, w_end, w_word_range, w_temp_range, w_humidi_range, w_temp_24, w_humidi_24 = st.session_state.weather
             if w_temp_range is not None:
                 st.info(f"**Weather:** {w_word_range} | **Avg Temp:** {w_temp_range}°C | **Avg Humidity:** {w_humidi_range}%")
@@ -342,11 +499,11 @@ else:
             
             st.markdown("---")
             if st.button("✅ Final Submit"):
-                with st.spinner("Uploading to Google Sheets..."):
+                with st.spinner("Saving report..."):
                     sheet_name = st.session_state.day_state.strftime("%Y-%m-%d")
-                    success, msg = write_to_gsheet(
+                    # Journal locally first so the day survives a failed upload or a closed tab
+                    payload = submission_payload(
                         df=df,
-                        sheet_name=sheet_name,
                         transport_login=st.session_state.transport_arrived_login_state,
                         transport_logout=st.session_state.transport_arrived_logout_state,
                         transport_payment=st.session_state.transport_payment_state,
@@ -355,192 +512,176 @@ else:
                         weather=st.session_state.weather,
                         additional_notes=st.session_state.additional_notes
                     )
+                    entry_id = enqueue_submission(sheet_name, payload)
+                    # One attempt now; the background flusher retries with backoff
+                    success, msg = flush_submission(entry_id, write_day, attempts=1)
                     if success:
                         st.success(msg)
                     else:
                         st.error(msg)
+                        st.warning("💾 The data is saved on this device and will be uploaded automatically once Google Sheets is reachable.")
         else:
             st.warning("⚠️ No data available. Please enter and save data on the 'Data Entry' page first.")
 
+        st.markdown("---")
+        submission_queue_panel()
+
     # --- Analysis Page ---
     elif page == "Analysis":
+        import pandas as pd
+        from analysis import get_missing_dates, get_worker_progress, get_worker_summary, get_section_status, get_cube_sections
+        from facts import build_fact_tables
+        from funcs import get_hourly_weather
+        from payroll import pay_period_summary
+        from store import week_ranges, iter_range, analysis_frames
+
         st.title("📊 Tea Estate Daily Report - Analysis")
         st.markdown("---")
         st.write("### 📅 Select Date Range for Analysis")
         col1, col2 = st.columns(2)
         with col1:
-            start_date = st.date_input("Start Date", value=date.today() - pd.Timedelta(days=10))
+            start_date = st.date_input("Start Date", value=date.today() - timedelta(days=10))
         with col2:
             end_date = st.date_input("End Date", value=date.today())
-        data = read_from_gsheet(start_date, end_date)
+        show_raw = st.toggle("🐞 Show raw data", key="analysis_debug")
+        st.markdown("---")
 
-        st.write(data)
+        # The range is read a week at a time; the charts fill in as each week arrives
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.subheader("Average Temperature (°C)")
+            temp_chart = st.empty()
+        with col2:
+            st.subheader("Average Humidity (%)")
+            humidity_chart = st.empty()
+        with col3:
+            st.subheader("Tea Plucked (kg)")
+            tea_chart = st.empty()
+        progress = st.progress(0.0, text="Loading reports...")
+
+        weeks = week_ranges(start_date, end_date)
+        chunks, daily_chunks, tea_chunks = [], [], []
+        for week_no, (week_start, week_end, days) in enumerate(iter_range(start_date, end_date), 1):
+            week_tasks, week_daily = build_fact_tables(days)
+            chunks.append((days, week_tasks, week_daily))
+            daily_chunks.append(week_daily.set_index(week_daily["date"].dt.strftime("%Y-%m-%d")))
+            plucking = week_tasks[week_tasks["work_type"] == "Tea_Plucking"]
+            tea_chunks.append(plucking.groupby(plucking["date"].dt.strftime("%Y-%m-%d"))["kg"].sum())
+
+            weather_by_date = pd.concat(daily_chunks)
+            temp_chart.bar_chart(weather_by_date["avg_temp"].dropna().rename("Temperature"))
+            humidity_chart.bar_chart(weather_by_date["avg_humidity"].dropna().rename("Humidity"))
+            tea_chart.bar_chart(pd.concat(tea_chunks).rename("Tea (kg)"))
+            progress.progress(week_no / len(weeks), text=f"Processed {week_start} to {week_end}")
+        progress.empty()
+
+        # The combined frames are joined from the weekly ones, so the facts are built once
+        data, tasks, daily, section_cube = analysis_frames(chunks)
+
+        if show_raw:
+            st.write(data)
 
-        st.markdown("---")
-        
         missing_dates = get_missing_dates(data, start_date, end_date)
-        temp_dict, hum_dict = get_weather_date(data)
-        worker_progress = get_worker_progress(data, workers)
-        section_progress = get_section_progress(data, sections)
+        # Workers and sections come from the data, so only those with records are paged through
+        worker_progress = get_worker_progress(data)
 
         if missing_dates:
             st.warning("⚠️ The following dates have no data available: " + ", ".join(missing_dates))
         else:
             st.success("✅ All dates have data available.")
 
-        st.markdown("---")
+        parse_warnings = [w for day in data for w in day.get("warnings", [])]
+        if parse_warnings:
+            with st.expander(f"⚠️ {len(parse_warnings)} sheet layout warnings"):
+                st.dataframe(pd.DataFrame(parse_warnings), hide_index=True, use_container_width=True)
 
-        # Prepare data for plotting
-        dates = list(temp_dict.keys())
-        temp_values = list(temp_dict.values())
-        hum_values = list(hum_dict.values())
+        st.markdown("---")
 
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Average Temperature (°C)")
-            st.bar_chart(pd.DataFrame({"Temperature": temp_values}, index=dates))
-        with col2:
-            st.subheader("Average Humidity (%)")
-            st.bar_chart(pd.DataFrame({"Humidity": hum_values}, index=dates))
+        try:
+            hourly_weather = get_hourly_weather(start_date, end_date)
+        except Exception as e:
+            hourly_weather = None
+            st.warning(f"Hourly weather unavailable: {e}")
+        if hourly_weather is not None and not hourly_weather.empty:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Hourly Temperature (°C)")
+                st.line_chart(hourly_weather["Temperature"])
+            with col2:
+                st.subheader("Hourly Humidity (%)")
+                st.line_chart(hourly_weather["Humidity"])
         st.markdown("---")
 
         st.write("### 📊 Worker Progress")
-        for worker, records in worker_progress.items():
-            st.write(f"#### {worker}")
-            if records:
-                df = pd.DataFrame(records)
-                st.dataframe(df)
-            else:
-                st.warning("No data available.")
+        worker_summary = get_worker_summary(tasks)
+        if not worker_summary.empty:
+            st.dataframe(worker_summary, use_container_width=True)
+        paged_tables(list(worker_progress), lambda worker: pd.DataFrame(worker_progress[worker]), key="worker_page")
+
+        st.markdown("---")
+        st.write("### 💰 Pay Summary")
+        pay_summary = pay_period_summary(data, freq="M")
+        if not pay_summary.empty:
+            st.dataframe(pay_summary, use_container_width=True)
+        else:
+            st.warning("No data available.")
 
         st.markdown("---")
         st.write("### 📊 Section Progress")
-        for section, records in section_progress.items():
-            st.write(f"#### {section}")
-            if records:
-                df = pd.DataFrame(records)
-                st.dataframe(df)
-            else:
-                st.warning("No data available.")
-                
+        # Configured sections stay listed even when idle, as that is what the status flags
+        all_sections = get_cube_sections(section_cube, config.sections)
+        st.dataframe(get_section_status(section_cube, all_sections, as_of=end_date), use_container_width=True)
+        paged_tables(
+            get_cube_sections(section_cube),
+            lambda section: section_cube.loc[section],
+            key="section_page",
+        )
+
+        st.markdown("---")
+        st.write("### 📄 Export Reports")
+        col1, col2 = st.columns(2)
+        with col1:
+            export_report = st.radio("Report", ["Payroll & Attendance", "Daily Report Book"], key="export_report")
+        with col2:
+            export_format = st.radio("Format", ["PDF", "XLSX"], key="export_format", horizontal=True)
+        export_key = (export_report, export_format, start_date, end_date)
+        # Built on request only, from the range already read above
+        if st.button("⚙️ Prepare Export"):
+            # The PDF and XLSX writers are only loaded once an export is asked for
+            from exports import EXPORTS
+
+            build_export, _, _ = EXPORTS[(export_report, export_format)]
+            with st.spinner("Building report..."):
+                st.session_state.export = (export_key, build_export(start_date, end_date))
+        prepared = st.session_state.get("export")
+        if prepared and prepared[0] == export_key:
+            from exports import EXPORTS
+
+            _, extension, mime = EXPORTS[(export_report, export_format)]
+            st.download_button(
+                f"⬇️ Download {export_report} ({export_format})",
+                data=prepared[1],
+                file_name=f"{export_report.lower().replace(' & ', '_').replace(' ', '_')}_{start_date}_{end_date}.{extension}",
+                mime=mime,
+            )
+
     # --- Map Page ---
     elif page == "Map":
+        from analysis import get_section_map_metrics, get_cube_sections
+        from map_view import render_map
+        from store import get_store, load_analysis_frames
+
         st.title("🗺️ Tea Estate Map")
         st.markdown("---")
-        # Load all info from gsheet for map popups
-        section_info = read_info_from_gsheet()
-        with open("map.txt", "r") as f:
-            svg_map = f.read()
-        # Inject section_info as a JS variable for the SVG to use
-        html_code = f'''
-        <script>
-        window.SECTION_INFO = {json.dumps(section_info)};
-        </script>
-        <div id="svg-container" style="background:white; overflow:auto; width:100%; height:1200px; touch-action:none;">
-            <div id="zoom-wrapper" style="transform: scale(1); transform-origin: 0 0; cursor: grab;">
-            {svg_map}
-            </div>
-        </div>
-        <script>
-        (function() {{
-            var zoomWrapper = document.getElementById('zoom-wrapper');
-            var container = document.getElementById('svg-container');
-            var scale = 1;
-            var minScale = 0.2;
-            var maxScale = 5;
-            var pos = {{ x: 0, y: 0 }};
-            var isDragging = false;
-            var dragStart = {{ x: 0, y: 0 }};
-            var lastPos = {{ x: 0, y: 0 }};
-
-            // Zoom with ctrl+scroll
-            container.addEventListener('wheel', function(e) {{
-            if (e.ctrlKey) {{
-                e.preventDefault();
-                var prevScale = scale;
-                if (e.deltaY < 0) {{
-                scale = Math.min(maxScale, scale + 0.1);
-                }} else {{
-                scale = Math.max(minScale, scale - 0.1);
-                }}
-                // Adjust position to zoom to mouse pointer
-                var rect = zoomWrapper.getBoundingClientRect();
-                var mouseX = e.clientX - rect.left;
-                var mouseY = e.clientY - rect.top;
-                pos.x = (pos.x - mouseX) * (scale/prevScale) + mouseX;
-                pos.y = (pos.y - mouseY) * (scale/prevScale) + mouseY;
-                updateTransform();
-            }}
-            }}, {{ passive: false }});
-
-            // Drag to move
-            zoomWrapper.addEventListener('mousedown', function(e) {{
-            isDragging = true;
-            dragStart.x = e.clientX;
-            dragStart.y = e.clientY;
-            lastPos.x = pos.x;
-            lastPos.y = pos.y;
-            zoomWrapper.style.cursor = "grabbing";
-            }});
-            window.addEventListener('mousemove', function(e) {{
-            if (isDragging) {{
-                pos.x = lastPos.x + (e.clientX - dragStart.x);
-                pos.y = lastPos.y + (e.clientY - dragStart.y);
-                updateTransform();
-            }}
-            }});
-            window.addEventListener('mouseup', function(e) {{
-            isDragging = false;
-            zoomWrapper.style.cursor = "grab";
-            }});
-
-            // Touch support for mobile
-            var lastTouch = null;
-            zoomWrapper.addEventListener('touchstart', function(e) {{
-            if (e.touches.length === 1) {{
-                isDragging = true;
-                dragStart.x = e.touches[0].clientX;
-                dragStart.y = e.touches[0].clientY;
-                lastPos.x = pos.x;
-                lastPos.y = pos.y;
-            }} else if (e.touches.length === 2) {{
-                lastTouch = {{
-                x1: e.touches[0].clientX,
-                y1: e.touches[0].clientY,
-                x2: e.touches[1].clientX,
-                y2: e.touches[1].clientY,
-                scale: scale
-                }};
-            }}
-            }});
-            zoomWrapper.addEventListener('touchmove', function(e) {{
-            if (e.touches.length === 1 && isDragging) {{
-                pos.x = lastPos.x + (e.touches[0].clientX - dragStart.x);
-                pos.y = lastPos.y + (e.touches[0].clientY - dragStart.y);
-                updateTransform();
-            }} else if (e.touches.length === 2 && lastTouch) {{
-                var dx1 = lastTouch.x2 - lastTouch.x1;
-                var dy1 = lastTouch.y2 - lastTouch.y1;
-                var dx2 = e.touches[1].clientX - e.touches[0].clientX;
-                var dy2 = e.touches[1].clientY - e.touches[0].clientY;
-                var dist1 = Math.sqrt(dx1*dx1 + dy1*dy1);
-                var dist2 = Math.sqrt(dx2*dx2 + dy2*dy2);
-                var scaleChange = dist2 / dist1;
-                scale = Math.max(minScale, Math.min(maxScale, lastTouch.scale * scaleChange));
-                updateTransform();
-            }}
-            e.preventDefault();
-            }}, {{ passive: false }});
-            window.addEventListener('touchend', function(e) {{
-            isDragging = false;
-            lastTouch = null;
-            }});
-
-            function updateTransform() {{
-            zoomWrapper.style.transform = 'translate(' + pos.x + 'px, ' + pos.y + 'px) scale(' + scale + ')';
-            }}
-        }})();
-        </script>
-        '''
-        st.components.v1.html(html_code, height=1500, scrolling=True)
-
+        heatmap_days = st.select_slider("Heatmap window (days)", options=[7, 14, 30, 60, 90], value=30)
+        st.caption("Pick a metric above the map to colour each section by its value over this window.")
+        # Section popups come from the info worksheets; the SVG shell is built once per process
+        section_info = get_store().read_info()
+        # Metrics come from the cached section cube, only the per-section values reach the browser
+        _, _, _, section_cube = load_analysis_frames(date.today() - timedelta(days=heatmap_days - 1), date.today())
+        section_metrics = get_section_map_metrics(section_cube, get_cube_sections(section_cube, config.sections), as_of=date.today())
+        st.components.v1.html(render_map(section_info, section_metrics), height=1500, scrolling=True)
+
+    perf_run.finish()
+    if st.session_state.username in admins:
+        perf_panel(perf_run)
@@ -0,0 +1,213 @@
+"""
+Timing and memory benchmarks of the read -> parse -> aggregate -> render-prep pipeline
+on synthetic history, read through the fake gspread backend.
+
+    python benchmarks/bench_pipeline.py --preset large
+    python benchmarks/bench_pipeline.py --workers 50 --days 365 --compare benchmarks/results/abc1234.json
+
+Results go to benchmarks/results/<commit>.json (or --output) so runs of different
+versions can be compared with --compare.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+# The local caches must point somewhere disposable before the app modules are imported
+_tmp = tempfile.mkdtemp(prefix="tea-bench-")
+os.environ["TEA_ESTATE_CACHE"] = os.path.join(_tmp, "cache.sqlite")
+os.environ["TEA_ESTATE_STORE"] = "sheets"
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+import pandas as pd  # noqa: E402
+
+import sheets_fetch  # noqa: E402
+from analysis import (  # noqa: E402
+    build_section_cube, get_section_map_metrics, get_section_progress, get_section_status,
+    get_worker_progress, get_worker_summary,
+)
+from exports import payroll_xlsx  # noqa: E402
+from facts import build_fact_tables  # noqa: E402
+from fake_gspread import FakeSpreadsheet, install  # noqa: E402
+from funcs import read_from_gsheet  # noqa: E402
+from local_store import clear_cache  # noqa: E402
+from payroll import calculate_payments, pay_period_summary, worker_day_frame  # noqa: E402
+from sheet_parser import parse_day_sheet  # noqa: E402
+from synthetic import generate_day_sheets, roster, section_names  # noqa: E402
+
+PRESETS = {
+    "small": {"workers": 17, "sections": 22, "days": 60},
+    "season": {"workers": 50, "sections": 22, "days": 180},
+    "large": {"workers": 200, "sections": 40, "days": 3 * 365},
+}
+
+
+def measure(fn, repeat):
+    """Runs fn repeat times for timings, then once more under tracemalloc for the peak."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def chart_frames(tasks, daily):
+    # What the Analysis page charts: per-day weather and plucked tea
+    weather = daily.set_index(daily["date"].dt.strftime("%Y-%m-%d"))[["avg_temp", "avg_humidity"]].dropna()
+    plucking = tasks[tasks["work_type"] == "Tea_Plucking"]
+    tea = plucking.groupby(plucking["date"].dt.strftime("%Y-%m-%d"))["kg"].sum()
+    return weather, tea
+
+
+def run(args):
+    workers, sections = roster(args.workers), section_names(args.sections)
+    start_date = date.today() - timedelta(days=args.days)
+    end_date = date.today() - timedelta(days=1)
+
+    started = time.perf_counter()
+    sheets = generate_day_sheets(args.workers, args.sections, args.days, start=start_date, seed=args.seed)
+    generated_s = time.perf_counter() - started
+
+    spreadsheet = FakeSpreadsheet(sheets, args.latency, args.per_range)
+    install(spreadsheet)
+    if not args.real_quota:
+        # Measure the pipeline, not the Sheets quota pacing
+        sheets_fetch.read_bucket = sheets_fetch.TokenBucket(rate_per_minute=1e9, capacity=1e9)
+
+    def read_cold():
+        clear_cache()
+        read_from_gsheet.clear()
+        return read_from_gsheet(start_date, end_date)
+
+    def read_warm():
+        read_from_gsheet.clear()
+        return read_from_gsheet(start_date, end_date)
+
+    def export_payroll():
+        read_from_gsheet.clear()
+        return payroll_xlsx(start_date, end_date)
+
+    data = read_cold()
+    tasks, daily = build_fact_tables(data)
+    cube = build_section_cube(tasks)
+    days = worker_day_frame(data)
+
+    stages = {
+        # Read
+        "read_cold": read_cold,
+        "read_warm": read_warm,
+        # Parse
+        "parse": lambda: [parse_day_sheet(name, values) for name, values in sheets.items()],
+        # Aggregate
+        "fact_tables": lambda: build_fact_tables(data),
+        "payments": lambda: calculate_payments(days),
+        "pay_summary": lambda: pay_period_summary(data, freq="M"),
+        "worker_progress": lambda: get_worker_progress(data, workers),
+        "worker_summary": lambda: get_worker_summary(tasks),
+        "section_progress": lambda: get_section_progress(data, sections, tasks),
+        "section_cube": lambda: build_section_cube(tasks),
+        "section_status": lambda: get_section_status(cube, sections, as_of=end_date),
+        # Render prep
+        "chart_frames": lambda: chart_frames(tasks, daily),
+        "map_metrics": lambda: get_section_map_metrics(cube, sections, as_of=end_date),
+        "export_payroll_xlsx": export_payroll,
+    }
+    results = {}
+    for name, fn in stages.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(fn, args.repeat)
+        print(f"{name:<22} {results[name]['min_s']:>10.4f}s {results[name]['median_s']:>10.4f}s {results[name]['peak_mb']:>9.1f} MB")
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "workers": args.workers,
+            "sections": args.sections,
+            "days": args.days,
+            "day_sheets": len(sheets),
+            "worker_days": len(days),
+            "task_rows": len(tasks),
+            "latency_s": args.latency,
+            "per_range_s": args.per_range,
+            "repeat": args.repeat,
+            "generate_s": round(generated_s, 3),
+            "api_calls": dict(spreadsheet.calls),
+        },
+        "stages": results,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline['meta']['commit']} ({baseline_path}): median time ratio, >1 is slower")
+    for name, stage in results["stages"].items():
+        old = baseline["stages"].get(name)
+        if old and old["median_s"] > 0:
+            print(f"{name:<22} {stage['median_s'] / old['median_s']:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=PRESETS)
+    parser.add_argument("--workers", type=int, default=17)
+    parser.add_argument("--sections", type=int, default=22)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake API request")
+    parser.add_argument("--per-range", type=float, default=0.0, help="extra seconds per sheet in a batch read")
+    parser.add_argument("--real-quota", action="store_true", help="keep the Sheets read rate limiter")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="run only these stages")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+    if args.preset:
+        for key, value in PRESETS[args.preset].items():
+            setattr(args, key, value)
+
+    print(f"{'stage':<22} {'min':>11} {'median':>11} {'peak':>12}")
+    results = run(args)
+
+    output = args.output or os.path.join(REPO, "benchmarks", "results", f"{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Cold-start time of the login page: each run is a fresh Python process executing app.py
+once (Streamlit bare mode) with nobody logged in, as a new container would.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --ref HEAD~1 --repeat 10
+
+--ref also measures an earlier commit, checked out into a temporary git worktree, for a
+side-by-side comparison. Results go to benchmarks/results/startup-<commit>.json (or --output).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies the login page should not need
+HEAVY_MODULES = ["pandas", "numpy", "gspread", "google.oauth2", "requests", "fpdf", "xlsxwriter", "tenacity"]
+
+CHILD = """
+import json, sys, time
+app_dir, heavy = sys.argv[1], sys.argv[2].split(",")
+sys.path.insert(0, app_dir)
+start = time.perf_counter()
+import streamlit
+streamlit_s = time.perf_counter() - start
+start = time.perf_counter()
+import runpy
+runpy.run_path(app_dir + "/app.py", run_name="__main__")
+print(json.dumps({
+    "streamlit_s": streamlit_s,
+    "script_s": time.perf_counter() - start,
+    "modules": len(sys.modules),
+    "heavy": [m for m in heavy if m in sys.modules],
+}))
+"""
+
+SECRETS = '[users]\nbench = "bench"\n'
+
+
+def git(*args):
+    return subprocess.check_output(["git", *args], cwd=REPO, text=True).strip()
+
+
+def run_once(app_dir, workdir):
+    """One cold process; its timings plus the total wall time including interpreter start."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, app_dir, ",".join(HEAVY_MODULES)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+
+def measure(app_dir, repeat):
+    # The secrets file and any local caches live in a throwaway working directory
+    workdir = tempfile.mkdtemp(prefix="tea-startup-")
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(SECRETS)
+    try:
+        runs = [run_once(app_dir, workdir) for _ in range(repeat)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    summary = {}
+    for key in ["process_s", "streamlit_s", "script_s"]:
+        values = [r[key] for r in runs]
+        summary[key] = {"min": round(min(values), 4), "median": round(statistics.median(values), 4)}
+    summary["modules"] = runs[-1]["modules"]
+    summary["heavy"] = runs[-1]["heavy"]
+    return summary
+
+
+def measure_ref(ref, repeat):
+    tmp = tempfile.mkdtemp(prefix="tea-startup-ref-")
+    worktree = os.path.join(tmp, "tree")
+    git("worktree", "add", "--detach", worktree, ref)
+    try:
+        return measure(worktree, repeat)
+    finally:
+        git("worktree", "remove", "--force", worktree)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def report(label, summary):
+    print(
+        f"{label:<14} {summary['process_s']['median']:>9.3f}s {summary['script_s']['median']:>9.3f}s "
+        f"{summary['modules']:>8}  {', '.join(summary['heavy']) or '-'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ref", help="earlier commit to compare against, e.g. HEAD~1")
+    parser.add_argument("--output", help="results file (default benchmarks/results/startup-<commit>.json)")
+    args = parser.parse_args()
+
+    print(f"{'version':<14} {'process':>10} {'app.py':>10} {'modules':>8}  heavy modules loaded")
+    results = {
+        "meta": {
+            "commit": git("rev-parse", "--short", "HEAD"),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+        },
+        "current": measure(REPO, args.repeat),
+    }
+    report("working tree", results["current"])
+    if args.ref:
+        results["meta"]["ref"] = git("rev-parse", "--short", args.ref)
+        results["ref"] = measure_ref(args.ref, args.repeat)
+        report(results["meta"]["ref"], results["ref"])
+        ratio = results["current"]["process_s"]["median"] / results["ref"]["process_s"]["median"]
+        print(f"\nlogin page cold start: {ratio:.2f}x of {results['meta']['ref']} (median, <1 is faster)")
+
+    output = args.output or os.path.join(REPO, "benchmarks", "results", f"startup-{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
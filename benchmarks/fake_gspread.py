@@ -0,0 +1,160 @@
+import threading
+import time
+
+from gspread.utils import absolute_range_name
+
+
+def _formatted(value):
+    # The string Sheets reads back for a userEnteredValue; a missing value clears the cell
+    if not value:
+        return ""
+    if "boolValue" in value:
+        return "TRUE" if value["boolValue"] else "FALSE"
+    if "numberValue" in value:
+        number = value["numberValue"]
+        return str(int(number)) if float(number).is_integer() else str(number)
+    return str(value["stringValue"])
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, sheet_id, title, values):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self.values = values
+
+    @property
+    def row_count(self):
+        return len(self.values)
+
+    @property
+    def col_count(self):
+        return max((len(row) for row in self.values), default=0)
+
+    def get_all_values(self):
+        self.spreadsheet._request("get_all_values")
+        return [list(row) for row in self.values]
+
+
+class FakeSpreadsheet:
+    """
+    In-memory stand-in for a gspread Spreadsheet. Every API-backed call sleeps for
+    latency seconds (plus per_range seconds for each range of a batch) and is counted
+    in .calls, so fetch strategies can be compared without touching Google.
+    """
+
+    def __init__(self, sheets=None, latency=0.0, per_range=0.0):
+        self.latency = latency
+        self.per_range = per_range
+        self.calls = {}
+        self.lock = threading.Lock()
+        self._sheets = {}
+        # Sheet ids are never reused, as in Sheets, so a stale id cannot hit a newer tab
+        self._next_id = 1
+        # Bumped by every write, like the Drive modifiedTime of a real spreadsheet
+        self.edits = 0
+        for title, values in (sheets or {}).items():
+            self.add_sheet(title, values)
+
+    def _request(self, name, ranges=0):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        time.sleep(self.latency + self.per_range * ranges)
+
+    def add_sheet(self, title, values):
+        ws = FakeWorksheet(self, self._next_id, title, values)
+        self._next_id += 1
+        self._sheets[title] = ws
+        return ws
+
+    def touch(self):
+        """Records an edit made outside the API calls below, e.g. a cell changed by hand."""
+        with self.lock:
+            self.edits += 1
+
+    def get_lastUpdateTime(self):
+        self._request("get_lastUpdateTime")
+        return f"edit-{self.edits}"
+
+    def worksheets(self):
+        self._request("worksheets")
+        return list(self._sheets.values())
+
+    def add_worksheet(self, title, rows=1, cols=1):
+        self._request("add_worksheet")
+        self.touch()
+        if title in self._sheets:
+            raise ValueError(f'A sheet with the name "{title}" already exists.')
+        return self.add_sheet(title, [])
+
+    def _sheet(self, range_name):
+        by_range = {absolute_range_name(title): ws for title, ws in self._sheets.items()}
+        return by_range[range_name]
+
+    def values_update(self, range_name, params=None, body=None):
+        self._request("values_update")
+        self.touch()
+        self._sheet(range_name).values = [list(row) for row in body["values"]]
+
+    def values_append(self, range_name, params=None, body=None):
+        self._request("values_append")
+        self.touch()
+        # Reads return strings, as Sheets does with RAW input read back
+        self._sheet(range_name).values.extend([str(v) for v in row] for row in body["values"])
+
+    def _sheet_by_id(self, sheet_id):
+        return next(ws for ws in self._sheets.values() if ws.id == sheet_id)
+
+    def batch_update(self, body):
+        """Applies the deleteSheet, updateSheetProperties (grid size) and updateCells requests."""
+        self._request("batch_update")
+        self.touch()
+        for request in body["requests"]:
+            if "deleteSheet" in request:
+                sheet_id = request["deleteSheet"]["sheetId"]
+                self._sheets = {t: ws for t, ws in self._sheets.items() if ws.id != sheet_id}
+            elif "updateSheetProperties" in request:
+                props = request["updateSheetProperties"]["properties"]
+                grid = props["gridProperties"]
+                ws = self._sheet_by_id(props["sheetId"])
+                rows = [list(row) for row in ws.values[:grid["rowCount"]]]
+                rows += [[] for _ in range(grid["rowCount"] - len(rows))]
+                ws.values = [(row + [""] * grid["columnCount"])[:grid["columnCount"]] for row in rows]
+            elif "updateCells" in request:
+                update = request["updateCells"]
+                ws = self._sheet_by_id(update["start"]["sheetId"])
+                row0, col0 = update["start"]["rowIndex"], update["start"]["columnIndex"]
+                for r, row in enumerate(update["rows"]):
+                    for c, cell in enumerate(row["values"]):
+                        ws.values[row0 + r][col0 + c] = _formatted(cell.get("userEnteredValue"))
+            else:
+                raise NotImplementedError(f"batch_update request {list(request)} is not supported")
+
+    def values_batch_get(self, ranges, params=None):
+        self._request("values_batch_get", len(ranges))
+        by_range = {absolute_range_name(title): ws for title, ws in self._sheets.items()}
+        return {
+            "valueRanges": [
+                {"range": r, "values": [list(row) for row in by_range[r].values] if r in by_range else []}
+                for r in ranges
+            ]
+        }
+
+
+def install(spreadsheet):
+    """
+    Points funcs at spreadsheet instead of Google Sheets, with fresh caches, so
+    read_from_gsheet and friends run unchanged against the fake backend.
+    """
+    import sys
+
+    import funcs
+
+    # Modules that imported get_spreadsheet by name need it replaced as well
+    for name in ("funcs", "store", "migrate_layout"):
+        if name in sys.modules:
+            sys.modules[name].get_spreadsheet = lambda: spreadsheet
+    funcs.get_worksheet_index.clear()
+    funcs.day_sheet_snapshot.clear()
+    funcs.read_from_gsheet.clear()
+    funcs.read_info_from_gsheet.clear()
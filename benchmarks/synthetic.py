@@ -0,0 +1,107 @@
+"""
+Synthetic estate history in the exact day-sheet layout write_to_gsheet produces.
+
+    generate_day_sheets(n_workers=200, n_sections=40, days=3 * 365)
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_config  # noqa: E402
+from funcs import build_day_values  # noqa: E402
+from payroll import calculate_payments  # noqa: E402
+
+WORK_TYPES = ["Tea_Plucking", "Fertilizing", "Tea_Pruning", "Weeding"]
+# Most tasks are plucking, as on the real estate
+WORK_TYPE_WEIGHTS = [0.7, 0.1, 0.1, 0.1]
+
+
+def roster(n_workers):
+    return [f"{'M' if i % 3 == 0 else 'F'}{i + 1} - Worker {i + 1}" for i in range(n_workers)]
+
+
+def section_names(n_sections):
+    return [f"{i // 4 + 1}{'ABCD'[i % 4]}-{i % 3 + 1}" for i in range(n_sections)]
+
+
+def sheet_text(value):
+    """A cell value as Google Sheets returns it from a read."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def day_worker_frame(rng, workers, sections, attendance=0.85):
+    """The worker table of one day, as the entry form submits it (before payments)."""
+    periods = list(get_config().period_unit_map)
+    rows = []
+    for worker in workers:
+        if rng.random() > attendance:
+            rows.append({
+                "Worker Name": worker, "Arrived": False, "Num Tasks": 0, "Work Period": "",
+                "Sections": "", "Work Type": "", "Amount (kg)": "", "Advanced Payment": 0,
+            })
+            continue
+        n_tasks = rng.choice([1, 1, 1, 2, 2, 3])
+        work_types = rng.choices(WORK_TYPES, WORK_TYPE_WEIGHTS, k=n_tasks)
+        amounts = [
+            rng.randint(5, 30) if wt == "Tea_Plucking" else rng.randint(10, 50) if wt == "Fertilizing" else 0
+            for wt in work_types
+        ]
+        rows.append({
+            "Worker Name": worker,
+            "Arrived": True,
+            "Num Tasks": n_tasks,
+            "Work Period": rng.choice(periods),
+            "Sections": ", ".join(rng.choices(sections, k=n_tasks)),
+            "Work Type": ", ".join(work_types),
+            "Amount (kg)": ", ".join(str(a) for a in amounts),
+            "Advanced Payment": rng.choice([0, 0, 0, 0, 500, 1000]),
+        })
+    return pd.DataFrame(rows)
+
+
+def day_weather(rng):
+    temps = [round(rng.uniform(16, 30), 1) for _ in range(24)]
+    humidity = [rng.randint(60, 100) for _ in range(24)]
+    return [6, 18, rng.choice(["Sunny", "Cloudy", "Slight rain"]), round(sum(temps[6:18]) / 12, 1), round(sum(humidity[6:18]) / 12, 1), temps, humidity]
+
+
+def generate_day_values(rng, workers, sections):
+    """The full cell grid of one day sheet, with values as strings like a Sheets read."""
+    df = day_worker_frame(rng, workers, sections)
+    # Same steps as write_to_gsheet before it builds the sheet
+    df["Payment"] = calculate_payments(df)
+    df = df.fillna("")
+    values = build_day_values(
+        df, rng.random() < 0.9, rng.random() < 0.9, rng.choice([0, 500, 800]),
+        rng.random() < 0.8, rng.choice([0, 200, 300]), day_weather(rng),
+        rng.choice(["", "", "Rain stopped work early.", "Fertilizer delivery arrived."]),
+    )
+    return [[sheet_text(v) for v in row] for row in values]
+
+
+def generate_day_sheets(n_workers=17, n_sections=22, days=30, start=None, seed=0, skip_sundays=True):
+    """
+    {"YYYY-MM-DD": values} for `days` consecutive dates from start (default: that many days
+    back from today). Sundays are skipped like on the estate unless skip_sundays is False.
+    """
+    rng = random.Random(seed)
+    workers, sections = roster(n_workers), section_names(n_sections)
+    start = start or date.today() - timedelta(days=days)
+    sheets = {}
+    for i in range(days):
+        day = start + timedelta(days=i)
+        if skip_sundays and day.weekday() == 6:
+            continue
+        sheets[day.strftime("%Y-%m-%d")] = generate_day_values(rng, workers, sections)
+    return sheets
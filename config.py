@@ -0,0 +1,112 @@
+import json
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List
+
+import streamlit as st
+
+import perf
+
+# Local config file; always read, and the base the Config worksheet overrides
+CONFIG_FILE = os.environ.get(
+    "TEA_ESTATE_CONFIG_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "estate_config.json")
+)
+# "file" uses CONFIG_FILE alone, "sheet" also applies the Config worksheet of the report spreadsheet
+CONFIG_SOURCE = os.environ.get("TEA_ESTATE_CONFIG", "file")
+CONFIG_SHEET = "Config"
+# Seconds between version checks; the config itself is only re-read when its version changes
+CONFIG_TTL = 300
+
+
+@dataclass(frozen=True)
+class EstateConfig:
+    version: str
+    workers: List[str]
+    sections: List[str]
+    work_periods: List[str]
+    work_types: List[str]
+    paid_work_types: List[str]
+    base_rate: float
+    expected_tea_kg: float
+    extra_kg_rate: float
+    # Work period -> number of base pay units
+    period_unit_map: Dict[str, float]
+
+
+def read_config_file(path=None):
+    with open(path or CONFIG_FILE) as f:
+        values = json.load(f)
+    names = {f.name for f in fields(EstateConfig)} - {"version"}
+    return EstateConfig(version=str(values.get("version", "")), **{k: v for k, v in values.items() if k in names})
+
+
+def config_from_rows(rows, base):
+    """
+    Applies Config worksheet rows over base. Each row is a key followed by its values
+    across the columns, with the version on the first row:
+
+        version         | 7
+        workers         | M1 - Kokila | M2 - Sunil | ...
+        work_periods    | 7.30-1.30   | 7.30-10.30 | 7.30-4.30
+        period_units    | 2           | 1          | 3
+        base_rate       | 400
+
+    period_units lines up with work_periods. Keys left out keep their base value.
+    """
+    values = {row[0].strip(): [v.strip() for v in row[1:] if v.strip()] for row in rows if row and row[0].strip()}
+    overrides = {"version": f"{base.version}+sheet {(values.get('version') or [''])[0]}"}
+    for key in ["workers", "sections", "work_periods", "work_types", "paid_work_types"]:
+        if values.get(key):
+            overrides[key] = values[key]
+    for key in ["base_rate", "expected_tea_kg", "extra_kg_rate"]:
+        if values.get(key):
+            overrides[key] = float(values[key][0])
+    if values.get("period_units"):
+        periods = overrides.get("work_periods", base.work_periods)
+        overrides["period_unit_map"] = dict(zip(periods, map(float, values["period_units"])))
+    return replace(base, **overrides)
+
+
+def _read_sheet(range_name=None):
+    # Imported here so the file-only setup never loads the Sheets client
+    from gspread.utils import absolute_range_name
+
+    from funcs import get_spreadsheet
+
+    resp = get_spreadsheet().values_get(absolute_range_name(CONFIG_SHEET, range_name))
+    return resp.get("values", [])
+
+
+# The version get_config last served, kept while the Config worksheet cannot be reached
+_last_version = []
+
+
+@st.cache_resource(ttl=CONFIG_TTL, show_spinner=False)
+@perf.timed("config.version")
+def config_version():
+    """(file version, sheet version) of the config; the sheet check reads a single cell."""
+    file_version = os.stat(CONFIG_FILE).st_mtime_ns
+    if CONFIG_SOURCE != "sheet":
+        return file_version, None
+    try:
+        rows = _read_sheet("A1:B1")
+    except Exception:
+        return _last_version[0] if _last_version else (file_version, None)
+    return file_version, rows[0][1] if rows and len(rows[0]) > 1 else ""
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+@perf.timed("config.load")
+def load_config(version):
+    config = read_config_file()
+    if version[1] is not None:
+        config = config_from_rows(_read_sheet(), config)
+    return config
+
+
+def get_config():
+    """The estate config (roster, sections, work options and pay constants), shared process-wide."""
+    version = config_version()
+    config = load_config(version)
+    _last_version[:] = [version]
+    return config
@@ -0,0 +1,215 @@
+import os
+import tempfile
+
+import pandas as pd
+import xlsxwriter
+from fpdf import FPDF
+
+import perf
+from payroll import as_bool, pay_period_summary, worker_day_frame
+from store import iter_range, month_ranges
+
+DAY_TABLE_COLUMNS = ["Worker Name", "Arrived", "Work Period", "Sections", "Work Type", "Amount (kg)", "Advanced Payment", "Payment"]
+DAY_TABLE_WIDTHS = (38, 14, 20, 30, 38, 18, 16, 16)
+
+
+# --- Data Streams ---
+def iter_months(start_date, end_date):
+    """
+    Yields ("YYYY-MM", days) per month with data. Each month is read from the store only
+    when it is reached, so only the current month's days are held at a time.
+    """
+    for month_start, _, days in iter_range(start_date, end_date, chunks=month_ranges):
+        if days:
+            yield month_start.strftime("%Y-%m"), days
+
+
+def iter_days(start_date, end_date):
+    """Every stored day in the range in date order, read a month at a time."""
+    for _, days in iter_months(start_date, end_date):
+        yield from days
+
+
+def attendance_grid(days):
+    """Worker x day-of-month grid with "P" where the worker arrived."""
+    frame = worker_day_frame(days)
+    if frame.empty or "Arrived" not in frame:
+        return pd.DataFrame()
+    frame["day"] = frame["date"].str[8:10]
+    frame["present"] = as_bool(frame["Arrived"])
+    grid = frame.pivot_table(index="Worker Name", columns="day", values="present", aggfunc="max")
+    return grid.fillna(False).astype(bool).replace({True: "P", False: ""})
+
+
+def _day_rows(day):
+    frame = pd.DataFrame(day.get("df", [])).reindex(columns=DAY_TABLE_COLUMNS).fillna("")
+    return frame.astype(str).values.tolist()
+
+
+def _day_lines(day):
+    weather = day.get("weather") or {}
+    return [
+        f"Weather: {weather.get('word', '')} | Period: {weather.get('period', '')} | "
+        f"Avg Temp: {weather.get('avg_temp', '')}°C | Avg Humidity: {weather.get('avg_humidity', '')}%",
+        f"Transport: Login - {day.get('transport_login')} | Logout - {day.get('transport_logout')} | "
+        f"Payment - {day.get('transport_payment')}",
+        f"Tea Collect: Attended - {day.get('tea_collect_attended')} | Payment - {day.get('tea_collect_payment')}",
+    ]
+
+
+# --- PDF ---
+def _latin1(value):
+    # The core PDF fonts only cover latin-1; anything else prints as "?"
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+class ReportPDF(FPDF):
+    def __init__(self, title, orientation="P"):
+        super().__init__(orientation=orientation, format="A4")
+        self.title = title
+        self.set_auto_page_break(auto=True, margin=15)
+
+    def header(self):
+        self.set_font("Helvetica", "B", 14)
+        self.cell(0, 10, _latin1(self.title), new_x="LMARGIN", new_y="NEXT", align="C")
+        self.ln(2)
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font("Helvetica", "I", 8)
+        self.cell(0, 8, f"Page {self.page_no()}", align="C")
+
+    def heading(self, text):
+        self.set_font("Helvetica", "B", 12)
+        self.cell(0, 9, _latin1(text), new_x="LMARGIN", new_y="NEXT")
+
+    def lines(self, lines, size=10):
+        self.set_font("Helvetica", "", size)
+        for line in lines:
+            self.multi_cell(0, 6, _latin1(line), new_x="LMARGIN", new_y="NEXT")
+
+    def add_table(self, header, rows, col_widths=None, size=8):
+        self.set_font("Helvetica", "", size)
+        with self.table(col_widths=col_widths, line_height=5, text_align="LEFT", width=self.epw if col_widths is None else None) as table:
+            for row in [header] + rows:
+                cells = table.row()
+                for value in row:
+                    cells.cell(_latin1(value))
+        self.ln(4)
+
+
+@perf.timed("exports.payroll_pdf")
+def payroll_pdf(start_date, end_date):
+    """
+    Monthly payroll and attendance per worker, one month per page (landscape).
+    The days are read a month at a time, but fpdf keeps every page in memory until
+    output(), so the document itself grows with the range (the XLSX exports do not).
+    """
+    pdf = ReportPDF("Tea Estate Payroll & Attendance", orientation="L")
+    for month, days in iter_months(start_date, end_date):
+        pdf.add_page()
+        pdf.heading(f"Payroll - {month}")
+        summary = pay_period_summary(days).reset_index()
+        pdf.add_table(summary.columns.tolist(), summary.astype(str).values.tolist())
+
+        grid = attendance_grid(days)
+        if not grid.empty:
+            pdf.heading(f"Attendance - {month}")
+            pdf.add_table(
+                ["Worker"] + grid.columns.tolist(),
+                [[worker] + row for worker, row in zip(grid.index, grid.values.tolist())],
+                col_widths=[40] + [7] * len(grid.columns),
+                size=7,
+            )
+    if pdf.page_no() == 0:
+        pdf.add_page()
+        pdf.lines(["No data available."])
+    return bytes(pdf.output())
+
+
+@perf.timed("exports.day_book_pdf")
+def day_book_pdf(start_date, end_date):
+    """
+    The daily report book: one day per page with its worker table and notes.
+    Like payroll_pdf, the finished pages stay in memory until output().
+    """
+    pdf = ReportPDF("Tea Estate Daily Report")
+    for day in iter_days(start_date, end_date):
+        pdf.add_page()
+        pdf.heading(f"Date: {day['date']}")
+        pdf.lines(_day_lines(day))
+        pdf.ln(2)
+        pdf.add_table(DAY_TABLE_COLUMNS, _day_rows(day), col_widths=DAY_TABLE_WIDTHS)
+        pdf.set_font("Helvetica", "I", 10)
+        pdf.multi_cell(0, 6, _latin1(f"Notes: {day.get('additional_notes', '')}"))
+    if pdf.page_no() == 0:
+        pdf.add_page()
+        pdf.lines(["No data available."])
+    return bytes(pdf.output())
+
+
+# --- XLSX ---
+def _xlsx(write):
+    """
+    Runs write(workbook, bold) on a constant-memory workbook, which flushes each row to
+    disk once the next one starts, and returns the file's bytes.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.xlsx")
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "tmpdir": tmp})
+        write(workbook, workbook.add_format({"bold": True}))
+        workbook.close()
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _write_rows(worksheet, row_no, rows, fmt=None):
+    for row in rows:
+        worksheet.write_row(row_no, 0, row, fmt)
+        row_no += 1
+    return row_no
+
+
+@perf.timed("exports.payroll_xlsx")
+def payroll_xlsx(start_date, end_date):
+    """Monthly payroll and attendance per worker, two worksheets per month."""
+    def write(workbook, bold):
+        for month, days in iter_months(start_date, end_date):
+            summary = pay_period_summary(days).reset_index()
+            sheet = workbook.add_worksheet(f"Payroll {month}")
+            _write_rows(sheet, 0, [summary.columns.tolist()], bold)
+            _write_rows(sheet, 1, summary.values.tolist())
+
+            grid = attendance_grid(days)
+            sheet = workbook.add_worksheet(f"Attendance {month}")
+            _write_rows(sheet, 0, [["Worker"] + grid.columns.tolist()], bold)
+            _write_rows(sheet, 1, [[worker] + row for worker, row in zip(grid.index, grid.values.tolist())])
+        if not workbook.worksheets():
+            workbook.add_worksheet("Payroll").write(0, 0, "No data available.")
+    return _xlsx(write)
+
+
+@perf.timed("exports.day_book_xlsx")
+def day_book_xlsx(start_date, end_date):
+    """The daily report book as one worksheet, one block of rows per day."""
+    def write(workbook, bold):
+        sheet = workbook.add_worksheet("Day Book")
+        row_no = 0
+        for day in iter_days(start_date, end_date):
+            row_no = _write_rows(sheet, row_no, [[f"Date: {day['date']}"]], bold)
+            row_no = _write_rows(sheet, row_no, [[line] for line in _day_lines(day)])
+            row_no = _write_rows(sheet, row_no, [DAY_TABLE_COLUMNS], bold)
+            row_no = _write_rows(sheet, row_no, _day_rows(day))
+            row_no = _write_rows(sheet, row_no, [[f"Notes: {day.get('additional_notes', '')}"]]) + 1
+        if row_no == 0:
+            sheet.write(0, 0, "No data available.")
+    return _xlsx(write)
+
+
+# (report, format) -> (builder, file extension, MIME type)
+EXPORTS = {
+    ("Payroll & Attendance", "PDF"): (payroll_pdf, "pdf", "application/pdf"),
+    ("Payroll & Attendance", "XLSX"): (payroll_xlsx, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    ("Daily Report Book", "PDF"): (day_book_pdf, "pdf", "application/pdf"),
+    ("Daily Report Book", "XLSX"): (day_book_xlsx, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
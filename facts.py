@@ -0,0 +1,115 @@
+import pandas as pd
+
+import perf
+from payroll import as_bool, worker_day_frame, explode_tasks, stored_payments, task_payments
+
+TASK_FACT_COLUMNS = [
+    "date", "worker", "task_no", "section", "work_type", "kg",
+    "period", "units", "advance", "payment", "day_payment",
+]
+DAILY_FACT_COLUMNS = [
+    "date", "transport_login", "transport_logout", "transport_payment",
+    "tea_collect_attended", "tea_collect_payment",
+    "weather", "avg_temp", "avg_humidity", "additional_notes",
+]
+
+
+def _empty_task_facts():
+    return pd.DataFrame(columns=TASK_FACT_COLUMNS).astype({"date": "datetime64[ns]"})
+
+
+@perf.timed("facts.build_task_facts")
+def build_task_facts(data):
+    """
+    Long-format table with one row per task per worker-day of data (read_from_gsheet output).
+    Workers who arrived but logged no task keep one row with an empty section/work_type,
+    so attendance can still be counted. The day's advance is booked on the first task only.
+    'day_payment' is the day's pay, booked on the first task only: the Payment saved with the
+    submission, or for days without one the current rates rounded like calculate_payments.
+    'payment' is each task's share of it; the current rates split the day, and any difference
+    to a saved Payment (e.g. from a later rate change) is spread evenly over the day's tasks.
+    """
+    days = worker_day_frame(data)
+    if days.empty:
+        return _empty_task_facts()
+    days["Arrived"] = as_bool(days["Arrived"]) if "Arrived" in days else False
+
+    tasks = task_payments(explode_tasks(days))
+    idle = days[days["Arrived"] & ~days.index.isin(tasks["row_id"])]
+    idle = idle.assign(row_id=idle.index, task_no=0, kg=0.0, units=0.0, **{"Task Payment": 0.0})
+    tasks = pd.concat([tasks, idle], ignore_index=True)
+    if tasks.empty:
+        return _empty_task_facts()
+
+    advance = (
+        pd.to_numeric(tasks["Advanced Payment"], errors="coerce").fillna(0)
+        if "Advanced Payment" in tasks else pd.Series(0, index=tasks.index)
+    )
+    computed = tasks.groupby("row_id")["Task Payment"].sum()
+    day_payment = stored_payments(days).reindex(computed.index).fillna(computed.round()).round().astype("int64")
+    per_task = ((day_payment - computed) / tasks.groupby("row_id").size()).reindex(tasks["row_id"]).to_numpy()
+    tasks["Task Payment"] = tasks["Task Payment"] + per_task
+    first_task = ~tasks.sort_values(["row_id", "task_no"])["row_id"].duplicated().sort_index()
+    facts = pd.DataFrame({
+        "date": pd.to_datetime(tasks["date"]),
+        "worker": tasks["Worker Name"],
+        "task_no": tasks["task_no"].astype("int8"),
+        "section": tasks["Sections"].replace("", None),
+        "work_type": tasks["Work Type"].replace("", None),
+        "kg": tasks["kg"].astype(float),
+        "period": tasks["Work Period"].replace("", None),
+        "units": tasks["units"].astype(float),
+        "advance": advance.where(tasks["task_no"] == 0, 0).astype("int64"),
+        "payment": tasks["Task Payment"].astype(float).round(2),
+        "day_payment": day_payment.reindex(tasks["row_id"]).to_numpy() * first_task.to_numpy(),
+    })
+    for col in ["worker", "section", "work_type", "period"]:
+        facts[col] = facts[col].astype("category")
+    return facts.sort_values(["date", "worker", "task_no"], ignore_index=True)
+
+
+@perf.timed("facts.build_daily_facts")
+def build_daily_facts(data):
+    """One row per day with the transport, tea collect, weather and notes fields."""
+    records = []
+    for day in data:
+        weather = day.get("weather") or {}
+        records.append({
+            "date": day.get("date"),
+            "transport_login": bool(day.get("transport_login")),
+            "transport_logout": bool(day.get("transport_logout")),
+            "transport_payment": day.get("transport_payment"),
+            "tea_collect_attended": bool(day.get("tea_collect_attended")),
+            "tea_collect_payment": day.get("tea_collect_payment"),
+            "weather": weather.get("word"),
+            "avg_temp": weather.get("avg_temp"),
+            "avg_humidity": weather.get("avg_humidity"),
+            "additional_notes": day.get("additional_notes", ""),
+        })
+    daily = pd.DataFrame(records, columns=DAILY_FACT_COLUMNS)
+    daily["date"] = pd.to_datetime(daily["date"])
+    for col in ["transport_payment", "tea_collect_payment"]:
+        daily[col] = pd.to_numeric(daily[col], errors="coerce").astype("Int64")
+    for col in ["avg_temp", "avg_humidity"]:
+        daily[col] = pd.to_numeric(daily[col], errors="coerce")
+    daily["weather"] = daily["weather"].astype("category")
+    return daily.sort_values("date", ignore_index=True)
+
+
+def build_fact_tables(data):
+    """Returns (tasks, daily) fact tables for a read_from_gsheet range."""
+    return build_task_facts(data), build_daily_facts(data)
+
+
+def concat_fact_tables(tables):
+    """Joins the (tasks, daily) fact tables of consecutive date chunks into one (tasks, daily) pair."""
+    tables = list(tables)
+    if not tables:
+        return build_fact_tables([])
+    tasks = pd.concat([tasks for tasks, _ in tables if not tasks.empty] or [_empty_task_facts()], ignore_index=True)
+    daily = pd.concat([daily for _, daily in tables], ignore_index=True)
+    # Each chunk has its own categories, so the joined columns are re-categorised
+    for col in ["worker", "section", "work_type", "period"]:
+        tasks[col] = tasks[col].astype("category")
+    daily["weather"] = daily["weather"].astype("category")
+    return tasks, daily
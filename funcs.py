@@ -1,328 +1,554 @@
-from fpdf import FPDF
-from io import BytesIO
 import streamlit as st
-from collections import Counter
-import requests
 import gspread
+from gspread.utils import fill_gaps
 from google.oauth2.service_account import Credentials
 import pandas as pd
-from datetime import datetime, timedelta
-
-# Define constants
-base_rate = 400
-expected_tea_kg = 18
-extra_kg_rate = 50
-# Map period to number of base units
-period_unit_map = {
-    "7.30-10.30": 1,
-    "7.30-1.30": 2,
-    "7.30-4.30": 3
-}
-
-# --- Payment Calculation Function ---
-def calculate_payment(row):
-    period = row["Work Period"]
-    work_type = row["Work Type"]
-    units = period_unit_map.get(period, 0)
-    
-    if work_type == "Tea_Plucking":
-        base_payment = base_rate * units
-        amount = row.get("Amount (kg)", 0) or 0
-        amount = int(amount)
-        extra_kg = amount - expected_tea_kg
-        adjustment = extra_kg * extra_kg_rate  # positive or negative
-        return base_payment + adjustment
-    elif work_type in ["Fertilizing", "Tea_Pruning", "Weeding"]:
-        return base_rate * units
-    else:
-        return 0  # or some default if needed
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import perf
+from config import CONFIG_SHEET
+from payroll import calculate_payments
+from sheet_parser import parse_day_sheet
+from sheets_fetch import fetch_sheet_values, throttle
+from local_store import sheet_revision, get_cached_days, put_cached_days, invalidate_days, restamp_days
+from monthly_layout import is_monthly_sheet
 
 # --- Weather Data Fetch Function ---
-@st.cache_data(show_spinner=False)
+@perf.timed("funcs.get_weather")
 def get_weather(target_date, start_hour, end_hour):
-    latitude, longitude = 7.095024817437363, 80.36483435225661
+    """
+    (start_hour, end_hour, weather word, avg temp, avg humidity, 24h temps, 24h humidity) for a day.
+    Served from the persistent weather store; errors are returned but never cached.
+    """
+    # Imported on first use, so pages without weather never load the Open-Meteo client
+    from weather import get_weather_history, summarize_weather
+
     date_str = target_date.strftime("%Y-%m-%d")
-    url = (
-        f"https://api.open-meteo.com/v1/forecast?"
-        f"latitude={latitude}&longitude={longitude}"
-        f"&start_date={date_str}&end_date={date_str}"
-        f"&hourly=temperature_2m,weathercode,relative_humidity_2m"
-        f"&timezone=Asia%2FColombo"
-    )
     try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        temps = data["hourly"]["temperature_2m"]
-        codes = data["hourly"]["weathercode"]
-        humidity = data["hourly"]["relative_humidity_2m"]
-        hours = data["hourly"]["time"]
-
-        # 24 values for full day
-        full_day_temps = temps[:24]
-        full_day_humidity = humidity[:24]
-
-        # Filter for given time range
-        hour_indices = [
-            i for i, t in enumerate(hours)
-            if start_hour <= int(t.split("T")[1][:2]) < end_hour
-        ]
-        if not hour_indices:
-            return None, "Weather data unavailable for period", None, [], []
-
-        period_temps = [temps[i] for i in hour_indices]
-        period_codes = [codes[i] for i in hour_indices]
-        period_humidity = [humidity[i] for i in hour_indices]
-        avg_temp = sum(period_temps) / len(period_temps)
-        avg_humidity = sum(period_humidity) / len(period_humidity)
-        code = Counter(period_codes).most_common(1)[0][0]
-
-        weather_map = {
-            0: "Sunny", 1: "Mainly clear", 2: "Partly cloudy", 3: "Cloudy",
-            45: "Foggy", 48: "Depositing rime fog", 51: "Light drizzle",
-            53: "Drizzle", 55: "Dense drizzle", 56: "Freezing drizzle",
-            57: "Dense freezing drizzle", 61: "Slight rain", 63: "Rain",
-            65: "Heavy rain", 66: "Freezing rain", 67: "Heavy freezing rain",
-            71: "Slight snow fall", 73: "Snow fall", 75: "Heavy snow fall",
-            77: "Snow grains", 80: "Slight rain showers", 81: "Rain showers",
-            82: "Violent rain showers", 85: "Slight snow showers",
-            86: "Heavy snow showers", 95: "Thunderstorm",
-            96: "Thunderstorm with hail", 99: "Thunderstorm with heavy hail"
+        hourly = get_weather_history(target_date, target_date).get(date_str)
+        if hourly is None:
+            return None, None, "Weather data unavailable for this date", None, None, [], []
+        return summarize_weather(hourly, start_hour, end_hour)
+    except Exception as e:
+        return None, None, f"Weather data unavailable: {e}", None, None, [], []
+
+
+# --- Background Weather Prefetch ---
+WEATHER_PREFETCH_WORKERS = 2
+# A failed lookup is retried after this many seconds, doubling each time, up to the attempt cap
+WEATHER_RETRY_SECONDS = 30
+WEATHER_MAX_ATTEMPTS = 4
+# Lookups kept per process; the oldest finished ones are dropped beyond this
+WEATHER_MAX_ENTRIES = 64
+
+
+@st.cache_resource(show_spinner=False)
+def _weather_executor():
+    return ThreadPoolExecutor(max_workers=WEATHER_PREFETCH_WORKERS, thread_name_prefix="weather")
+
+
+@st.cache_resource(show_spinner=False)
+def _weather_futures():
+    # Process-wide {(date, start_hour, end_hour): {"future", "attempt", "final", "finished_at"}},
+    # shared by all sessions, oldest first
+    return {}
+
+
+def _fetch_weather_with_neighbours(target_date, start_hour, end_hour):
+    from weather import get_weather_history
+
+    # Warm the store for the day before and after too, in the same single range request
+    try:
+        end = min(target_date + timedelta(days=1), date.today())
+        get_weather_history(target_date - timedelta(days=1), max(end, target_date))
+    except Exception:
+        pass  # get_weather below reports the error for the selected day
+    return get_weather(target_date, start_hour, end_hour)
+
+
+def _weather_failed(entry):
+    return entry["future"].done() and entry["future"].result()[3] is None
+
+
+def _weather_retry_due(entry):
+    if not _weather_failed(entry) or entry["attempt"] >= WEATHER_MAX_ATTEMPTS:
+        return False
+    delay = WEATHER_RETRY_SECONDS * 2 ** (entry["attempt"] - 1)
+    # finished_at is set by a done callback, just after done() turns true
+    return entry["finished_at"] is not None and time.monotonic() >= entry["finished_at"] + delay
+
+
+def _weather_expired(entry):
+    """A finished lookup of a day that was not final yet, older than the weather store's refresh TTL."""
+    from weather import NON_FINAL_TTL
+
+    if entry["final"] or entry["finished_at"] is None:
+        return False
+    # Failed lookups past the retry cap expire too, so an outage does not last the whole day
+    settled = not _weather_failed(entry) or entry["attempt"] >= WEATHER_MAX_ATTEMPTS
+    return settled and time.monotonic() >= entry["finished_at"] + NON_FINAL_TTL
+
+
+def _prune_weather_futures(entries):
+    for key in [k for k, e in entries.items() if e["future"].done()][:max(0, len(entries) - WEATHER_MAX_ENTRIES)]:
+        del entries[key]
+
+
+def prefetch_weather(target_date, start_hour, end_hour):
+    """
+    Starts a background weather lookup for target_date (and its neighbouring days) and
+    returns its Future, resolving to the same tuple as get_weather. Lookups already in
+    flight or done are reused; for days that are not final yet only until the weather
+    store would refresh them (weather.NON_FINAL_TTL). A failed one is retried with
+    exponential backoff, at most WEATHER_MAX_ATTEMPTS times; until then the failed Future
+    is returned.
+    """
+    from weather import FINAL_AFTER_DAYS
+
+    entries = _weather_futures()
+    key = (target_date.strftime("%Y-%m-%d"), start_hour, end_hour)
+    entry = entries.get(key)
+    if entry is not None and _weather_expired(entry):
+        entry = None
+    if entry is None or _weather_retry_due(entry):
+        entry = {
+            "attempt": entry["attempt"] + 1 if entry else 1,
+            "final": target_date <= date.today() - timedelta(days=FINAL_AFTER_DAYS),
+            "finished_at": None,
+        }
+        # Bound to the requesting render so the lookup shows up in its performance stats
+        entry["future"] = _weather_executor().submit(perf.bind_run(_fetch_weather_with_neighbours), target_date, start_hour, end_hour)
+        entry["future"].add_done_callback(lambda _, entry=entry: entry.update(finished_at=time.monotonic()))
+        # Re-inserted at the end, so the dict stays ordered oldest first
+        entries.pop(key, None)
+        entries[key] = entry
+        _prune_weather_futures(entries)
+    return entry["future"]
+
+
+def weather_pending(target_date, start_hour, end_hour):
+    """True while the lookup is running or has failed with retries left, i.e. worth polling."""
+    entry = _weather_futures().get((target_date.strftime("%Y-%m-%d"), start_hour, end_hour))
+    if entry is None or not entry["future"].done():
+        return entry is not None
+    return _weather_failed(entry) and entry["attempt"] < WEATHER_MAX_ATTEMPTS
+
+
+@perf.timed("funcs.get_hourly_weather")
+def get_hourly_weather(start_date, end_date):
+    """Hourly temperature and humidity for a date range as a DataFrame indexed by time."""
+    from weather import get_weather_history
+
+    history = get_weather_history(start_date, end_date)
+    frames = [
+        pd.DataFrame(
+            {"Temperature": hourly["temperature"], "Humidity": hourly["humidity"]},
+            index=pd.to_datetime(hourly["time"]),
+        )
+        for hourly in history.values()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["Temperature", "Humidity"])
+    return pd.concat(frames)
+
+
+# --- Data Entry Helpers ---
+TASK_ROW_COLUMNS = ["Worker Name", "Arrived", "Work Period", "Section", "Work Type", "Amount (kg)", "Advanced Payment"]
+# Work types whose quantity is recorded; the others are always saved with amount 0
+KG_WORK_TYPES = ["Tea_Plucking", "Fertilizing"]
+
+
+def _split_joined(value):
+    return [v.strip() for v in value.split(",")] if value else []
+
+
+def _int_or_zero(value):
+    # Blank cells from the data editor come back as None or NaN
+    return int(value) if value is not None and pd.notna(value) else 0
+
+
+def worker_data_to_task_rows(all_worker_data):
+    """
+    Expands all_worker_data records into one row per worker-task for the bulk entry grid.
+    Workers without tasks keep a single row with empty task fields.
+    """
+    rows = []
+    for w_data in all_worker_data:
+        sections_list = _split_joined(w_data.get("Sections"))
+        work_types_list = _split_joined(w_data.get("Work Type"))
+        amount_list = _split_joined(w_data.get("Amount (kg)"))
+        for task_id in range(max(len(work_types_list), 1)):
+            amount = amount_list[task_id] if task_id < len(amount_list) else ""
+            rows.append({
+                "Worker Name": w_data["Worker Name"],
+                "Arrived": bool(w_data.get("Arrived")),
+                "Work Period": w_data.get("Work Period") or None,
+                "Section": sections_list[task_id] if task_id < len(sections_list) else None,
+                "Work Type": work_types_list[task_id] if task_id < len(work_types_list) else None,
+                "Amount (kg)": int(amount) if amount.isdigit() else 0,
+                "Advanced Payment": int(w_data.get("Advanced Payment") or 0) if task_id == 0 else 0,
+            })
+    return rows
+
+
+def task_rows_to_worker_data(rows, worker_names):
+    """
+    Folds bulk entry grid rows back into all_worker_data records, with the same
+    comma-joined Sections / Work Type / Amount (kg) format the worker cards produce.
+    Workers keep the order of worker_names; names only found in rows are appended.
+    """
+    if hasattr(rows, "to_dict"):
+        rows = rows.to_dict("records")
+    grouped = {name: [] for name in worker_names}
+    for row in rows:
+        name = row.get("Worker Name")
+        name = name.strip() if isinstance(name, str) else ""
+        if name:
+            grouped.setdefault(name, []).append(row)
+
+    all_worker_data = []
+    for name, worker_rows in grouped.items():
+        arrived = any(bool(r.get("Arrived")) for r in worker_rows)
+        record = {
+            "Worker Name": name,
+            "Arrived": arrived,
+            "Num Tasks": 0,
+            "Work Period": "",
+            "Sections": "",
+            "Work Type": "",
+            "Amount (kg)": "",
+            "Advanced Payment": 0,
         }
+        if arrived:
+            tasks = [r for r in worker_rows if pd.notna(r.get("Section")) and pd.notna(r.get("Work Type"))]
+            periods = [r.get("Work Period") for r in worker_rows if pd.notna(r.get("Work Period"))]
+            amounts = [
+                str(_int_or_zero(r.get("Amount (kg)"))) if r.get("Work Type") in KG_WORK_TYPES else "0"
+                for r in tasks
+            ]
+            record.update({
+                "Num Tasks": len(tasks),
+                "Work Period": periods[0] if periods else "",
+                "Sections": ", ".join(r["Section"] for r in tasks),
+                "Work Type": ", ".join(r["Work Type"] for r in tasks),
+                "Amount (kg)": ", ".join(amounts),
+                "Advanced Payment": sum(_int_or_zero(r.get("Advanced Payment")) for r in worker_rows),
+            })
+        all_worker_data.append(record)
+    return all_worker_data
+
+
+# --- Google Sheets Client ---
+SPREADSHEET_NAME = "Tea Estate Daily Report"
+SCOPES = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+# Seconds before the cached worksheet-title index is rebuilt from the API
+WORKSHEET_INDEX_TTL = 300
+# Seconds before the Map page info sheets are read again
+INFO_TTL = 600
+# Date ranges kept in memory by the range caches, and seconds each is kept; a
+# one-year export should not stay resident once the next few ranges are read
+RANGE_CACHE_ENTRIES = 8
+RANGE_CACHE_TTL = 3600
+
+
+@st.cache_resource(show_spinner=False)
+@perf.timed("sheets.auth")
+def get_gspread_client():
+    """
+    Process-wide gspread client. It wraps a single AuthorizedSession, so the HTTP
+    connection is reused and the access token is refreshed when it expires.
+    Token refreshes and every API response are recorded by perf.
+    """
+    creds_dict = st.secrets["google_service_account"]
+    creds = Credentials.from_service_account_info(dict(creds_dict), scopes=SCOPES)
+    creds.refresh = perf.timed("sheets.auth refresh")(creds.refresh)
+    client = gspread.authorize(creds)
+    perf.track_session(client.http_client.session)
+    return client
+
+
+@st.cache_resource(show_spinner=False)
+@perf.timed("sheets.open")
+def get_spreadsheet():
+    return get_gspread_client().open(SPREADSHEET_NAME)
+
+
+@perf.lookup("sheets.worksheet_index")
+@st.cache_resource(ttl=WORKSHEET_INDEX_TTL, show_spinner=False)
+@perf.timed("sheets.worksheet_index")
+def get_worksheet_index():
+    """{title: Worksheet} for every tab in the report spreadsheet."""
+    # A metadata read, so it shares the read quota with the value fetches
+    throttle()
+    return {ws.title: ws for ws in get_spreadsheet().worksheets()}
+
+
+def refresh_worksheet_index():
+    get_worksheet_index.clear()
+    return get_worksheet_index()
 
-        weather_word = weather_map.get(code, "Unknown")
-        return start_hour, end_hour, weather_word, round(avg_temp, 1), round(avg_humidity, 1), full_day_temps, full_day_humidity
 
-    except Exception as e:
-        return None, f"Weather data unavailable: {e}", None, [], []
-        
 # --- Google Sheets Write Function ---
-def write_to_gsheet(df, sheet_name, transport_login, transport_logout, transport_payment, tea_collect_attended, tea_collect_payment, weather, additional_notes=""):
+def build_day_values(df, transport_login, transport_logout, transport_payment, tea_collect_attended, tea_collect_payment, weather, additional_notes=""):
+    """
+    Builds the whole day sheet layout (worker table followed by the section blocks)
+    as a 2-D list of cell values, padded to a rectangle.
+    """
+    values = [df.columns.tolist()]
+    values.extend(df.values.tolist())
+
+    values.append(["==== Trasnport ===="])
+    values.append([
+        "transport Arrived (Login/Logout)", "TRUE" if transport_login else "FALSE",
+        "TRUE" if transport_logout else "FALSE"
+    ])
+    values.append(["transport Paid", str(transport_payment)])
+
+    values.append(["==== Tea Collect ===="])
+    values.append(["tea collect Arrived", "TRUE" if tea_collect_attended else "FALSE"])
+    values.append(["tea collect Received", str(tea_collect_payment)])
+
+    values.append(["==== Weather ===="])
+    # First row: period, weather word, avg temp, avg humidity
+    values.append([
+        f"{weather[0]}:00 - {weather[1]}:00",
+        weather[2],  # weather word
+        weather[3],  # avg temp
+        weather[4]   # avg humidity
+    ])
+    # Second row: 24-hour temperature values
+    values.append(["Temp 24hr"] + list(weather[5]))
+    # Third row: 24-hour humidity values
+    values.append(["Humidity 24hr"] + list(weather[6]))
+
+    values.append(["==== Additional Notes ===="])
+    if additional_notes:
+        values.append([additional_notes])
+    else:
+        values.append(["No additional notes."])
+
+    return fill_gaps(values)
+
+
+def _cell_value(value):
+    # Same typing as a RAW append_row: booleans and numbers stay typed, blanks clear the cell
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+@contextmanager
+def own_write(spreadsheet):
+    """
+    Wraps the app's own writes to the report spreadsheet. Cached days are keyed on the
+    spreadsheet's Drive modifiedTime (local_store.sheet_revision); afterwards the days that
+    were current before the write are re-stamped with the new time, so a submit only costs
+    a refetch of the days it touched (which the writer invalidates itself). Outside edits
+    made before the write still re-key every day.
+    """
+    before = spreadsheet.get_lastUpdateTime()
+    try:
+        yield
+        restamp_days(before, spreadsheet.get_lastUpdateTime())
+    finally:
+        # Tabs or the edit time may have changed either way
+        day_sheet_snapshot.clear()
+
+
+@perf.timed("funcs.write_to_gsheet")
+def write_to_gsheet(df, sheet_name, transport_login, transport_logout, transport_payment, tea_collect_attended, tea_collect_payment, weather, additional_notes="", spreadsheet=None):
     try:
         if "Work Period" in df.columns:
-            df["Payment"] = df.apply(calculate_payment, axis=1)
+            df["Payment"] = calculate_payments(df)
 
         df = df.fillna("")
-
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_dict = st.secrets["google_service_account"]
-        creds = Credentials.from_service_account_info(dict(creds_dict), scopes=scope)
-        client = gspread.authorize(creds)
-
-        spreadsheet = client.open("Tea Estate Daily Report")
-        try:
-            sheet = spreadsheet.worksheet(sheet_name)
-            sheet.clear()
-        except gspread.exceptions.WorksheetNotFound:
-            sheet = spreadsheet.add_worksheet(title=sheet_name, rows="100", cols="20")
-
-        sheet.append_row(df.columns.tolist())
-        for row in df.values.tolist():
-            sheet.append_row(row)
-
-        sheet.append_row(["==== Trasnport ===="])
-        sheet.append_row([
-            "transport Arrived (Login/Logout)", "TRUE" if transport_login else "FALSE",
-            "TRUE" if transport_logout else "FALSE"
-        ])
-        sheet.append_row(["transport Paid", str(transport_payment)])
-
-        sheet.append_row(["==== Tea Collect ===="])
-        sheet.append_row(["tea collect Arrived", "TRUE" if tea_collect_attended else "FALSE"])
-        sheet.append_row(["tea collect Received", str(tea_collect_payment)])
-
-        sheet.append_row(["==== Weather ===="])
-        # First row: period, weather word, avg temp, avg humidity
-        sheet.append_row([
-            f"{weather[0]}:00 - {weather[1]}:00",
-            weather[2],  # weather word
-            weather[3],  # avg temp
-            weather[4]   # avg humidity
-        ])
-        # Second row: 24-hour temperature values
-        sheet.append_row(["Temp 24hr"] + list(weather[5]))
-        # Third row: 24-hour humidity values
-        sheet.append_row(["Humidity 24hr"] + list(weather[6]))
-
-        sheet.append_row(["==== Additional Notes ===="])
-        if additional_notes:
-            sheet.append_row([additional_notes])
+        values = build_day_values(
+            df, transport_login, transport_logout, transport_payment,
+            tea_collect_attended, tea_collect_payment, weather, additional_notes
+        )
+        n_rows, n_cols = len(values), len(values[0])
+
+        shared = spreadsheet is None
+        if shared:
+            spreadsheet = get_spreadsheet()
+            sheet = get_worksheet_index().get(sheet_name)
+            if sheet is None:
+                # The index may predate a sheet created elsewhere, so check once more before adding
+                sheet = refresh_worksheet_index().get(sheet_name)
         else:
-            sheet.append_row(["No additional notes."])
+            # An explicitly passed spreadsheet (e.g. a fake backend) bypasses the shared index
+            sheet = next((ws for ws in spreadsheet.worksheets() if ws.title == sheet_name), None)
+        with own_write(spreadsheet):
+            if sheet is None:
+                sheet = spreadsheet.add_worksheet(title=sheet_name, rows=n_rows, cols=n_cols)
+                if shared:
+                    get_worksheet_index.clear()
+
+            # Resize the grid to exactly the data and overwrite every cell in one request.
+            # Cells dropped by the resize or written as blank replace the old sheet.clear().
+            spreadsheet.batch_update({
+                "requests": [
+                    {
+                        "updateSheetProperties": {
+                            "properties": {
+                                "sheetId": sheet.id,
+                                "gridProperties": {"rowCount": n_rows, "columnCount": n_cols},
+                            },
+                            "fields": "gridProperties(rowCount,columnCount)",
+                        }
+                    },
+                    {
+                        "updateCells": {
+                            "start": {"sheetId": sheet.id, "rowIndex": 0, "columnIndex": 0},
+                            "rows": [{"values": [_cell_value(v) for v in row]} for row in values],
+                            "fields": "userEnteredValue",
+                        }
+                    },
+                ]
+            })
+
+        # The day has been overwritten, so drop it from both caches
+        invalidate_days([sheet_name])
+        read_from_gsheet.clear()
 
         return True, f"✅ Data successfully written to sheet '{sheet_name}'."
     except Exception as e:
+        # A stale index entry (e.g. a tab deleted by hand) must not break the next attempt
+        get_worksheet_index.clear()
         return False, f"❌ Error writing to Google Sheets: {e}"
     
 
+# --- Offline Submission Queue ---
+def submission_payload(df, transport_login, transport_logout, transport_payment, tea_collect_attended, tea_collect_payment, weather, additional_notes=""):
+    """JSON-serialisable form of one Final Submit, as journaled by submit_queue."""
+    return {
+        "df": df.to_dict("records"),
+        "transport_login": bool(transport_login),
+        "transport_logout": bool(transport_logout),
+        "transport_payment": transport_payment,
+        "tea_collect_attended": bool(tea_collect_attended),
+        "tea_collect_payment": tea_collect_payment,
+        "weather": list(weather),
+        "additional_notes": additional_notes,
+    }
+
+
+def write_submission(sheet_name, payload, spreadsheet=None):
+    """submit_queue writer: replays a journaled payload through write_to_gsheet."""
+    return write_to_gsheet(
+        df=pd.DataFrame(payload["df"]),
+        sheet_name=sheet_name,
+        transport_login=payload["transport_login"],
+        transport_logout=payload["transport_logout"],
+        transport_payment=payload["transport_payment"],
+        tea_collect_attended=payload["tea_collect_attended"],
+        tea_collect_payment=payload["tea_collect_payment"],
+        weather=payload["weather"],
+        additional_notes=payload["additional_notes"],
+        spreadsheet=spreadsheet,
+    )
+
+
 # --- Google Sheets Read Function ---
-@st.cache_data(show_spinner=False)
-def read_from_gsheet(start_date, end_date):
-    # Setup Google Sheets client
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds_dict = st.secrets["google_service_account"]
-    creds = Credentials.from_service_account_info(dict(creds_dict), scopes=scope)
-    client = gspread.authorize(creds)
-    spreadsheet = client.open("Tea Estate Daily Report")
+# Seconds a metadata snapshot (worksheet index and last edit time) is shared between reads
+SNAPSHOT_TTL = 30
 
-    # Prepare date range
+
+@st.cache_resource(ttl=SNAPSHOT_TTL, show_spinner=False)
+@perf.timed("funcs.day_sheet_snapshot")
+def day_sheet_snapshot():
+    """
+    ({title: Worksheet}, Drive modifiedTime) of the report spreadsheet: the metadata every
+    read needs to tell which day sheets exist and which cached days are current. One
+    worksheets() call and one Drive call, shared by all chunks of a range read and by
+    reruns within SNAPSHOT_TTL. The app's own writes drop it (own_write).
+    """
+    worksheets = refresh_worksheet_index()
+    return worksheets, get_spreadsheet().get_lastUpdateTime()
+
+
+def _date_list(start_date, end_date):
     if isinstance(start_date, str):
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
     if isinstance(end_date, str):
         end_date = datetime.strptime(end_date, "%Y-%m-%d")
     days = (end_date - start_date).days + 1
-    date_list = [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
-
-    all_data = []
-    for sheet_name in date_list:
-        try:
-            sheet = spreadsheet.worksheet(sheet_name)
-            rows = sheet.get_all_values()
-            if not rows:
-                continue
-
-            # Find section indices
-            def find_section(label):
-                for idx, row in enumerate(rows):
-                    if row and row[0].strip() == label:
-                        return idx
-                return -1
-
-            # Main DataFrame
-            df_start = 0
-            transport_idx = find_section("==== Trasnport ====")
-            if transport_idx == -1:
-                continue
-            df_header = rows[df_start]
-            df_rows = rows[df_start+1:transport_idx]
-            # Convert each row to dict using header
-            df_dicts = []
-            for row in df_rows:
-                # Pad row if shorter than header
-                padded_row = row + [""] * (len(df_header) - len(row))
-                df_dicts.append(dict(zip(df_header, padded_row)))
-
-            # Transport
-            transport_login = transport_logout = transport_payment = None
-            tea_collect_attended = tea_collect_payment = None
-            weather = {}
-            additional_notes = ""
-
-            # Transport section
-            transport_paid_idx = find_section("transport Paid")
-            if transport_paid_idx != -1:
-                transport_row = rows[transport_idx+1]
-                transport_login = transport_row[1] == "TRUE"
-                transport_logout = transport_row[2] == "TRUE"
-                transport_payment = rows[transport_paid_idx][1]
-
-            # Tea Collect section
-            tea_collect_idx = find_section("==== Tea Collect ====")
-            if tea_collect_idx != -1:
-                tea_collect_attended = rows[tea_collect_idx+1][1] == "TRUE"
-                tea_collect_payment = rows[tea_collect_idx+2][1]
-
-            # Weather section
-            weather_idx = find_section("==== Weather ====")
-            if weather_idx != -1:
-                weather_row = rows[weather_idx+1]
-                weather['period'] = weather_row[0]
-                weather['word'] = weather_row[1]
-                weather['avg_temp'] = weather_row[2]
-                weather['avg_humidity'] = weather_row[3]
-                weather['temp_24hr'] = rows[weather_idx+2][1:]
-                weather['humidity_24hr'] = rows[weather_idx+3][1:]
-
-            # Additional Notes
-            notes_idx = find_section("==== Additional Notes ====")
-            if notes_idx != -1:
-                additional_notes = rows[notes_idx+1][0] if len(rows) > notes_idx+1 else ""
-
-            all_data.append({
-                "date": sheet_name,
-                "df": df_dicts,
-                "transport_login": transport_login,
-                "transport_logout": transport_logout,
-                "transport_payment": transport_payment,
-                "tea_collect_attended": tea_collect_attended,
-                "tea_collect_payment": tea_collect_payment,
-                "weather": weather,
-                "additional_notes": additional_notes
-            })
-        except gspread.exceptions.WorksheetNotFound:
-            continue
-        except Exception as e:
-            st.warning(f"Error reading sheet {sheet_name}: {e}")
-            continue
+    return [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+@perf.timed("funcs.read_days")
+def read_days(start_date, end_date, snapshot):
+    """
+    Day dicts of a date range given a day_sheet_snapshot. Missing days cost nothing, and
+    only days that are not cached yet or whose sheet revision changed are fetched.
+    """
+    worksheets, modified_time = snapshot
+    date_list = _date_list(start_date, end_date)
+    sheet_names = [name for name in date_list if name in worksheets]
+    # Drop cached days whose sheet has since been deleted
+    invalidate_days([name for name in date_list if name not in worksheets])
+
+    revisions = {name: sheet_revision(worksheets[name], modified_time) for name in sheet_names}
+    cached = get_cached_days(sheet_names)
+    stale = [name for name in sheet_names if name not in cached or cached[name][0] != revisions[name]]
+
+    days_by_name = {name: cached[name][1] for name in sheet_names if name not in stale}
+    new_entries = []
+    # Chunked, rate-limited and fetched concurrently; see sheets_fetch for the limits
+    sheet_values = fetch_sheet_values(get_spreadsheet(), stale)
+    for sheet_name in stale:
+        # Malformed sections come back as structured warnings on the day, not st.warning calls
+        report = parse_day_sheet(sheet_name, sheet_values.get(sheet_name, []))
+        day = report.to_dict() if report is not None else None
+        days_by_name[sheet_name] = day
+        new_entries.append((sheet_name, revisions[sheet_name], day))
+    put_cached_days(new_entries)
+
+    return [days_by_name[name] for name in sheet_names if days_by_name.get(name) is not None]
+
+
+def iter_day_ranges(ranges):
+    """Yields the day dicts of each (start, end) of ranges in turn, all read against one snapshot."""
+    snapshot = day_sheet_snapshot()
+    for start_date, end_date in ranges:
+        yield read_days(start_date, end_date, snapshot)
+
+
+@perf.lookup("funcs.read_from_gsheet")
+@st.cache_data(ttl=RANGE_CACHE_TTL, max_entries=RANGE_CACHE_ENTRIES, show_spinner=False)
+@perf.timed("funcs.read_from_gsheet")
+def read_from_gsheet(start_date, end_date):
+    return read_days(start_date, end_date, day_sheet_snapshot())
+
+
+def is_day_sheet(title):
+    """True for the per-day report tabs, which are named YYYY-MM-DD."""
+    try:
+        datetime.strptime(title, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
 
-    return all_data
 
+def is_report_sheet(title):
+    """True for any report tab: per-day sheets and the monthly Tasks/Days sheets."""
+    return is_day_sheet(title) or is_monthly_sheet(title)
 
+
+@perf.lookup("funcs.read_info_from_gsheet")
+@st.cache_data(ttl=INFO_TTL, show_spinner=False)
+@perf.timed("funcs.read_info_from_gsheet")
 def read_info_from_gsheet():
-    creds_dict = st.secrets["google_service_account"]
-    gc = gspread.service_account_from_dict(creds_dict)
-    sh = gc.open("Tea Estate Daily Report")
+    """{title: points} from the info worksheets (every tab that is not a report or the config)."""
+    titles = [title for title in get_worksheet_index() if not is_report_sheet(title) and title != CONFIG_SHEET]
     info = {}
-    for ws in sh.worksheets():
-        rows = ws.get_all_values()
+    for title, rows in fetch_sheet_values(get_spreadsheet(), titles).items():
         # Flatten: take only the first column, skip empty rows
-        points = [row[0] for row in rows if row and row[0].strip()]
-        info[ws.title] = points
+        info[title] = [row[0] for row in rows if row and row[0].strip()]
     return info
-
-
-
-# class ReportPDF(FPDF):
-#     def header(self):
-#         self.set_font("Arial", "B", 14)
-#         self.cell(0, 10, "Tea Estate Daily Report", ln=True, align="C")
-#         self.ln(5)
-
-#     def add_day_report(self, day_data):
-#         self.set_font("Arial", "B", 12)
-#         self.cell(0, 10, f"Date: {day_data['date']}", ln=True)
-
-#         self.set_font("Arial", "", 11)
-#         self.cell(0, 8, f"Weather: {day_data['weather']['word']} | Period: {day_data['weather']['period']}", ln=True)
-#         self.cell(0, 8, f"Avg Temp: {day_data['weather']['avg_temp']}°C | Avg Humidity: {day_data['weather']['avg_humidity']}%", ln=True)
-
-#         self.cell(0, 8, f"Transport: Login - {day_data['transport_login']} | Logout - {day_data['transport_logout']} | Payment - {day_data['transport_payment']}", ln=True)
-#         self.cell(0, 8, f"Tea Collection Attended: {day_data['tea_collect_attended']} | Payment: {day_data['tea_collect_payment']}", ln=True)
-
-#         self.ln(4)
-#         self.set_font("Arial", "B", 11)
-#         self.cell(0, 8, "Worker Summary", ln=True)
-#         self.set_font("Courier", "", 8)
-
-#         df_text = day_data['df']
-#         if hasattr(df_text, "to_string"):
-#             df_text = df_text.to_string(index=False)
-
-#         for line in df_text.split("\n"):
-#             self.cell(0, 4, line.strip(), ln=True)
-
-#         self.ln(4)
-#         self.set_font("Arial", "I", 10)
-#         self.multi_cell(0, 6, f"Notes: {day_data['additional_notes']}")
-#         self.ln(6)
-#         self.set_draw_color(180)
-#         self.line(10, self.get_y(), 200, self.get_y())
-#         self.ln(6)
-
-# def create_full_report(data_list):
-#     pdf = ReportPDF()
-#     pdf.set_auto_page_break(auto=True, margin=15)
-#     pdf.add_page()
-
-#     for entry in data_list:
-#         pdf.add_day_report(entry)
-
-#     # Generate PDF content as bytes
-#     pdf_str = pdf.output(dest='S')  # returns a str in Python 3
-#     pdf_bytes = pdf_str.encode('latin-1')
-
-#     # Write to BytesIO
-#     pdf_buffer = BytesIO()
-#     pdf_buffer.write(pdf_bytes)
-#     pdf_buffer.seek(0)
-#     return pdf_buffer
\ No newline at end of file
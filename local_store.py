@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import perf
+
+# Local SQLite file that keeps parsed day reports and weather history between sessions and restarts
+CACHE_PATH = os.environ.get("TEA_ESTATE_CACHE", "local_cache.sqlite")
+
+
+def connect(path=None):
+    """Opens the local cache database, creating the tables on first use."""
+    conn = sqlite3.connect(path or CACHE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS day_reports (
+            date TEXT PRIMARY KEY,
+            revision TEXT NOT NULL,
+            data TEXT NOT NULL,
+            cached_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS weather_days (
+            date TEXT PRIMARY KEY,
+            hourly TEXT NOT NULL,
+            final INTEGER NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+@contextmanager
+def open_db(path=None):
+    """Connection context that commits on success and always closes."""
+    conn = connect(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# --- Day Report Cache ---
+def sheet_revision(worksheet, modified_time):
+    """
+    Revision key for a day sheet: its id and grid size plus the spreadsheet's Drive
+    modifiedTime. Grid size alone misses cell edits and same-size rewrites; modifiedTime
+    changes with any edit to any tab, so after an edit every cached day is fetched again once.
+    """
+    return f"{worksheet.id}:{worksheet.row_count}x{worksheet.col_count}@{modified_time}"
+
+
+def restamp_days(old_modified_time, new_modified_time):
+    """
+    Moves cached days keyed on old_modified_time over to new_modified_time. Used after the
+    app's own writes, which invalidate the days they touch, so those writes do not re-key
+    every other cached day; days stamped with an earlier time (an outside edit) stay stale.
+    """
+    if old_modified_time is None or new_modified_time is None or old_modified_time == new_modified_time:
+        return
+    old_suffix, new_suffix = f"@{old_modified_time}", f"@{new_modified_time}"
+    with open_db() as conn:
+        conn.execute(
+            "UPDATE day_reports SET revision = substr(revision, 1, length(revision) - ?) || ? "
+            "WHERE substr(revision, -?) = ?",
+            (len(old_suffix), new_suffix, len(old_suffix), old_suffix),
+        )
+
+
+@perf.timed("local_store.get_cached_days")
+def get_cached_days(dates):
+    """Returns {date: (revision, day)} for the given dates that are in the cache."""
+    if not dates:
+        return {}
+    cached = {}
+    with open_db() as conn:
+        placeholders = ", ".join("?" for _ in dates)
+        rows = conn.execute(
+            f"SELECT date, revision, data FROM day_reports WHERE date IN ({placeholders})",
+            list(dates),
+        ).fetchall()
+    for date_str, revision, data in rows:
+        cached[date_str] = (revision, json.loads(data))
+    return cached
+
+
+@perf.timed("local_store.put_cached_days")
+def put_cached_days(entries):
+    """Stores (date, revision, day) entries. day may be None for sheets that hold no report."""
+    if not entries:
+        return
+    now = time.time()
+    with open_db() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO day_reports (date, revision, data, cached_at) VALUES (?, ?, ?, ?)",
+            [(date_str, revision, json.dumps(day), now) for date_str, revision, day in entries],
+        )
+
+
+def invalidate_days(dates):
+    """Drops the given dates from the cache so the next read fetches them again."""
+    if not dates:
+        return
+    with open_db() as conn:
+        conn.executemany("DELETE FROM day_reports WHERE date = ?", [(d,) for d in dates])
+
+
+def clear_cache():
+    with open_db() as conn:
+        conn.execute("DELETE FROM day_reports")
+
+
+# --- Weather Store ---
+@perf.timed("local_store.get_weather_days")
+def get_weather_days(dates):
+    """Returns {date: (hourly, final, fetched_at)} for the given dates that are stored."""
+    if not dates:
+        return {}
+    with open_db() as conn:
+        placeholders = ", ".join("?" for _ in dates)
+        rows = conn.execute(
+            f"SELECT date, hourly, final, fetched_at FROM weather_days WHERE date IN ({placeholders})",
+            list(dates),
+        ).fetchall()
+    return {date_str: (json.loads(hourly), bool(final), fetched_at) for date_str, hourly, final, fetched_at in rows}
+
+
+@perf.timed("local_store.put_weather_days")
+def put_weather_days(entries):
+    """Stores (date, hourly, final) entries."""
+    if not entries:
+        return
+    now = time.time()
+    with open_db() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO weather_days (date, hourly, final, fetched_at) VALUES (?, ?, ?, ?)",
+            [(date_str, json.dumps(hourly), int(final), now) for date_str, hourly, final in entries],
+        )
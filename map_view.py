@@ -0,0 +1,210 @@
+import json
+import os
+
+import streamlit as st
+
+MAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map.txt")
+
+# Page around the estate SVG: pan/zoom container, heatmap controls and scripts.
+# __SVG_MAP__ is filled once per process, __SECTION_INFO__ and __SECTION_METRICS__ on every render.
+MAP_TEMPLATE = """
+<script>
+window.SECTION_INFO = __SECTION_INFO__;
+window.SECTION_METRICS = __SECTION_METRICS__;
+</script>
+<div id="heatmap-controls" style="font-family:sans-serif; font-size:14px; margin-bottom:6px;">
+    Colour sections by <select id="metric-select"><option value="">Nothing</option></select>
+    <span id="metric-legend" style="margin-left:12px;"></span>
+</div>
+<div id="svg-container" style="background:white; overflow:auto; width:100%; height:1200px; touch-action:none;">
+    <div id="zoom-wrapper" style="transform: scale(1); transform-origin: 0 0; cursor: grab;">
+    __SVG_MAP__
+    </div>
+</div>
+<script>
+(function() {
+    var zoomWrapper = document.getElementById('zoom-wrapper');
+    var container = document.getElementById('svg-container');
+    var scale = 1;
+    var minScale = 0.2;
+    var maxScale = 5;
+    var pos = { x: 0, y: 0 };
+    var isDragging = false;
+    var dragStart = { x: 0, y: 0 };
+    var lastPos = { x: 0, y: 0 };
+
+    // Zoom with ctrl+scroll
+    container.addEventListener('wheel', function(e) {
+    if (e.ctrlKey) {
+        e.preventDefault();
+        var prevScale = scale;
+        if (e.deltaY < 0) {
+        scale = Math.min(maxScale, scale + 0.1);
+        } else {
+        scale = Math.max(minScale, scale - 0.1);
+        }
+        // Adjust position to zoom to mouse pointer
+        var rect = zoomWrapper.getBoundingClientRect();
+        var mouseX = e.clientX - rect.left;
+        var mouseY = e.clientY - rect.top;
+        pos.x = (pos.x - mouseX) * (scale/prevScale) + mouseX;
+        pos.y = (pos.y - mouseY) * (scale/prevScale) + mouseY;
+        updateTransform();
+    }
+    }, { passive: false });
+
+    // Drag to move
+    zoomWrapper.addEventListener('mousedown', function(e) {
+    isDragging = true;
+    dragStart.x = e.clientX;
+    dragStart.y = e.clientY;
+    lastPos.x = pos.x;
+    lastPos.y = pos.y;
+    zoomWrapper.style.cursor = "grabbing";
+    });
+    window.addEventListener('mousemove', function(e) {
+    if (isDragging) {
+        pos.x = lastPos.x + (e.clientX - dragStart.x);
+        pos.y = lastPos.y + (e.clientY - dragStart.y);
+        updateTransform();
+    }
+    });
+    window.addEventListener('mouseup', function(e) {
+    isDragging = false;
+    zoomWrapper.style.cursor = "grab";
+    });
+
+    // Touch support for mobile
+    var lastTouch = null;
+    zoomWrapper.addEventListener('touchstart', function(e) {
+    if (e.touches.length === 1) {
+        isDragging = true;
+        dragStart.x = e.touches[0].clientX;
+        dragStart.y = e.touches[0].clientY;
+        lastPos.x = pos.x;
+        lastPos.y = pos.y;
+    } else if (e.touches.length === 2) {
+        lastTouch = {
+        x1: e.touches[0].clientX,
+        y1: e.touches[0].clientY,
+        x2: e.touches[1].clientX,
+        y2: e.touches[1].clientY,
+        scale: scale
+        };
+    }
+    });
+    zoomWrapper.addEventListener('touchmove', function(e) {
+    if (e.touches.length === 1 && isDragging) {
+        pos.x = lastPos.x + (e.touches[0].clientX - dragStart.x);
+        pos.y = lastPos.y + (e.touches[0].clientY - dragStart.y);
+        updateTransform();
+    } else if (e.touches.length === 2 && lastTouch) {
+        var dx1 = lastTouch.x2 - lastTouch.x1;
+        var dy1 = lastTouch.y2 - lastTouch.y1;
+        var dx2 = e.touches[1].clientX - e.touches[0].clientX;
+        var dy2 = e.touches[1].clientY - e.touches[0].clientY;
+        var dist1 = Math.sqrt(dx1*dx1 + dy1*dy1);
+        var dist2 = Math.sqrt(dx2*dx2 + dy2*dy2);
+        var scaleChange = dist2 / dist1;
+        scale = Math.max(minScale, Math.min(maxScale, lastTouch.scale * scaleChange));
+        updateTransform();
+    }
+    e.preventDefault();
+    }, { passive: false });
+    window.addEventListener('touchend', function(e) {
+    isDragging = false;
+    lastTouch = null;
+    });
+
+    function updateTransform() {
+    zoomWrapper.style.transform = 'translate(' + pos.x + 'px, ' + pos.y + 'px) scale(' + scale + ')';
+    }
+})();
+</script>
+<script>
+(function() {
+    var metrics = window.SECTION_METRICS || { metrics: [], higher_is_better: [], values: {} };
+    var select = document.getElementById('metric-select');
+    var legend = document.getElementById('metric-legend');
+    var svg = document.querySelector('#zoom-wrapper svg');
+    var painted = [];
+
+    metrics.metrics.forEach(function(name, i) {
+        var option = document.createElement('option');
+        option.value = i;
+        option.textContent = name;
+        select.appendChild(option);
+    });
+
+    // A section is drawn by the element with its id, and by split pieces named id-2, id-3, ...
+    function sectionShapes(id) {
+        var shapes = [];
+        svg.querySelectorAll('[id]').forEach(function(el) {
+            var piece = el.id.indexOf(id + '-') === 0 && /^[0-9]+$/.test(el.id.slice(id.length + 1)) && !(el.id in metrics.values);
+            if (el.id !== id && !piece) return;
+            if (el.tagName === 'g') {
+                el.querySelectorAll('path, polygon, polyline, rect').forEach(function(child) { shapes.push(child); });
+            } else {
+                shapes.push(el);
+            }
+        });
+        return shapes;
+    }
+
+    function paint() {
+        painted.forEach(function(el) { el.style.fill = ''; el.style.fillOpacity = ''; });
+        painted = [];
+        legend.textContent = '';
+        if (select.value === '') return;
+        var index = Number(select.value);
+        var higherIsBetter = metrics.higher_is_better[index];
+        var ids = Object.keys(metrics.values).filter(function(id) { return metrics.values[id][index] !== null; });
+        var vals = ids.map(function(id) { return metrics.values[id][index]; });
+        if (!vals.length) {
+            legend.textContent = 'No data in this window.';
+            return;
+        }
+        var min = Math.min.apply(null, vals);
+        var max = Math.max.apply(null, vals);
+        ids.forEach(function(id) {
+            var t = max > min ? (metrics.values[id][index] - min) / (max - min) : 1;
+            var colour = 'hsl(' + Math.round(120 * (higherIsBetter ? t : 1 - t)) + ', 70%, 50%)';
+            sectionShapes(id).forEach(function(el) {
+                el.style.fill = colour;
+                el.style.fillOpacity = 0.75;
+                painted.push(el);
+            });
+        });
+        legend.innerHTML = '<span style="color:hsl(0,70%,45%)">&#9632;</span> ' + (higherIsBetter ? min : max) +
+            ' &rarr; <span style="color:hsl(120,70%,40%)">&#9632;</span> ' + (higherIsBetter ? max : min) +
+            ' &nbsp;(uncoloured: no data)';
+    }
+
+    select.addEventListener('change', paint);
+})();
+</script>
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def load_map_shell(path=MAP_PATH):
+    """Reads the SVG once per process and returns the page split around the per-render payloads."""
+    with open(path, "r") as f:
+        svg_map = f.read()
+    head, rest = MAP_TEMPLATE.replace("__SVG_MAP__", svg_map).split("__SECTION_INFO__")
+    middle, tail = rest.split("__SECTION_METRICS__")
+    return head, middle, tail
+
+
+def _script_json(value):
+    # Keep sheet text from closing the script tag early
+    return json.dumps(value, separators=(",", ":")).replace("</", "<\\/")
+
+
+def render_map(section_info, section_metrics=None):
+    """
+    The Map page HTML with section_info ({element id: [points]}) as window.SECTION_INFO and
+    section_metrics (analysis.get_section_map_metrics) as window.SECTION_METRICS.
+    """
+    head, middle, tail = load_map_shell()
+    return head + _script_json(section_info) + middle + _script_json(section_metrics) + tail
@@ -0,0 +1,83 @@
+"""
+Copies the per-day report tabs (YYYY-MM-DD) into the monthly layout (monthly_layout),
+one month at a time with one append per month tab.
+
+    python migrate_layout.py --dry-run
+    python migrate_layout.py --start 2024-01-01 --end 2024-12-31
+    python migrate_layout.py --delete-day-sheets
+
+Dates already in the monthly tabs are skipped, so an interrupted run can simply be
+started again. Day tabs are kept unless --delete-day-sheets is given; they are only
+deleted once their date reads back from the monthly tabs.
+Switch the app over with TEA_ESTATE_STORE=monthly.
+"""
+import argparse
+
+from funcs import day_sheet_snapshot, get_spreadsheet, is_day_sheet, refresh_worksheet_index
+from monthly_layout import append_days, fetch_months
+from sheet_parser import parse_day_sheet
+from sheets_fetch import fetch_sheet_values
+
+
+def day_sheets_by_month(worksheets, start=None, end=None):
+    """{"YYYY-MM": [day tab titles]} of the day tabs in the (inclusive, optional) range."""
+    months = {}
+    for title in sorted(t for t in worksheets if is_day_sheet(t)):
+        if (start and title < start) or (end and title > end):
+            continue
+        months.setdefault(title[:7], []).append(title)
+    return months
+
+
+def delete_sheets(spreadsheet, worksheets, titles):
+    if titles:
+        spreadsheet.batch_update({"requests": [{"deleteSheet": {"sheetId": worksheets[t].id}} for t in titles]})
+        for title in titles:
+            del worksheets[title]
+
+
+def migrate(start=None, end=None, dry_run=False, delete_day_sheets=False):
+    spreadsheet = get_spreadsheet()
+    worksheets = refresh_worksheet_index()
+    for month, titles in day_sheets_by_month(worksheets, start, end).items():
+        migrated = {day["date"] for day in fetch_months(spreadsheet, worksheets, [month]).get(month, [])}
+        pending = [title for title in titles if title not in migrated]
+
+        days = []
+        for title, values in fetch_sheet_values(spreadsheet, pending).items():
+            report = parse_day_sheet(title, values)
+            if report is None:
+                print(f"  {title}: not a readable day sheet, left as is")
+                continue
+            for warning in report.warnings:
+                print(f"  {title}: {warning.section}: {warning.message}")
+            days.append(report.to_dict())
+
+        print(f"{month}: {len(titles)} day tabs, {len(titles) - len(pending)} already migrated, {len(days)} to copy")
+        if dry_run:
+            continue
+        if days:
+            append_days(spreadsheet, worksheets, days)
+
+        if delete_day_sheets:
+            # Only delete what reads back from the monthly tabs
+            migrated = {day["date"] for day in fetch_months(spreadsheet, worksheets, [month]).get(month, [])}
+            done = [title for title in titles if title in migrated]
+            delete_sheets(spreadsheet, worksheets, done)
+            print(f"{month}: deleted {len(done)} day tabs")
+    refresh_worksheet_index()
+    day_sheet_snapshot.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", help="first date to migrate (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last date to migrate (YYYY-MM-DD)")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be copied")
+    parser.add_argument("--delete-day-sheets", action="store_true", help="delete day tabs once migrated")
+    args = parser.parse_args()
+    migrate(args.start, args.end, args.dry_run, args.delete_day_sheets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import re
+from datetime import datetime
+
+import pandas as pd
+from gspread.utils import absolute_range_name
+
+import perf
+from payroll import calculate_payments
+from sheets_fetch import fetch_sheet_values
+
+# One pair of append-only worksheets per month: task rows and one metadata row per day.
+# A day's latest submission wins; its Days row is appended last and marks it complete.
+TASKS_SUFFIX = "Tasks"
+DAYS_SUFFIX = "Days"
+MONTHLY_SHEET = re.compile(rf"^\d{{4}}-\d{{2}} ({TASKS_SUFFIX}|{DAYS_SUFFIX})$")
+
+TASK_HEADER = [
+    "Submission", "Date", "Row", "Task", "Worker Name", "Arrived", "Num Tasks", "Work Period",
+    "Section", "Work Type", "Amount (kg)", "Advanced Payment", "Payment",
+]
+DAY_HEADER = [
+    "Submission", "Date", "Transport Login", "Transport Logout", "Transport Payment",
+    "Tea Collect Attended", "Tea Collect Payment", "Weather Period", "Weather", "Avg Temp",
+    "Avg Humidity", "Temp 24hr", "Humidity 24hr", "Additional Notes",
+]
+WORKER_COLUMNS = [
+    "Worker Name", "Arrived", "Num Tasks", "Work Period", "Sections",
+    "Work Type", "Amount (kg)", "Advanced Payment", "Payment",
+]
+
+
+def cell_text(value):
+    """A value as the string Google Sheets gives back for it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def month_sheet_names(month):
+    """(tasks sheet, days sheet) titles for a "YYYY-MM" month."""
+    return f"{month} {TASKS_SUFFIX}", f"{month} {DAYS_SUFFIX}"
+
+
+def is_monthly_sheet(title):
+    return bool(MONTHLY_SHEET.match(title))
+
+
+def _split(value):
+    return [v.strip() for v in value.split(",")] if value else []
+
+
+# --- Day dicts <-> rows ---
+def day_from_payload(sheet_name, payload):
+    """The read_from_gsheet-style day dict for a submission payload (funcs.submission_payload)."""
+    df = pd.DataFrame(payload["df"])
+    if "Work Period" in df.columns:
+        df["Payment"] = calculate_payments(df)
+    df = df.reindex(columns=WORKER_COLUMNS).fillna("")
+    weather = payload["weather"]
+    return {
+        "date": sheet_name,
+        "df": [{col: cell_text(v) for col, v in row.items()} for row in df.to_dict("records")],
+        "transport_login": bool(payload["transport_login"]),
+        "transport_logout": bool(payload["transport_logout"]),
+        "transport_payment": cell_text(payload["transport_payment"]),
+        "tea_collect_attended": bool(payload["tea_collect_attended"]),
+        "tea_collect_payment": cell_text(payload["tea_collect_payment"]),
+        "weather": {
+            "period": f"{weather[0]}:00 - {weather[1]}:00",
+            "word": cell_text(weather[2]),
+            "avg_temp": cell_text(weather[3]),
+            "avg_humidity": cell_text(weather[4]),
+            "temp_24hr": [cell_text(v) for v in weather[5]],
+            "humidity_24hr": [cell_text(v) for v in weather[6]],
+        },
+        "additional_notes": payload.get("additional_notes") or "No additional notes.",
+    }
+
+
+def day_to_rows(day, submission):
+    """(task rows, day row) of one day dict. Workers without tasks keep a single row."""
+    task_rows = []
+    for row_no, worker in enumerate(day.get("df", [])):
+        sections = _split(worker.get("Sections"))
+        work_types = _split(worker.get("Work Type"))
+        amounts = _split(worker.get("Amount (kg)"))
+        for task_no in range(max(len(sections), len(work_types), 1)):
+            task_rows.append([
+                submission, day["date"], row_no, task_no,
+                cell_text(worker.get("Worker Name")), cell_text(worker.get("Arrived")),
+                cell_text(worker.get("Num Tasks")), cell_text(worker.get("Work Period")),
+                sections[task_no] if task_no < len(sections) else "",
+                work_types[task_no] if task_no < len(work_types) else "",
+                amounts[task_no] if task_no < len(amounts) else "",
+                # Day-level amounts are booked on the first task only
+                cell_text(worker.get("Advanced Payment")) if task_no == 0 else "",
+                cell_text(worker.get("Payment")) if task_no == 0 else "",
+            ])
+    weather = day.get("weather") or {}
+    day_row = [
+        submission, day["date"],
+        cell_text(day.get("transport_login")), cell_text(day.get("transport_logout")),
+        cell_text(day.get("transport_payment")),
+        cell_text(day.get("tea_collect_attended")), cell_text(day.get("tea_collect_payment")),
+        cell_text(weather.get("period")), cell_text(weather.get("word")),
+        cell_text(weather.get("avg_temp")), cell_text(weather.get("avg_humidity")),
+        ",".join(cell_text(v) for v in weather.get("temp_24hr", [])),
+        ",".join(cell_text(v) for v in weather.get("humidity_24hr", [])),
+        cell_text(day.get("additional_notes")),
+    ]
+    return task_rows, day_row
+
+
+def _records(values):
+    # Map by the sheet's own header row, so added columns do not break older months
+    if not values:
+        return []
+    header = values[0]
+    return [dict(zip(header, row)) for row in values[1:] if any(row)]
+
+
+def days_from_rows(task_values, day_values):
+    """
+    Day dicts from the values of a month's Tasks and Days sheets (header row included),
+    keeping the latest complete submission of each day, in date order.
+    """
+    latest = {}
+    for rec in _records(day_values):
+        date_str = rec.get("Date")
+        if date_str and rec.get("Submission", "") >= latest.get(date_str, {}).get("Submission", ""):
+            latest[date_str] = rec
+
+    workers = {}
+    for rec in _records(task_values):
+        date_str = rec.get("Date")
+        if date_str not in latest or rec.get("Submission") != latest[date_str]["Submission"]:
+            continue
+        workers.setdefault(date_str, {}).setdefault(int(rec.get("Row") or 0), []).append(rec)
+
+    days = []
+    for date_str in sorted(latest):
+        rec = latest[date_str]
+        df = []
+        for _, tasks in sorted(workers.get(date_str, {}).items()):
+            tasks.sort(key=lambda t: int(t.get("Task") or 0))
+            first = tasks[0]
+            with_task = [t for t in tasks if t.get("Section") or t.get("Work Type")]
+            df.append({
+                "Worker Name": first.get("Worker Name", ""),
+                "Arrived": first.get("Arrived", ""),
+                "Num Tasks": first.get("Num Tasks", ""),
+                "Work Period": first.get("Work Period", ""),
+                "Sections": ", ".join(t.get("Section", "") for t in with_task),
+                "Work Type": ", ".join(t.get("Work Type", "") for t in with_task),
+                "Amount (kg)": ", ".join(t.get("Amount (kg)", "") for t in with_task),
+                "Advanced Payment": first.get("Advanced Payment", ""),
+                "Payment": first.get("Payment", ""),
+            })
+        days.append({
+            "date": date_str,
+            "df": df,
+            "transport_login": rec.get("Transport Login") == "TRUE",
+            "transport_logout": rec.get("Transport Logout") == "TRUE",
+            "transport_payment": rec.get("Transport Payment"),
+            "tea_collect_attended": rec.get("Tea Collect Attended") == "TRUE",
+            "tea_collect_payment": rec.get("Tea Collect Payment"),
+            "weather": {
+                "period": rec.get("Weather Period", ""),
+                "word": rec.get("Weather", ""),
+                "avg_temp": rec.get("Avg Temp", ""),
+                "avg_humidity": rec.get("Avg Humidity", ""),
+                "temp_24hr": _split(rec.get("Temp 24hr")),
+                "humidity_24hr": _split(rec.get("Humidity 24hr")),
+            },
+            "additional_notes": rec.get("Additional Notes", ""),
+            "warnings": [],
+        })
+    return days
+
+
+# --- Sheets I/O ---
+def new_submission_id():
+    # Sortable, so the latest submission of a day is simply the largest id
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _ensure_sheet(spreadsheet, worksheets, title, header):
+    if title not in worksheets:
+        # Sized to the header only; appends grow the grid as rows arrive
+        worksheets[title] = spreadsheet.add_worksheet(title=title, rows=1, cols=len(header))
+        spreadsheet.values_update(absolute_range_name(title), params={"valueInputOption": "RAW"}, body={"values": [header]})
+    return worksheets[title]
+
+
+@perf.timed("monthly_layout.append_days")
+def append_days(spreadsheet, worksheets, days, submission=None):
+    """
+    Appends day dicts to their months' sheets, creating missing sheets in worksheets
+    ({title: Worksheet}, updated in place). Two append calls per month: the task rows
+    first, then the day rows that mark the submissions complete.
+    """
+    submission = submission or new_submission_id()
+    by_month = {}
+    for day in days:
+        by_month.setdefault(day["date"][:7], []).append(day)
+    append = {"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"}
+    for month, month_days in sorted(by_month.items()):
+        tasks_title, days_title = month_sheet_names(month)
+        task_rows, day_rows = [], []
+        for day in month_days:
+            day_task_rows, day_row = day_to_rows(day, submission)
+            task_rows.extend(day_task_rows)
+            day_rows.append(day_row)
+        _ensure_sheet(spreadsheet, worksheets, tasks_title, TASK_HEADER)
+        _ensure_sheet(spreadsheet, worksheets, days_title, DAY_HEADER)
+        if task_rows:
+            spreadsheet.values_append(absolute_range_name(tasks_title), params=append, body={"values": task_rows})
+        spreadsheet.values_append(absolute_range_name(days_title), params=append, body={"values": day_rows})
+    return submission
+
+
+@perf.timed("monthly_layout.fetch_months")
+def fetch_months(spreadsheet, worksheets, months):
+    """
+    {month: day dicts} for the given "YYYY-MM" months. Both sheets of every month go
+    through one batched read; months without sheets are left out.
+    """
+    months = [m for m in months if all(t in worksheets for t in month_sheet_names(m))]
+    titles = [title for m in months for title in month_sheet_names(m)]
+    values = fetch_sheet_values(spreadsheet, titles)
+    return {m: days_from_rows(*(values.get(t, []) for t in month_sheet_names(m))) for m in months}
+
+
+def month_range(start_date, end_date):
+    """Every "YYYY-MM" month touched by a date range."""
+    return [p.strftime("%Y-%m") for p in pd.period_range(start_date, end_date, freq="M")]
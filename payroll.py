@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+import perf
+from config import get_config
+
+TASK_COLUMNS = ["Sections", "Work Type", "Amount (kg)"]
+
+
+def as_bool(series):
+    # Sheets give back "TRUE"/"FALSE" strings, the entry form gives real booleans
+    return series.astype(str).str.strip().str.upper() == "TRUE"
+
+
+def worker_day_frame(data):
+    """
+    Flattens read_from_gsheet output into one row per worker per day,
+    with the day's date in a 'date' column.
+    """
+    records = [dict(row, date=day.get("date")) for day in data for row in day.get("df", [])]
+    return pd.DataFrame(records)
+
+
+def explode_tasks(df):
+    """
+    Splits the comma-joined Sections / Work Type / Amount (kg) columns of worker rows
+    into one row per task. 'row_id' is the index of the source row and 'task_no' the
+    position of the task within it. Rows without any task are dropped.
+    """
+    if df.empty:
+        row_cols = [c for c in df.columns if c not in TASK_COLUMNS]
+        return pd.DataFrame(columns=["row_id", "task_no"] + TASK_COLUMNS + row_cols + ["kg"])
+    parts = []
+    for col in TASK_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series("", index=df.index)
+        split = values.fillna("").astype(str).str.split(",", expand=True)
+        parts.append(split.stack(future_stack=True).dropna().str.strip().rename(col))
+    tasks = pd.concat(parts, axis=1).fillna("")
+    tasks = tasks[(tasks["Work Type"] != "") | (tasks["Sections"] != "")]
+    tasks.index = tasks.index.set_names(["row_id", "task_no"])
+    tasks = tasks.reset_index()
+
+    row_cols = [c for c in df.columns if c not in TASK_COLUMNS]
+    tasks = tasks.join(df[row_cols], on="row_id")
+    tasks["kg"] = pd.to_numeric(tasks["Amount (kg)"], errors="coerce").fillna(0)
+    return tasks
+
+
+def task_payments(tasks):
+    """
+    Adds 'units' and 'Task Payment' columns to exploded tasks.
+
+    The base pay (base_rate x period units) is earned once per worker-day and is shared
+    evenly across that day's paid tasks. Plucked tea is settled against expected_tea_kg
+    over the whole day, so each plucking task carries its kg minus an equal share of
+    the expected amount. Summing the tasks of a day gives the day's payment.
+    Rates and units come from the estate config (config.get_config).
+    """
+    pay = get_config()
+    tasks = tasks.copy()
+    work_type = tasks["Work Type"]
+    is_paid = work_type.isin(pay.paid_work_types)
+    is_plucking = work_type == "Tea_Plucking"
+
+    units = tasks["Work Period"].map(pay.period_unit_map).fillna(0) if "Work Period" in tasks else 0
+    n_paid = is_paid.groupby(tasks["row_id"]).transform("sum").clip(lower=1)
+    n_plucking = is_plucking.groupby(tasks["row_id"]).transform("sum").clip(lower=1)
+
+    base_share = np.where(is_paid, pay.base_rate * units / n_paid, 0)
+    plucking_adjustment = np.where(
+        is_plucking, (tasks["kg"] - pay.expected_tea_kg / n_plucking) * pay.extra_kg_rate, 0
+    )  # positive or negative
+    tasks["units"] = units
+    tasks["Task Payment"] = base_share + plucking_adjustment
+    return tasks
+
+
+# --- Payment Calculation Function ---
+@perf.timed("payroll.calculate_payments")
+def calculate_payments(df, tasks=None):
+    """
+    Payment for every worker row of df (one row per worker-day), as an int Series
+    aligned to df.index. Multi-task rows such as "12, 9" are paid per task.
+    """
+    if tasks is None:
+        tasks = explode_tasks(df)
+    if tasks.empty:
+        return pd.Series(0, index=df.index, dtype=int)
+    tasks = task_payments(tasks)
+    day_pay = tasks.groupby("row_id")["Task Payment"].sum()
+    return day_pay.reindex(df.index, fill_value=0).round().astype(int)
+
+
+def stored_payments(days):
+    """The Payment saved with each worker-day (one row per worker-day) as numbers, NaN where none was saved."""
+    if "Payment" not in days:
+        return pd.Series(np.nan, index=days.index)
+    return pd.to_numeric(days["Payment"], errors="coerce")
+
+
+def day_payments(days, tasks=None):
+    """
+    Payment for every worker-day of days as an int Series. Submitted days keep the Payment
+    saved with them, so past pay does not follow later rate changes; only days without one
+    are paid at the current config rates (calculate_payments).
+    """
+    stored = stored_payments(days)
+    if stored.notna().all():
+        return stored.round().astype(int)
+    return stored.fillna(calculate_payments(days, tasks)).round().astype(int)
+
+
+@perf.timed("payroll.pay_period_summary")
+def pay_period_summary(data, freq=None):
+    """
+    Per-worker pay summary over all days in data (read_from_gsheet output).
+    With freq (a pandas period alias such as "M") the summary is split per pay period.
+    """
+    columns = ["Days Worked", "Tasks", "Tea (kg)", "Gross Pay", "Advances", "Net Pay"]
+    days = worker_day_frame(data)
+    if days.empty:
+        return pd.DataFrame(columns=columns)
+
+    tasks = explode_tasks(days)
+    days["Payment"] = day_payments(days, tasks)
+    days["Advances"] = pd.to_numeric(days["Advanced Payment"], errors="coerce").fillna(0) if "Advanced Payment" in days else 0
+    days["Arrived"] = as_bool(days["Arrived"]) if "Arrived" in days else False
+    days["Tasks"] = tasks.groupby("row_id").size().reindex(days.index, fill_value=0)
+    plucked = tasks[tasks["Work Type"] == "Tea_Plucking"].groupby("row_id")["kg"].sum()
+    days["Tea (kg)"] = plucked.reindex(days.index, fill_value=0)
+
+    keys = ["Worker Name"]
+    if freq:
+        days["Period"] = pd.to_datetime(days["date"]).dt.to_period(freq).astype(str)
+        keys = ["Period", "Worker Name"]
+
+    summary = days.groupby(keys, sort=True).agg(
+        **{
+            "Days Worked": ("Arrived", "sum"),
+            "Tasks": ("Tasks", "sum"),
+            "Tea (kg)": ("Tea (kg)", "sum"),
+            "Gross Pay": ("Payment", "sum"),
+            "Advances": ("Advances", "sum"),
+        }
+    )
+    summary["Net Pay"] = summary["Gross Pay"] - summary["Advances"]
+    return summary[columns]
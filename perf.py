@@ -0,0 +1,185 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Page runs kept per session for the performance panel
+MAX_RUNS = 20
+
+
+@dataclass
+class CallStat:
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes: int = 0
+    errors: int = 0
+    # Lookups of a cached function; hits are the lookups that did not run it
+    lookups: int = 0
+
+
+@dataclass
+class PerfRun:
+    label: str
+    started: float = field(default_factory=time.time)
+    seconds: Optional[float] = None
+    stats: Dict[str, CallStat] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    def record(self, name, seconds=0.0, nbytes=0, error=False, lookup=False):
+        with self._lock:
+            stat = self.stats.setdefault(name, CallStat())
+            if lookup:
+                stat.lookups += 1
+                return
+            stat.calls += 1
+            stat.seconds += seconds
+            stat.max_seconds = max(stat.max_seconds, seconds)
+            stat.bytes += nbytes
+            stat.errors += int(error)
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._t0
+
+    def rows(self):
+        """One dict per recorded name, slowest first, for display."""
+        with self._lock:
+            items = list(self.stats.items())
+        rows = []
+        for name, stat in sorted(items, key=lambda item: -item[1].seconds):
+            rows.append({
+                "name": name,
+                "calls": stat.calls,
+                "total ms": round(stat.seconds * 1000, 1),
+                "avg ms": round(stat.seconds * 1000 / stat.calls, 2) if stat.calls else 0.0,
+                "max ms": round(stat.max_seconds * 1000, 1),
+                "bytes": stat.bytes,
+                "cache hits": max(stat.lookups - stat.calls, 0) if stat.lookups else None,
+                "cache misses": stat.calls if stat.lookups else None,
+                "errors": stat.errors,
+            })
+        return rows
+
+    def to_dict(self):
+        with self._lock:
+            stats = {name: asdict(stat) for name, stat in self.stats.items()}
+        return {"label": self.label, "started": self.started, "seconds": self.seconds, "stats": stats}
+
+
+_current = contextvars.ContextVar("perf_run", default=None)
+
+
+def start_run(label):
+    """Starts recording a page render; calls made from this context are added to it."""
+    run = PerfRun(label)
+    _current.set(run)
+    return run
+
+
+def current_run():
+    return _current.get()
+
+
+def record(name, seconds=0.0, nbytes=0, error=False):
+    run = _current.get()
+    if run is not None:
+        run.record(name, seconds, nbytes, error)
+
+
+def timed(name):
+    """
+    Records count and latency of every call. Placed under a st.cache_* decorator it
+    only sees the misses; pair it with lookup() above the cache decorator for hit rates.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = _current.get()
+            if run is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            error = False
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                run.record(name, time.perf_counter() - start, error=error)
+        return wrapper
+    return decorator
+
+
+def lookup(name):
+    """Counts calls to a cached function (placed above its st.cache_* decorator)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = _current.get()
+            if run is not None:
+                run.record(name, lookup=True)
+            return fn(*args, **kwargs)
+        # Keep st.cache_* helpers such as .clear() reachable
+        for attr in ("clear",):
+            if hasattr(fn, attr):
+                setattr(wrapper, attr, getattr(fn, attr))
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def span(name, nbytes=0):
+    """Times a block; the yielded dict's "bytes" can be set inside it."""
+    info = {"bytes": nbytes}
+    start = time.perf_counter()
+    error = False
+    try:
+        yield info
+    except Exception:
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter() - start, info["bytes"], error)
+
+
+def bind_run(fn):
+    """fn bound to the current run, so work handed to other threads is still recorded there."""
+    run = _current.get()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current.set(run)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+def _sheets_call_name(response):
+    path = urlparse(response.request.url).path
+    if "/drive/" in path:
+        return "sheets.http drive"
+    rest = path.split("/spreadsheets/", 1)[-1].split("/", 1)
+    call = rest[1].split("/", 1)[0] if len(rest) > 1 else "metadata"
+    return f"sheets.http {response.request.method} {call}"
+
+
+def track_session(session):
+    """Records latency and bytes of every Google API response on a requests session."""
+    def hook(response, *args, **kwargs):
+        record(
+            _sheets_call_name(response),
+            response.elapsed.total_seconds(),
+            len(response.content or b""),
+            error=response.status_code >= 400,
+        )
+    session.hooks["response"].append(hook)
+    return session
@@ -0,0 +1,123 @@
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+import perf
+
+# Section marker rows written by funcs.build_day_values (the transport typo is part of the layout)
+TRANSPORT_MARKER = "==== Trasnport ===="
+SECTION_MARKERS = {
+    TRANSPORT_MARKER: "transport",
+    "==== Tea Collect ====": "tea_collect",
+    "==== Weather ====": "weather",
+    "==== Additional Notes ====": "notes",
+}
+
+
+@dataclass
+class ParseWarning:
+    sheet: str
+    section: str
+    message: str
+
+
+@dataclass
+class DayReport:
+    date: str
+    df: List[dict] = field(default_factory=list)
+    transport_login: Optional[bool] = None
+    transport_logout: Optional[bool] = None
+    transport_payment: Optional[str] = None
+    tea_collect_attended: Optional[bool] = None
+    tea_collect_payment: Optional[str] = None
+    weather: dict = field(default_factory=dict)
+    additional_notes: str = ""
+    warnings: List[ParseWarning] = field(default_factory=list)
+
+    def to_dict(self):
+        """The day dict used throughout the app, with warnings as plain dicts."""
+        return asdict(self)
+
+
+def _cell(row, idx):
+    return row[idx] if idx < len(row) else None
+
+
+@perf.timed("sheet_parser.parse_day_sheet")
+def parse_day_sheet(sheet_name, rows):
+    """
+    Parses the values of one day sheet in a single pass, dispatching on the section markers.
+    Returns None for sheets that are not day reports (empty, or without a transport section).
+    Malformed or truncated sections never raise; they are reported in DayReport.warnings.
+    """
+    if not rows or not any(row and row[0].strip() == TRANSPORT_MARKER for row in rows):
+        return None
+
+    report = DayReport(date=sheet_name)
+    header = rows[0]
+    section = "workers"
+    seen = {"workers"}
+    weather_rows = 0
+
+    def warn(message):
+        report.warnings.append(ParseWarning(sheet_name, section, message))
+
+    for row in rows[1:]:
+        label = row[0].strip() if row else ""
+        if label in SECTION_MARKERS:
+            section = SECTION_MARKERS[label]
+            seen.add(section)
+            continue
+        if not any(cell.strip() for cell in row if isinstance(cell, str)):
+            continue
+
+        if section == "workers":
+            # Pad row if shorter than header; blank header cells are only the grid's padding
+            padded_row = row + [""] * (len(header) - len(row))
+            report.df.append({name: value for name, value in zip(header, padded_row) if name.strip()})
+        elif section == "transport":
+            if label == "transport Arrived (Login/Logout)":
+                if len(row) < 3:
+                    warn("transport arrival row is truncated")
+                report.transport_login = _cell(row, 1) == "TRUE"
+                report.transport_logout = _cell(row, 2) == "TRUE"
+            elif label == "transport Paid":
+                report.transport_payment = _cell(row, 1)
+            else:
+                warn(f"unexpected row '{label}'")
+        elif section == "tea_collect":
+            if label == "tea collect Arrived":
+                report.tea_collect_attended = _cell(row, 1) == "TRUE"
+            elif label == "tea collect Received":
+                report.tea_collect_payment = _cell(row, 1)
+            else:
+                warn(f"unexpected row '{label}'")
+        elif section == "weather":
+            if label == "Temp 24hr":
+                report.weather["temp_24hr"] = row[1:]
+            elif label == "Humidity 24hr":
+                report.weather["humidity_24hr"] = row[1:]
+            elif weather_rows == 0:
+                # First row: period, weather word, avg temp, avg humidity
+                if len(row) < 4:
+                    warn("weather summary row is truncated")
+                report.weather["period"] = _cell(row, 0)
+                report.weather["word"] = _cell(row, 1)
+                report.weather["avg_temp"] = _cell(row, 2)
+                report.weather["avg_humidity"] = _cell(row, 3)
+            else:
+                warn(f"unexpected row '{label}'")
+            weather_rows += 1
+        elif section == "notes":
+            if not report.additional_notes:
+                report.additional_notes = row[0]
+
+    if report.transport_payment is None:
+        section = "transport"
+        warn("transport payment row is missing")
+    if "weather" in seen and "avg_temp" not in report.weather:
+        section = "weather"
+        warn("weather summary row is missing")
+    for missing in sorted({"tea_collect", "weather", "notes"} - seen):
+        section = missing
+        warn("section is missing")
+    return report
@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gspread.exceptions import APIError
+from gspread.utils import absolute_range_name, fill_gaps
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+import perf
+
+# Sheets API read quota is 60 requests per minute per user; stay just under it
+READ_REQUESTS_PER_MINUTE = 55
+# Burst of requests allowed before the rate limit kicks in
+READ_BURST = 5
+# Parallel values_batch_get calls in flight
+MAX_CONCURRENCY = 4
+# Day sheets requested per values_batch_get call
+CHUNK_SIZE = 25
+# Attempts per request on 429 / 5xx responses, with exponential backoff between them
+FETCH_ATTEMPTS = 5
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate_per_minute=READ_REQUESTS_PER_MINUTE, capacity=READ_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every fetch in the process, since the quota is per service account
+read_bucket = TokenBucket()
+
+
+def throttle(bucket=None):
+    """Blocks until one more read request fits the quota; every Sheets read goes through here."""
+    with perf.span("sheets_fetch.rate_limit_wait"):
+        (bucket or read_bucket).acquire()
+
+
+def _is_retryable(exc):
+    return isinstance(exc, APIError) and exc.code in RETRYABLE_STATUS
+
+
+@perf.timed("sheets_fetch.batch_get")
+def _batch_get(spreadsheet, chunk, bucket, attempts):
+    ranges = [absolute_range_name(name) for name in chunk]
+    for attempt in Retrying(
+        stop=stop_after_attempt(attempts),
+        wait=wait_exponential(multiplier=1, max=30),
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    ):
+        with attempt:
+            throttle(bucket)
+            resp = spreadsheet.values_batch_get(ranges)
+    # valueRanges come back in the same order as the requested ranges
+    return {
+        name: fill_gaps(value_range.get("values", []))
+        for name, value_range in zip(chunk, resp.get("valueRanges", []))
+    }
+
+
+def fetch_sheet_values(spreadsheet, sheet_names, chunk_size=CHUNK_SIZE, max_workers=MAX_CONCURRENCY, bucket=None, attempts=FETCH_ATTEMPTS):
+    """
+    Fetches the full values of several worksheets with values_batch_get, chunk_size sheets
+    per request and up to max_workers requests in flight, all paced by a token bucket.
+    Returns {sheet_name: rows} in the order of sheet_names, rows padded like get_all_values().
+    """
+    bucket = bucket or read_bucket
+    chunks = [sheet_names[i:i + chunk_size] for i in range(0, len(sheet_names), chunk_size)]
+    if not chunks:
+        return {}
+    if max_workers <= 1 or len(chunks) == 1:
+        results = [_batch_get(spreadsheet, chunk, bucket, attempts) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            fetch = perf.bind_run(lambda chunk: _batch_get(spreadsheet, chunk, bucket, attempts))
+            results = list(pool.map(fetch, chunks))
+
+    fetched = {}
+    for result in results:
+        fetched.update(result)
+    return {name: fetched[name] for name in sheet_names if name in fetched}
@@ -0,0 +1,373 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+import perf
+from analysis import build_section_cube
+from facts import build_fact_tables, concat_fact_tables
+from funcs import (
+    RANGE_CACHE_ENTRIES, RANGE_CACHE_TTL, get_spreadsheet, get_worksheet_index, iter_day_ranges, own_write,
+    read_from_gsheet, read_info_from_gsheet, write_submission,
+)
+from monthly_layout import WORKER_COLUMNS, append_days, day_from_payload, fetch_months, month_range
+from payroll import explode_tasks
+from submit_queue import start_flusher
+
+# Which backend get_store() returns: "sheets" (Google Sheets, one tab per day), "monthly"
+# (Google Sheets, two append-only tabs per month) or "sqlite" (local, works offline)
+STORE_BACKEND = os.environ.get("TEA_ESTATE_STORE", "sheets")
+# Database file of the local backend
+STORE_PATH = os.environ.get("TEA_ESTATE_DB", "estate_reports.sqlite")
+# Months of the monthly layout kept in memory (two years)
+MONTH_CACHE_ENTRIES = 24
+
+class ReportStore(ABC):
+    """
+    Persistence for daily reports. Days are written from a submission payload
+    (funcs.submission_payload) and read back as read_from_gsheet-style day dicts.
+    """
+
+    @abstractmethod
+    def write_day(self, sheet_name, payload):
+        """Stores (or replaces) one day. Returns (success, message)."""
+
+    @abstractmethod
+    def read_range(self, start_date, end_date):
+        """Day dicts for every stored day in the range, in date order."""
+
+    @abstractmethod
+    def read_info(self):
+        """{title: [points]} shown as section popups on the Map page."""
+
+    def iter_ranges(self, ranges):
+        """Yields the day dicts of each (start, end) of ranges in turn, one read per range."""
+        for start_date, end_date in ranges:
+            yield self.read_range(start_date, end_date)
+
+
+class SheetsReportStore(ReportStore):
+    """The Google Sheets layout with one worksheet per day."""
+
+    def write_day(self, sheet_name, payload):
+        return write_submission(sheet_name, payload)
+
+    def read_range(self, start_date, end_date):
+        return read_from_gsheet(start_date, end_date)
+
+    def iter_ranges(self, ranges):
+        # One metadata snapshot for all ranges; each range then fetches only its stale days
+        return iter_day_ranges(ranges)
+
+    def read_info(self):
+        return read_info_from_gsheet()
+
+
+@perf.lookup("store.read_month")
+@st.cache_data(ttl=RANGE_CACHE_TTL, max_entries=MONTH_CACHE_ENTRIES, show_spinner=False)
+@perf.timed("store.read_month")
+def read_month(month):
+    """Day dicts of one "YYYY-MM" month of the monthly layout, cached until the next write."""
+    return fetch_months(get_spreadsheet(), get_worksheet_index(), [month]).get(month, [])
+
+
+class MonthlySheetsReportStore(ReportStore):
+    """
+    The Google Sheets layout with a "YYYY-MM Tasks" and a "YYYY-MM Days" tab per month
+    (see monthly_layout). Day tabs not migrated yet stay readable; where a date is in
+    both layouts the monthly one wins.
+    """
+
+    def write_day(self, sheet_name, payload):
+        try:
+            spreadsheet = get_spreadsheet()
+            # The legacy day tabs are untouched, so their cached days stay current
+            with own_write(spreadsheet):
+                append_days(spreadsheet, get_worksheet_index(), [day_from_payload(sheet_name, payload)])
+        except Exception as e:
+            # A month tab created meanwhile by another session must not break the next attempt
+            get_worksheet_index.clear()
+            return False, f"❌ Error writing to Google Sheets: {e}"
+        read_month.clear()
+        return True, f"✅ Data successfully saved for '{sheet_name}'."
+
+    def _with_months(self, start_date, end_date, legacy_days):
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+        days = {day["date"]: day for day in legacy_days}
+        for month in month_range(start_date, end_date):
+            days.update({day["date"]: day for day in read_month(month) if start <= day["date"] <= end})
+        return [days[date_str] for date_str in sorted(days)]
+
+    @perf.timed("store.monthly.read_range")
+    def read_range(self, start_date, end_date):
+        # read_from_gsheet refreshes the worksheet index, so new month tabs are seen too
+        return self._with_months(start_date, end_date, read_from_gsheet(start_date, end_date))
+
+    def iter_ranges(self, ranges):
+        ranges = list(ranges)
+        for (start_date, end_date), legacy_days in zip(ranges, iter_day_ranges(ranges)):
+            yield self._with_months(start_date, end_date, legacy_days)
+
+    def read_info(self):
+        return read_info_from_gsheet()
+
+
+class SQLiteReportStore(ReportStore):
+    """Local embedded database with proper tables, indexed by date, worker and section."""
+
+    def __init__(self, path=None):
+        self.path = path or STORE_PATH
+        with self._db() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS days (
+                    date TEXT PRIMARY KEY,
+                    transport_login INTEGER,
+                    transport_logout INTEGER,
+                    transport_payment TEXT,
+                    tea_collect_attended INTEGER,
+                    tea_collect_payment TEXT,
+                    weather TEXT NOT NULL,
+                    additional_notes TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS worker_days (
+                    date TEXT NOT NULL,
+                    row_no INTEGER NOT NULL,
+                    worker TEXT NOT NULL,
+                    arrived TEXT,
+                    num_tasks TEXT,
+                    work_period TEXT,
+                    sections TEXT,
+                    work_type TEXT,
+                    amount TEXT,
+                    advance TEXT,
+                    payment TEXT,
+                    PRIMARY KEY (date, row_no)
+                );
+                CREATE INDEX IF NOT EXISTS worker_days_worker ON worker_days (worker, date);
+                CREATE TABLE IF NOT EXISTS tasks (
+                    date TEXT NOT NULL,
+                    row_no INTEGER NOT NULL,
+                    task_no INTEGER NOT NULL,
+                    worker TEXT NOT NULL,
+                    section TEXT,
+                    work_type TEXT,
+                    kg REAL,
+                    PRIMARY KEY (date, row_no, task_no)
+                );
+                CREATE INDEX IF NOT EXISTS tasks_section ON tasks (section, date);
+                CREATE INDEX IF NOT EXISTS tasks_worker ON tasks (worker, date);
+                CREATE TABLE IF NOT EXISTS info (
+                    title TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    point TEXT NOT NULL,
+                    PRIMARY KEY (title, position)
+                );
+                """
+            )
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @perf.timed("store.sqlite.write_day")
+    def write_day(self, sheet_name, payload):
+        try:
+            # Same day dict (payments, cell text, weather) the monthly layout appends
+            day = day_from_payload(sheet_name, payload)
+            tasks = explode_tasks(pd.DataFrame(day["df"], columns=WORKER_COLUMNS))
+
+            with self._db() as conn:
+                for table in ["days", "worker_days", "tasks"]:
+                    conn.execute(f"DELETE FROM {table} WHERE date = ?", (sheet_name,))
+                conn.execute(
+                    "INSERT INTO days VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        sheet_name,
+                        int(day["transport_login"]),
+                        int(day["transport_logout"]),
+                        day["transport_payment"],
+                        int(day["tea_collect_attended"]),
+                        day["tea_collect_payment"],
+                        json.dumps(day["weather"]),
+                        day["additional_notes"],
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO worker_days VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (sheet_name, row_no, *[row[col] for col in WORKER_COLUMNS])
+                        for row_no, row in enumerate(day["df"])
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (sheet_name, int(t.row_id), int(t.task_no), t.worker, t.section or None, t.work_type or None, float(t.kg))
+                        for t in tasks.rename(columns={
+                            "Worker Name": "worker", "Sections": "section", "Work Type": "work_type",
+                        }).itertuples(index=False)
+                    ],
+                )
+        except Exception as e:
+            return False, f"❌ Error writing to the local database: {e}"
+        return True, f"✅ Data successfully saved for '{sheet_name}'."
+
+    @perf.timed("store.sqlite.read_range")
+    def read_range(self, start_date, end_date):
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+        with self._db() as conn:
+            days = conn.execute(
+                "SELECT * FROM days WHERE date BETWEEN ? AND ? ORDER BY date", (start, end)
+            ).fetchall()
+            rows = conn.execute(
+                "SELECT * FROM worker_days WHERE date BETWEEN ? AND ? ORDER BY date, row_no", (start, end)
+            ).fetchall()
+
+        rows_by_date = {}
+        for row in rows:
+            rows_by_date.setdefault(row[0], []).append(dict(zip(WORKER_COLUMNS, row[2:])))
+
+        return [
+            {
+                "date": date_str,
+                "df": rows_by_date.get(date_str, []),
+                "transport_login": bool(transport_login),
+                "transport_logout": bool(transport_logout),
+                "transport_payment": transport_payment,
+                "tea_collect_attended": bool(tea_collect_attended),
+                "tea_collect_payment": tea_collect_payment,
+                "weather": json.loads(weather),
+                "additional_notes": additional_notes,
+            }
+            for (date_str, transport_login, transport_logout, transport_payment,
+                 tea_collect_attended, tea_collect_payment, weather, additional_notes) in days
+        ]
+
+    @perf.timed("store.sqlite.read_info")
+    def read_info(self):
+        with self._db() as conn:
+            rows = conn.execute("SELECT title, point FROM info ORDER BY title, position").fetchall()
+        info = {}
+        for title, point in rows:
+            info.setdefault(title, []).append(point)
+        return info
+
+    def write_info(self, title, points):
+        with self._db() as conn:
+            conn.execute("DELETE FROM info WHERE title = ?", (title,))
+            conn.executemany(
+                "INSERT INTO info VALUES (?, ?, ?)",
+                [(title, position, point) for position, point in enumerate(points)],
+            )
+
+
+@st.cache_resource(show_spinner=False)
+def get_store(backend=None):
+    """The process-wide ReportStore selected by TEA_ESTATE_STORE."""
+    backend = backend or STORE_BACKEND
+    if backend == "sqlite":
+        return SQLiteReportStore()
+    if backend == "monthly":
+        return MonthlySheetsReportStore()
+    return SheetsReportStore()
+
+
+def write_day(sheet_name, payload):
+    """Writes a day through the active store and drops stale analysis frames on success."""
+    success, msg = get_store().write_day(sheet_name, payload)
+    if success:
+        load_analysis_frames.clear()
+    return success, msg
+
+
+@st.cache_resource(show_spinner=False)
+def start_submission_flusher():
+    """Starts the background flusher of the submission journal once per process."""
+    return start_flusher(write_day)
+
+
+def week_ranges(start_date, end_date):
+    """
+    Splits a date range into Monday-to-Sunday (start, end) weeks clipped to the range,
+    so overlapping ranges share their inner weeks.
+    """
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    ranges = []
+    week_start = start_date
+    while week_start <= end_date:
+        week_end = min(end_date, week_start + timedelta(days=6 - week_start.weekday()))
+        ranges.append((week_start, week_end))
+        week_start = week_end + timedelta(days=1)
+    return ranges
+
+
+def month_ranges(start_date, end_date):
+    """Splits a date range into calendar-month (start, end) chunks clipped to the range."""
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    ranges = []
+    month_start = start_date
+    while month_start <= end_date:
+        next_month = (month_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        month_end = min(end_date, next_month - timedelta(days=1))
+        ranges.append((month_start, month_end))
+        month_start = month_end + timedelta(days=1)
+    return ranges
+
+
+def iter_range(start_date, end_date, chunks=week_ranges):
+    """
+    Yields (chunk start, chunk end, day dicts) for each chunk of a range (weeks by
+    default, see month_ranges), in date order. Each step reads only its own chunk from
+    the active store, so the first chunk is available before the rest is fetched.
+    """
+    ranges = chunks(start_date, end_date)
+    for (chunk_start, chunk_end), days in zip(ranges, get_store().iter_ranges(ranges)):
+        yield chunk_start, chunk_end, days
+
+
+def analysis_frames(chunks):
+    """
+    Combines the (days, task facts, daily facts) of consecutive chunks of a range into
+    (data, task fact table, daily fact table, section cube) for the analysis views.
+    """
+    data = [day for days, _, _ in chunks for day in days]
+    tasks, daily = concat_fact_tables([(tasks, daily) for _, tasks, daily in chunks])
+    return data, tasks, daily, build_section_cube(tasks)
+
+
+@perf.lookup("store.load_analysis_frames")
+@st.cache_data(ttl=RANGE_CACHE_TTL, max_entries=RANGE_CACHE_ENTRIES, show_spinner=False)
+@perf.timed("store.load_analysis_frames")
+def load_analysis_frames(start_date, end_date):
+    """
+    Reads a date range a week at a time and builds everything the analysis views need
+    from it: (data, task fact table, daily fact table, section cube).
+    """
+    return analysis_frames([(days, *build_fact_tables(days)) for _, _, days in iter_range(start_date, end_date)])
@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+# Local journal of Final Submits, kept until they reach Google Sheets
+QUEUE_PATH = os.environ.get("TEA_ESTATE_QUEUE", "submissions.sqlite")
+# Attempts per flush of one submission, with exponential backoff between them
+FLUSH_ATTEMPTS = 4
+FLUSH_BACKOFF_BASE = 2
+FLUSH_BACKOFF_MAX = 60
+# Seconds between background flushes
+FLUSH_INTERVAL = 30
+# Seconds after which a send that never recorded its outcome (e.g. the process died) may be claimed again
+CLAIM_TIMEOUT = 600
+
+PENDING, FAILED, SENDING, SENT, SUPERSEDED = "pending", "failed", "sending", "sent", "superseded"
+
+# One lock per day, so two sends of the same day never overlap within this process
+_sheet_locks = {}
+_sheet_locks_guard = threading.Lock()
+
+
+class SubmissionError(Exception):
+    pass
+
+
+def connect(path=None):
+    """Opens the submission journal (SQLite in WAL mode), creating it on first use."""
+    conn = sqlite3.connect(path or QUEUE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sheet_name TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT NOT NULL DEFAULT '',
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS submissions_status ON submissions (status, sheet_name)")
+    return conn
+
+
+@contextmanager
+def open_db(path=None):
+    conn = connect(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def enqueue_submission(sheet_name, payload, path=None):
+    """
+    Journals a day's submission before anything is sent and returns its id.
+    Payloads are never rewritten; an older unsent (or in-flight) entry for the same
+    day is only marked superseded, so each day is flushed once with its latest data.
+    """
+    now = time.time()
+    with open_db(path) as conn:
+        conn.execute(
+            "UPDATE submissions SET status = ?, updated_at = ? WHERE sheet_name = ? AND status IN (?, ?, ?)",
+            (SUPERSEDED, now, sheet_name, PENDING, FAILED, SENDING),
+        )
+        cur = conn.execute(
+            "INSERT INTO submissions (sheet_name, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (sheet_name, json.dumps(payload), PENDING, now, now),
+        )
+        return cur.lastrowid
+
+
+def list_submissions(statuses=(PENDING, FAILED, SENDING), path=None):
+    """Journal entries with the given statuses, oldest first, without their payloads."""
+    placeholders = ", ".join("?" for _ in statuses)
+    with open_db(path) as conn:
+        rows = conn.execute(
+            f"SELECT id, sheet_name, status, attempts, last_error, created_at, updated_at "
+            f"FROM submissions WHERE status IN ({placeholders}) ORDER BY id",
+            list(statuses),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _sheet_lock(sheet_name):
+    with _sheet_locks_guard:
+        return _sheet_locks.setdefault(sheet_name, threading.Lock())
+
+
+def _claim(entry_id, path=None):
+    """Marks an entry as being sent, unless someone else holds it. Returns its row, or None."""
+    now = time.time()
+    with open_db(path) as conn:
+        cur = conn.execute(
+            "UPDATE submissions SET status = ?, updated_at = ? "
+            "WHERE id = ? AND (status IN (?, ?) OR (status = ? AND updated_at < ?))",
+            (SENDING, now, entry_id, PENDING, FAILED, SENDING, now - CLAIM_TIMEOUT),
+        )
+        if cur.rowcount != 1:
+            return None
+        return conn.execute("SELECT sheet_name, payload FROM submissions WHERE id = ?", (entry_id,)).fetchone()
+
+
+def _is_superseded(entry_id, sheet_name, path=None):
+    """Whether a newer entry exists for the day, or this one was marked superseded meanwhile."""
+    with open_db(path) as conn:
+        newer = conn.execute(
+            "SELECT 1 FROM submissions WHERE sheet_name = ? AND id > ? LIMIT 1", (sheet_name, entry_id)
+        ).fetchone()
+        if newer is not None:
+            conn.execute(
+                "UPDATE submissions SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (SUPERSEDED, time.time(), entry_id, SENDING),
+            )
+            return True
+        row = conn.execute("SELECT status FROM submissions WHERE id = ?", (entry_id,)).fetchone()
+        return row["status"] != SENDING
+
+
+def _set_status(entry_id, status, attempts, last_error, path=None):
+    # Only the claim holder records an outcome, and never over a newer submission's superseded mark
+    with open_db(path) as conn:
+        conn.execute(
+            "UPDATE submissions SET status = ?, attempts = attempts + ?, last_error = ?, updated_at = ? "
+            "WHERE id = ? AND status = ?",
+            (status, attempts, last_error, time.time(), entry_id, SENDING),
+        )
+
+
+def flush_submission(entry_id, writer, attempts=FLUSH_ATTEMPTS, path=None):
+    """
+    Sends one journaled submission through writer(sheet_name, payload) -> (success, msg),
+    retrying with exponential backoff. Returns (success, msg) and records the outcome.
+    The entry is claimed first, so the background flusher and a Final Submit never send
+    it twice at once, and every attempt first checks that no newer submission of the day
+    exists, so an older payload can never overwrite a newer one.
+    """
+    row = _claim(entry_id, path)
+    if row is None:
+        with open_db(path) as conn:
+            held = conn.execute("SELECT 1 FROM submissions WHERE id = ? AND status = ?", (entry_id, SENDING)).fetchone()
+        return True, "⏳ Already being uploaded in the background." if held else "Nothing to send."
+
+    tries = 0
+    sheet_name = row["sheet_name"]
+    try:
+        for attempt in Retrying(
+            stop=stop_after_attempt(attempts),
+            wait=wait_exponential(multiplier=FLUSH_BACKOFF_BASE, max=FLUSH_BACKOFF_MAX),
+            retry=retry_if_exception_type(SubmissionError),
+            reraise=True,
+        ):
+            with attempt, _sheet_lock(sheet_name):
+                if _is_superseded(entry_id, sheet_name, path):
+                    return True, "Superseded by a newer submission."
+                tries += 1
+                success, msg = writer(sheet_name, json.loads(row["payload"]))
+                if not success:
+                    raise SubmissionError(msg)
+    except SubmissionError as e:
+        _set_status(entry_id, FAILED, tries, str(e), path)
+        return False, str(e)
+    _set_status(entry_id, SENT, tries, "", path)
+    return True, msg
+
+
+def flush_pending(writer, attempts=FLUSH_ATTEMPTS, path=None):
+    """Flushes every pending or failed submission. Returns {entry_id: (success, msg)}."""
+    results = {}
+    for entry in list_submissions(path=path):
+        results[entry["id"]] = flush_submission(entry["id"], writer, attempts, path)
+    return results
+
+
+def start_flusher(writer, interval=FLUSH_INTERVAL, path=None):
+    """Starts a daemon thread that keeps flushing the journal every interval seconds."""
+    def run():
+        while True:
+            try:
+                flush_pending(writer, path=path)
+            except Exception:
+                pass  # the journal keeps the entries; try again next round
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="submission-flusher", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO, os.path.join(REPO, "benchmarks")]
+
+import local_store  # noqa: E402
+import submit_queue  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def local_files(tmp_path, monkeypatch):
+    """Every test gets its own local cache and submission journal."""
+    monkeypatch.setattr(local_store, "CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(submit_queue, "QUEUE_PATH", str(tmp_path / "submissions.sqlite"))
+    return tmp_path
+
+
+class MeteoServer:
+    """Local stand-in for the Open-Meteo endpoints; status != 200 makes every request fail."""
+
+    def __init__(self):
+        self.status = 200
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                server.requests.append((url.path, query))
+                if server.status != 200:
+                    self.send_response(server.status)
+                    self.end_headers()
+                    return
+                body = json.dumps({"hourly": server.hourly(query["start_date"], query["end_date"])}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def hourly(self, start, end):
+        day, end = date.fromisoformat(start), date.fromisoformat(end)
+        times = []
+        while day <= end:
+            times += [f"{day}T{h:02d}:00" for h in range(24)]
+            day += timedelta(days=1)
+        return {
+            "time": times,
+            "temperature_2m": [20.0] * len(times),
+            "weather_code": [3] * len(times),
+            "relative_humidity_2m": [80] * len(times),
+        }
+
+
+@pytest.fixture
+def meteo(monkeypatch):
+    import weather
+
+    server = MeteoServer()
+    monkeypatch.setattr(weather, "FORECAST_URL", server.url + "/v1/forecast")
+    monkeypatch.setattr(weather, "ARCHIVE_URL", server.url + "/v1/archive")
+    yield server
+    server.httpd.shutdown()
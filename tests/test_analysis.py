@@ -0,0 +1,29 @@
+import pandas as pd
+
+from analysis import build_section_cube, get_section_status
+from facts import build_task_facts
+
+
+def day(date_str, rows):
+    return {"date": date_str, "df": [
+        {"Worker Name": name, "Arrived": "TRUE", "Num Tasks": str(len(work.split(","))), "Work Period": "7.30-4.30",
+         "Sections": sections, "Work Type": work, "Amount (kg)": kg, "Advanced Payment": "0", "Payment": "0"}
+        for name, sections, work, kg in rows
+    ]}
+
+
+def test_worker_days_count_each_worker_once_per_section_and_day():
+    data = [
+        day("2024-03-04", [
+            ("M1 - Kokila", "A1, A1", "Tea_Plucking, Weeding", "20, 0"),
+            ("F2 - Nimali", "A1, B2", "Tea_Plucking, Weeding", "15, 0"),
+        ]),
+        day("2024-03-05", [("M1 - Kokila", "A1", "Tea_Plucking", "18")]),
+    ]
+    cube = build_section_cube(build_task_facts(data))
+
+    status = get_section_status(cube, ["A1", "B2"], as_of=pd.Timestamp("2024-03-05"))
+
+    assert status["Worker Days"].to_dict() == {"A1": 3, "B2": 1}
+    assert status.loc["A1", "Tea kg"] == 53
+    assert cube.loc[("A1", pd.Timestamp("2024-03-04"), "Weeding"), "day_workers"] == 2
@@ -0,0 +1,100 @@
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+import config
+import payroll
+from config import config_from_rows, get_config, read_config_file
+from facts import build_task_facts
+from sheet_parser import parse_day_sheet
+from synthetic import generate_day_sheets
+
+ROWS = [
+    ["version", "7"],
+    ["workers", " M1 - Kokila ", "M2 - Sunil", ""],
+    ["work_periods", "7.30-1.30", "7.30-10.30", "7.30-4.30"],
+    ["period_units", "2", "1", "3.5"],
+    ["base_rate", "400"],
+    [],
+    ["", "ignored"],
+    ["sections"],
+]
+
+
+def test_sheet_rows_override_the_base():
+    base = read_config_file()
+    config = config_from_rows(ROWS, base)
+
+    assert config.version == f"{base.version}+sheet 7"
+    assert config.workers == ["M1 - Kokila", "M2 - Sunil"]
+    assert config.period_unit_map == {"7.30-1.30": 2.0, "7.30-10.30": 1.0, "7.30-4.30": 3.5}
+    assert config.base_rate == 400.0
+    # Keys left out, or without values, keep their base value
+    assert (config.sections, config.work_types) == (base.sections, base.work_types)
+
+
+def test_fractional_period_units_are_kept_in_the_task_facts(monkeypatch):
+    config = get_config()
+    monkeypatch.setattr(payroll, "get_config", lambda: replace(config, period_unit_map={"7.30-4.30": 1.5}))
+    sheets = generate_day_sheets(n_workers=3, days=3, start=date(2024, 3, 4))
+    data = [parse_day_sheet(name, values).to_dict() for name, values in sheets.items()]
+
+    tasks = build_task_facts(data)
+    full_days = tasks[tasks["period"] == "7.30-4.30"]
+
+    assert not full_days.empty
+    assert (full_days["units"] == 1.5).all()
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    """Config worksheet stand-in recording each read range; set .version or .offline to change it."""
+    class Sheet:
+        version, offline, reads = "7", False, []
+
+        def read(self, range_name=None):
+            self.reads.append(range_name)
+            if self.offline:
+                raise ConnectionError("offline")
+            return [["version", self.version]] + ([] if range_name else ROWS[1:2])
+
+    sheet = Sheet()
+    sheet.reads = []
+    monkeypatch.setattr(config, "CONFIG_SOURCE", "sheet")
+    monkeypatch.setattr(config, "_read_sheet", sheet.read)
+    monkeypatch.setattr(config, "_last_version", [])
+    config.config_version.clear()
+    config.load_config.clear()
+    yield sheet
+    config.config_version.clear()
+    config.load_config.clear()
+
+
+def test_config_is_reloaded_only_when_its_version_changes(sheet):
+    first = get_config()
+    assert first.version.endswith("+sheet 7")
+    assert sheet.reads == ["A1:B1", None]
+
+    # Within CONFIG_TTL nothing is read
+    assert get_config() is first
+    assert sheet.reads == ["A1:B1", None]
+
+    # A version check that finds the same version does not reload
+    config.config_version.clear()
+    assert get_config() is first
+    assert sheet.reads == ["A1:B1", None, "A1:B1"]
+
+    sheet.version = "8"
+    config.config_version.clear()
+    assert get_config().version.endswith("+sheet 8")
+    assert sheet.reads == ["A1:B1", None, "A1:B1", "A1:B1", None]
+
+
+def test_unreachable_sheet_keeps_the_last_config(sheet):
+    first = get_config()
+    sheet.offline = True
+    config.config_version.clear()
+
+    assert get_config() is first
+    assert sheet.reads == ["A1:B1", None, "A1:B1"]
@@ -0,0 +1,48 @@
+from datetime import date
+import re
+from io import BytesIO
+from zipfile import ZipFile
+
+import pytest
+
+import sheets_fetch
+from exports import iter_months, payroll_xlsx
+from fake_gspread import FakeSpreadsheet, install
+from synthetic import generate_day_sheets
+
+START, END = date(2024, 1, 1), date(2024, 3, 31)
+SHEETS = generate_day_sheets(n_workers=3, days=91, start=START)
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch):
+    monkeypatch.setattr(sheets_fetch, "read_bucket", sheets_fetch.TokenBucket(rate_per_minute=1e9, capacity=1e9))
+    spreadsheet = FakeSpreadsheet(SHEETS)
+    install(spreadsheet)
+    return spreadsheet
+
+
+def fetches(titles):
+    return -(-len(titles) // sheets_fetch.CHUNK_SIZE)
+
+
+def test_months_are_read_one_at_a_time(spreadsheet):
+    by_month = {}
+    for title in sorted(SHEETS):
+        by_month.setdefault(title[:7], []).append(title)
+
+    months = iter_months(START, END)
+    month, days = next(months)
+    assert (month, [day["date"] for day in days]) == ("2024-01", by_month["2024-01"])
+    # Later months are not fetched before they are reached
+    assert spreadsheet.calls["values_batch_get"] == fetches(by_month["2024-01"])
+
+    rest = list(months)
+    assert [(month, [day["date"] for day in days]) for month, days in rest] == list(by_month.items())[1:]
+    assert spreadsheet.calls["worksheets"] == 1
+
+
+def test_payroll_xlsx_has_two_sheets_per_month(spreadsheet):
+    workbook = ZipFile(BytesIO(payroll_xlsx(START, END))).read("xl/workbook.xml").decode()
+
+    assert re.findall(r'<sheet name="([^"]+)"', workbook) == [f"{kind} 2024-0{m}" for m in (1, 2, 3) for kind in ("Payroll", "Attendance")]
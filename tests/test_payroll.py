@@ -0,0 +1,78 @@
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+import payroll
+from analysis import get_worker_summary
+from config import get_config
+from facts import build_task_facts
+from payroll import calculate_payments, pay_period_summary, worker_day_frame
+from sheet_parser import parse_day_sheet
+from synthetic import generate_day_sheets
+
+
+@pytest.fixture
+def data():
+    # Payments are saved at the current rates, like a Final Submit does
+    sheets = generate_day_sheets(n_workers=6, n_sections=5, days=20, start=date(2024, 3, 4))
+    return [parse_day_sheet(name, values).to_dict() for name, values in sheets.items()]
+
+
+@pytest.fixture
+def raised_rates(monkeypatch):
+    config = get_config()
+    monkeypatch.setattr(payroll, "get_config", lambda: replace(config, base_rate=config.base_rate * 2))
+
+
+def saved_pay(data):
+    pay = {}
+    for day in data:
+        for row in day["df"]:
+            pay[row["Worker Name"]] = pay.get(row["Worker Name"], 0) + int(row["Payment"])
+    return pay
+
+
+def test_rate_change_keeps_the_saved_pay_of_past_days(data, raised_rates):
+    expected = saved_pay(data)
+
+    assert pay_period_summary(data)["Gross Pay"].to_dict() == expected
+    tasks = build_task_facts(data)
+    assert get_worker_summary(tasks)["Total Pay"].to_dict() == expected
+    # Task shares still add up to the saved day's pay
+    by_day = tasks.groupby(["date", "worker"], observed=True)
+    assert (by_day["payment"].sum().round() == by_day["day_payment"].sum()).all()
+
+
+def test_days_without_a_saved_payment_use_the_current_rates(data, raised_rates):
+    day = data[0]
+    saved = sum(int(row["Payment"]) for row in day["df"])
+    for row in day["df"]:
+        row["Payment"] = ""
+    current = calculate_payments(worker_day_frame([day])).sum()
+
+    assert current > saved
+    assert pay_period_summary([day])["Gross Pay"].sum() == current
+    assert build_task_facts([day])["day_payment"].sum() == current
+
+
+def test_days_without_advance_column(data):
+    for day in data:
+        for row in day["df"]:
+            del row["Advanced Payment"]
+
+    summary = pay_period_summary(data)
+
+    assert (summary["Advances"] == 0).all()
+    assert (summary["Net Pay"] == summary["Gross Pay"]).all()
+
+
+def test_task_facts_without_advance_column(data):
+    for day in data:
+        for row in day["df"]:
+            del row["Advanced Payment"]
+
+    tasks = build_task_facts(data)
+
+    assert not tasks.empty
+    assert (tasks["advance"] == 0).all()
@@ -0,0 +1,196 @@
+import random
+
+import pytest
+
+from sheet_parser import SECTION_MARKERS, TRANSPORT_MARKER, parse_day_sheet
+from synthetic import generate_day_values, roster, section_names
+
+DAY = "2024-03-04"
+MARKERS = {section: marker for marker, section in SECTION_MARKERS.items()}
+
+
+def day_values(seed=0, n_workers=3):
+    return generate_day_values(random.Random(seed), roster(n_workers), section_names(4))
+
+
+def split_sections(values):
+    """(worker rows incl. header, {section: rows after its marker}) of a day sheet."""
+    workers, sections, current = [], {}, None
+    for row in values:
+        if row[0] in SECTION_MARKERS:
+            current = SECTION_MARKERS[row[0]]
+            sections[current] = []
+        elif current is None:
+            workers.append(row)
+        else:
+            sections[current].append(row)
+    return workers, sections
+
+
+def join_sections(workers, sections, order):
+    values = [list(row) for row in workers]
+    for section in order:
+        values.append([MARKERS[section]])
+        values.extend(list(row) for row in sections[section])
+    return values
+
+
+def trim_row(row):
+    # Sheets drops trailing empty cells from every row it returns
+    while row and row[-1] == "":
+        row = row[:-1]
+    return row
+
+
+def warnings(report):
+    return [(w.section, w.message) for w in report.warnings]
+
+
+def fields(report):
+    day = report.to_dict()
+    del day["warnings"]
+    return day
+
+
+@pytest.fixture
+def complete():
+    return day_values()
+
+
+# --- Well-formed layouts ---
+def test_complete_sheet_parses_every_field(complete):
+    report = parse_day_sheet(DAY, complete)
+
+    assert warnings(report) == []
+    assert [w["Worker Name"] for w in report.df] == roster(3)
+    assert report.transport_payment == complete[6][1]
+    assert report.tea_collect_payment == complete[9][1]
+    assert set(report.weather) == {"period", "word", "avg_temp", "avg_humidity", "temp_24hr", "humidity_24hr"}
+    assert len(report.weather["temp_24hr"]) == 24
+    assert report.additional_notes
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_trimmed_rows_parse_like_padded_rows(seed):
+    values = day_values(seed)
+    padded = parse_day_sheet(DAY, values)
+    trimmed = parse_day_sheet(DAY, [trim_row(row) for row in values])
+
+    assert warnings(trimmed) == []
+    # Worker rows are padded back to the header
+    assert trimmed.df == padded.df
+    assert fields(trimmed) == fields(padded)
+
+
+@pytest.mark.parametrize("order", [
+    ["tea_collect", "transport", "weather", "notes"],
+    ["transport", "notes", "weather", "tea_collect"],
+    ["notes", "weather", "tea_collect", "transport"],
+])
+def test_reordered_sections_parse_the_same(complete, order):
+    workers, sections = split_sections(complete)
+    report = parse_day_sheet(DAY, join_sections(workers, sections, order))
+
+    assert warnings(report) == []
+    assert fields(report) == fields(parse_day_sheet(DAY, complete))
+
+
+# --- Missing and truncated sections ---
+@pytest.mark.parametrize("missing", ["tea_collect", "weather", "notes"])
+def test_missing_section_is_reported(complete, missing):
+    workers, sections = split_sections(complete)
+    order = [s for s in ["transport", "tea_collect", "weather", "notes"] if s != missing]
+    report = parse_day_sheet(DAY, join_sections(workers, sections, order))
+
+    assert warnings(report) == [(missing, "section is missing")]
+    expected = fields(parse_day_sheet(DAY, complete))
+    if missing == "tea_collect":
+        assert (report.tea_collect_attended, report.tea_collect_payment) == (None, None)
+    elif missing == "weather":
+        assert report.weather == {}
+    else:
+        assert report.additional_notes == ""
+    assert report.df == expected["df"]
+    assert report.transport_payment == expected["transport_payment"]
+
+
+@pytest.mark.parametrize("values", [[], [["Worker Name"]], [["Worker Name"], ["==== Tea Collect ===="]]])
+def test_sheets_without_transport_section_are_not_day_reports(values):
+    assert parse_day_sheet(DAY, values) is None
+
+
+def test_sheet_cut_after_transport_marker(complete):
+    cut = complete[:complete.index([TRANSPORT_MARKER] + [""] * (len(complete[0]) - 1)) + 1]
+    report = parse_day_sheet(DAY, cut)
+
+    assert warnings(report) == [
+        ("transport", "transport payment row is missing"),
+        ("notes", "section is missing"),
+        ("tea_collect", "section is missing"),
+        ("weather", "section is missing"),
+    ]
+    assert len(report.df) == 3
+    assert report.transport_login is None
+
+
+def test_truncated_transport_arrival_row(complete):
+    workers, sections = split_sections(complete)
+    sections["transport"][0] = ["transport Arrived (Login/Logout)", "TRUE"]
+    report = parse_day_sheet(DAY, join_sections(workers, sections, list(MARKERS)))
+
+    assert warnings(report) == [("transport", "transport arrival row is truncated")]
+    assert (report.transport_login, report.transport_logout) == (True, False)
+
+
+def test_truncated_and_missing_weather_summary(complete):
+    workers, sections = split_sections(complete)
+    summary = sections["weather"][0]
+
+    sections["weather"][0] = summary[:2]
+    report = parse_day_sheet(DAY, join_sections(workers, sections, list(MARKERS)))
+    assert warnings(report) == [("weather", "weather summary row is truncated")]
+    assert (report.weather["word"], report.weather["avg_temp"]) == (summary[1], None)
+
+    sections["weather"] = sections["weather"][1:]
+    report = parse_day_sheet(DAY, join_sections(workers, sections, list(MARKERS)))
+    assert warnings(report) == [("weather", "weather summary row is missing")]
+    assert len(report.weather["humidity_24hr"]) == 24
+
+
+def test_unexpected_rows_are_reported_and_skipped(complete):
+    workers, sections = split_sections(complete)
+    sections["transport"].insert(1, ["transport Driver", "Sunil"])
+    sections["tea_collect"].append(["tea collect Lorry", "LB-1234"])
+    sections["weather"].append(["Rain mm", "12"])
+    report = parse_day_sheet(DAY, join_sections(workers, sections, list(MARKERS)))
+
+    assert warnings(report) == [
+        ("transport", "unexpected row 'transport Driver'"),
+        ("tea_collect", "unexpected row 'tea collect Lorry'"),
+        ("weather", "unexpected row 'Rain mm'"),
+    ]
+    assert fields(report) == fields(parse_day_sheet(DAY, complete))
+
+
+# --- Fuzzed layouts ---
+@pytest.mark.parametrize("seed", range(40))
+def test_fuzzed_layouts_never_raise(seed):
+    rng = random.Random(seed)
+    workers, sections = split_sections(day_values(seed, n_workers=rng.randint(0, 4)))
+    order = rng.sample(list(MARKERS), rng.randint(1, 4))
+    values = join_sections(workers, sections, order)
+    values = values[:rng.randint(1, len(values))]
+    if rng.random() < 0.5:
+        values = [trim_row(row) or [""] for row in values]
+
+    report = parse_day_sheet(DAY, values)
+
+    if not any(row[0] == TRANSPORT_MARKER for row in values):
+        assert report is None
+        return
+    present = {SECTION_MARKERS[row[0]] for row in values if row[0] in SECTION_MARKERS}
+    missing = {section for section, message in warnings(report) if message == "section is missing"}
+    assert missing == {"tea_collect", "weather", "notes"} - present
+    assert (report.transport_payment is None) == (("transport", "transport payment row is missing") in warnings(report))
+    for warning in report.warnings:
+        assert warning.sheet == DAY
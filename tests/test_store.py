@@ -0,0 +1,129 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import migrate_layout
+import sheets_fetch
+from analysis import build_section_cube
+from facts import build_fact_tables
+from fake_gspread import FakeSpreadsheet, install
+from funcs import day_sheet_snapshot, read_from_gsheet, submission_payload, write_submission
+from monthly_layout import day_from_payload
+from store import (
+    MonthlySheetsReportStore, ReportStore, SQLiteReportStore, iter_range, load_analysis_frames, month_ranges, read_month,
+    week_ranges,
+)
+from synthetic import generate_day_sheets
+
+START, END = date(2024, 1, 1), date(2024, 2, 29)
+SHEETS = generate_day_sheets(n_workers=3, days=60, start=START)
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch):
+    monkeypatch.setattr(sheets_fetch, "read_bucket", sheets_fetch.TokenBucket(rate_per_minute=1e9, capacity=1e9))
+    spreadsheet = FakeSpreadsheet(SHEETS)
+    install(spreadsheet)
+    return spreadsheet
+
+
+def test_iter_range_reads_a_week_per_step(spreadsheet):
+    weeks = iter_range(START, END)
+    week_start, week_end, days = next(weeks)
+    # Only the first week has been fetched when it is yielded
+    assert [day["date"] for day in days] == sorted(d for d in SHEETS if d <= week_end.isoformat())
+    assert spreadsheet.calls["values_batch_get"] == 1
+
+    weeks = [(week_start, week_end, days)] + list(weeks)
+    assert [(s, e) for s, e, _ in weeks] == week_ranges(START, END)
+    for week_start, week_end, days in weeks:
+        assert all(week_start.isoformat() <= day["date"] <= week_end.isoformat() for day in days)
+    assert [day["date"] for _, _, days in weeks for day in days] == sorted(SHEETS)
+    # One metadata call for the whole range and one batched fetch per week
+    assert spreadsheet.calls["worksheets"] == 1
+    assert spreadsheet.calls["values_batch_get"] == len(weeks)
+
+
+def test_month_chunks(spreadsheet):
+    months = list(iter_range(date(2024, 1, 20), END, chunks=month_ranges))
+
+    assert [(s, e) for s, e, _ in months] == [(date(2024, 1, 20), date(2024, 1, 31)), (date(2024, 2, 1), END)]
+    for month_start, month_end, days in months:
+        assert [day["date"] for day in days] == [d for d in sorted(SHEETS) if month_start.isoformat() <= d <= month_end.isoformat()]
+    assert spreadsheet.calls["worksheets"] == 1
+
+
+def test_analysis_frames_match_a_single_build(spreadsheet):
+    data, tasks, daily, cube = load_analysis_frames(START, END)
+    whole_tasks, whole_daily = build_fact_tables(data)
+
+    assert_frame_equal(tasks, whole_tasks, check_categorical=False)
+    assert_frame_equal(daily, whole_daily, check_categorical=False)
+    assert_frame_equal(cube, build_section_cube(whole_tasks), check_categorical=False)
+
+
+def test_metadata_reads_share_the_rate_limit(spreadsheet, monkeypatch):
+    acquired = []
+    bucket = sheets_fetch.read_bucket
+    monkeypatch.setattr(bucket, "acquire", lambda: acquired.append(1))
+
+    list(iter_range(START, END))
+
+    assert len(acquired) == spreadsheet.calls["worksheets"] + spreadsheet.calls["values_batch_get"]
+
+
+def test_migration_with_deletes_keeps_every_month(spreadsheet):
+    legacy = [day["date"] for _, _, days in iter_range(START, END) for day in days]
+    migrate_layout.migrate(delete_day_sheets=True)
+    read_month.clear()
+
+    titles = [ws.title for ws in spreadsheet.worksheets()]
+    assert titles == ["2024-01 Tasks", "2024-01 Days", "2024-02 Tasks", "2024-02 Days"]
+    assert [day["date"] for day in MonthlySheetsReportStore().read_range(START, END)] == legacy
+
+
+def test_sqlite_store_round_trips_a_submission(tmp_path):
+    df = pd.DataFrame([
+        {"Worker Name": "M1 - Kokila", "Arrived": True, "Num Tasks": 2, "Work Period": "7.30-4.30",
+         "Sections": "A1, B2", "Work Type": "Tea_Plucking, Weeding", "Amount (kg)": "25, 0", "Advanced Payment": 500},
+        {"Worker Name": "F2 - Nimali", "Arrived": False, "Num Tasks": 0, "Work Period": "",
+         "Sections": "", "Work Type": "", "Amount (kg)": "", "Advanced Payment": 0},
+    ])
+    payload = submission_payload(df, True, False, 800, True, 300, (7, 17, "Cloudy", 22.5, 85, [21] * 24, [80] * 24))
+    store = SQLiteReportStore(str(tmp_path / "reports.sqlite"))
+
+    assert store.write_day("2024-03-04", payload)[0]
+    assert store.read_range("2024-03-01", "2024-03-31") == [day_from_payload("2024-03-04", payload)]
+
+
+def test_own_writes_only_refetch_the_days_they_touch(spreadsheet):
+    read_from_gsheet(START, END)
+    cold = spreadsheet.calls["values_batch_get"]
+    read_from_gsheet.clear()
+    read_from_gsheet(START, END)
+    assert spreadsheet.calls["values_batch_get"] == cold
+
+    # A submit of a day outside the range keeps the range's cached days current
+    df = pd.DataFrame([{"Worker Name": "M1 - Kokila", "Arrived": True, "Num Tasks": 1, "Work Period": "7.30-1.30",
+                        "Sections": "A1", "Work Type": "Tea_Plucking", "Amount (kg)": "20", "Advanced Payment": 0}])
+    assert write_submission("2024-03-01", submission_payload(df, True, True, 0, False, 0, (7, 17, "Sunny", 25, 80, [], [])))[0]
+    read_from_gsheet(START, END)
+    assert spreadsheet.calls["values_batch_get"] == cold
+
+    # An edit made outside the app re-keys every day once
+    spreadsheet.touch()
+    day_sheet_snapshot.clear()
+    read_from_gsheet.clear()
+    read_from_gsheet(START, END)
+    assert spreadsheet.calls["values_batch_get"] == 2 * cold
+
+
+def test_incomplete_backend_fails_when_created():
+    class WriteOnlyStore(ReportStore):
+        def write_day(self, sheet_name, payload):
+            return True, ""
+
+    with pytest.raises(TypeError, match="read_info, read_range"):
+        WriteOnlyStore()
@@ -0,0 +1,164 @@
+import threading
+from functools import partial
+
+import pandas as pd
+import pytest
+
+import submit_queue
+from fake_gspread import FakeSpreadsheet
+from funcs import submission_payload, write_submission
+from sheet_parser import parse_day_sheet
+from submit_queue import enqueue_submission, flush_pending, flush_submission, list_submissions, open_db
+
+DAY = "2024-03-04"
+WEATHER = (7, 17, "Sunny", 24.5, 80, [20] * 24, [75] * 24)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(submit_queue, "FLUSH_BACKOFF_BASE", 0)
+
+
+def payload(kg, notes=""):
+    df = pd.DataFrame([{
+        "Worker Name": "M1 - Kokila", "Arrived": True, "Num Tasks": 1, "Work Period": "7.30-1.30",
+        "Sections": "A1", "Work Type": "Tea_Plucking", "Amount (kg)": str(kg), "Advanced Payment": 0,
+    }])
+    return submission_payload(df, True, False, 500, True, 200, WEATHER, notes)
+
+
+def statuses():
+    with open_db() as conn:
+        return {row["id"]: row["status"] for row in conn.execute("SELECT id, status FROM submissions")}
+
+
+def sheet_kg(spreadsheet):
+    ws = next(ws for ws in spreadsheet.worksheets() if ws.title == DAY)
+    return parse_day_sheet(DAY, ws.get_all_values()).to_dict()["df"][0]["Amount (kg)"]
+
+
+def test_enqueue_supersedes_older_unsent_entries():
+    first = enqueue_submission(DAY, payload(10))
+    other = enqueue_submission("2024-03-05", payload(11))
+    second = enqueue_submission(DAY, payload(12))
+
+    assert statuses() == {first: "superseded", other: "pending", second: "pending"}
+    assert [e["id"] for e in list_submissions()] == [other, second]
+
+
+def test_flush_writes_the_day_and_marks_it_sent():
+    spreadsheet = FakeSpreadsheet()
+    entry_id = enqueue_submission(DAY, payload(15))
+
+    success, msg = flush_submission(entry_id, partial(write_submission, spreadsheet=spreadsheet))
+
+    assert success, msg
+    assert statuses() == {entry_id: "sent"}
+    assert sheet_kg(spreadsheet) == "15"
+    # Sending again is a no-op
+    assert flush_submission(entry_id, partial(write_submission, spreadsheet=spreadsheet)) == (True, "Nothing to send.")
+    assert spreadsheet.calls["batch_update"] == 1
+
+
+def test_rewrite_shrinks_the_sheet_to_the_new_day():
+    spreadsheet = FakeSpreadsheet()
+    writer = partial(write_submission, spreadsheet=spreadsheet)
+    flush_submission(enqueue_submission(DAY, payload(15, "Line one")), writer)
+    rows = len(spreadsheet.worksheets()[0].values)
+
+    flush_submission(enqueue_submission(DAY, payload(16)), writer)
+
+    ws = spreadsheet.worksheets()[0]
+    assert len(ws.values) == rows
+    assert sheet_kg(spreadsheet) == "16"
+    assert parse_day_sheet(DAY, ws.get_all_values()).to_dict()["additional_notes"] == "No additional notes."
+
+
+def test_failed_flush_is_kept_for_the_next_round():
+    calls = []
+
+    def failing(sheet_name, data):
+        calls.append(sheet_name)
+        return False, "offline"
+
+    entry_id = enqueue_submission(DAY, payload(15))
+    assert flush_submission(entry_id, failing, attempts=3) == (False, "offline")
+    assert len(calls) == 3
+    entry = list_submissions()[0]
+    assert (entry["status"], entry["attempts"], entry["last_error"]) == ("failed", 3, "offline")
+
+    spreadsheet = FakeSpreadsheet()
+    results = flush_pending(partial(write_submission, spreadsheet=spreadsheet))
+    assert results[entry_id][0]
+    assert statuses() == {entry_id: "sent"}
+
+
+def test_entry_is_sent_once_when_flushed_concurrently():
+    release, started = threading.Event(), threading.Event()
+    calls = []
+
+    def slow(sheet_name, data):
+        calls.append(sheet_name)
+        started.set()
+        release.wait(5)
+        return True, "ok"
+
+    entry_id = enqueue_submission(DAY, payload(15))
+    thread = threading.Thread(target=flush_submission, args=(entry_id, slow))
+    thread.start()
+    started.wait(5)
+    # e.g. the Final Submit's one-shot flush while the background flusher is sending
+    assert flush_submission(entry_id, slow) == (True, "⏳ Already being uploaded in the background.")
+    release.set()
+    thread.join(5)
+
+    assert calls == [DAY]
+    assert statuses() == {entry_id: "sent"}
+
+
+def test_older_submission_in_flight_never_overwrites_a_newer_one():
+    spreadsheet = FakeSpreadsheet()
+    writer = partial(write_submission, spreadsheet=spreadsheet)
+    release, started = threading.Event(), threading.Event()
+
+    def slow(sheet_name, data):
+        started.set()
+        release.wait(5)
+        return writer(sheet_name, data)
+
+    older = enqueue_submission(DAY, payload(10))
+    thread = threading.Thread(target=flush_submission, args=(older, slow))
+    thread.start()
+    started.wait(5)
+
+    newer = enqueue_submission(DAY, payload(20))
+    newer_result = []
+    newer_thread = threading.Thread(target=lambda: newer_result.append(flush_submission(newer, writer)))
+    newer_thread.start()
+    release.set()
+    thread.join(5)
+    newer_thread.join(5)
+
+    assert newer_result[0][0]
+    assert sheet_kg(spreadsheet) == "20"
+    assert statuses() == {older: "superseded", newer: "sent"}
+
+
+def test_retry_stops_once_a_newer_submission_exists():
+    calls = []
+    older = enqueue_submission(DAY, payload(10))
+
+    def failing_once(sheet_name, data):
+        calls.append(data["df"][0]["Amount (kg)"])
+        # A newer Final Submit lands between the attempts
+        with open_db() as conn:
+            conn.execute(
+                "INSERT INTO submissions (sheet_name, payload, status, created_at, updated_at) "
+                "VALUES (?, '{}', 'sent', 0, 0)",
+                (DAY,),
+            )
+        return False, "timeout"
+
+    assert flush_submission(older, failing_once, attempts=3) == (True, "Superseded by a newer submission.")
+    assert calls == ["10"]
+    assert statuses()[older] == "superseded"
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from funcs import TASK_ROW_COLUMNS, task_rows_to_worker_data, worker_data_to_task_rows
+
+ROSTER = ["M1 - Kokila", "F2 - Nimali", "M3 - Sunil"]
+
+
+def record(name, arrived=True, period="7.30-4.30", sections="", work_types="", amounts="", advance=0):
+    return {
+        "Worker Name": name, "Arrived": arrived, "Num Tasks": len(work_types.split(", ")) if work_types else 0,
+        "Work Period": period if arrived else "", "Sections": sections, "Work Type": work_types,
+        "Amount (kg)": amounts, "Advanced Payment": advance,
+    }
+
+
+def row(name, arrived=True, period="7.30-4.30", section=None, work_type=None, kg=0, advance=0):
+    return {
+        "Worker Name": name, "Arrived": arrived, "Work Period": period, "Section": section,
+        "Work Type": work_type, "Amount (kg)": kg, "Advanced Payment": advance,
+    }
+
+
+def test_worker_data_round_trips_through_the_grid():
+    data = [
+        record("M1 - Kokila", sections="A1, B2, C3", work_types="Tea_Plucking, Weeding, Fertilizing",
+               amounts="20, 0, 35", advance=500),
+        record("F2 - Nimali", arrived=False),
+        record("M3 - Sunil", sections="A1", work_types="Tea_Plucking", amounts="18"),
+    ]
+    rows = worker_data_to_task_rows(data)
+
+    assert [r["Worker Name"] for r in rows] == ["M1 - Kokila"] * 3 + ["F2 - Nimali", "M3 - Sunil"]
+    assert all(list(r) == TASK_ROW_COLUMNS for r in rows)
+    # The day's advance sits on the worker's first row only
+    assert [r["Advanced Payment"] for r in rows] == [500, 0, 0, 0, 0]
+    assert task_rows_to_worker_data(rows, ROSTER) == data
+
+
+def test_round_trip_through_a_dataframe_with_blank_cells():
+    rows = pd.DataFrame(worker_data_to_task_rows([record("F2 - Nimali", arrived=False)]), columns=TASK_ROW_COLUMNS)
+    rows.loc[0, "Amount (kg)"] = np.nan
+
+    assert task_rows_to_worker_data(rows, ["F2 - Nimali"]) == [record("F2 - Nimali", arrived=False)]
+
+
+def test_advances_are_summed_across_a_workers_rows():
+    rows = [
+        row("M1 - Kokila", section="A1", work_type="Tea_Plucking", kg=20, advance=300),
+        row("M1 - Kokila", section="B2", work_type="Weeding", advance=200),
+        row("M1 - Kokila", section="C3", work_type="Fertilizing", kg=30, advance=None),
+    ]
+    (worker,) = task_rows_to_worker_data(rows, ["M1 - Kokila"])
+    assert worker["Advanced Payment"] == 500
+    assert worker["Num Tasks"] == 3
+
+
+def test_amounts_are_zero_for_work_types_without_kg():
+    rows = [
+        row("M1 - Kokila", section="A1", work_type="Weeding", kg=12),
+        row("M1 - Kokila", section="A1", work_type="Tea_Pruning", kg=np.nan),
+        row("M1 - Kokila", section="A2", work_type="Tea_Plucking", kg=None),
+    ]
+    (worker,) = task_rows_to_worker_data(rows, ["M1 - Kokila"])
+    assert worker["Amount (kg)"] == "0, 0, 0"
+
+
+def test_first_work_period_wins_and_incomplete_tasks_are_dropped():
+    rows = [
+        row("M1 - Kokila", period=None, section="A1", work_type=None),
+        row("M1 - Kokila", period="7.30-10.30", section="A1", work_type="Tea_Plucking", kg=9),
+        row("M1 - Kokila", period="7.30-1.30", section=None, work_type="Weeding"),
+    ]
+    (worker,) = task_rows_to_worker_data(rows, ["M1 - Kokila"])
+    assert worker["Work Period"] == "7.30-10.30"
+    assert (worker["Num Tasks"], worker["Sections"], worker["Work Type"]) == (1, "A1", "Tea_Plucking")
+
+
+def test_absent_workers_keep_no_tasks_or_advance():
+    rows = [row("M1 - Kokila", arrived=False, section="A1", work_type="Tea_Plucking", kg=20, advance=100)]
+    (worker,) = task_rows_to_worker_data(rows, ["M1 - Kokila"])
+    assert worker == record("M1 - Kokila", arrived=False)
+
+
+def test_roster_order_is_kept_and_new_names_are_appended():
+    rows = [
+        row(" Ravi ", section="A1", work_type="Tea_Plucking", kg=10),
+        row("M3 - Sunil", section="B1", work_type="Weeding"),
+        row("", section="C1", work_type="Weeding"),
+        row(None, section="C1", work_type="Weeding"),
+    ]
+    workers = task_rows_to_worker_data(rows, ROSTER)
+
+    assert [w["Worker Name"] for w in workers] == ROSTER + ["Ravi"]
+    # Roster workers without rows are kept as not arrived
+    assert workers[0] == record("M1 - Kokila", arrived=False)
+
+
+def test_more_than_three_tasks_are_kept():
+    rows = [row("M1 - Kokila", section=f"A{i}", work_type="Tea_Plucking", kg=i) for i in range(1, 6)]
+    (worker,) = task_rows_to_worker_data(rows, ["M1 - Kokila"])
+    assert worker["Num Tasks"] == 5
+    assert worker["Amount (kg)"] == "1, 2, 3, 4, 5"
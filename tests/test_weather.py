@@ -0,0 +1,166 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+import requests
+
+import weather
+from local_store import get_weather_days
+
+
+def test_range_is_fetched_in_one_request(meteo):
+    start = date.today() - timedelta(days=10)
+    history = weather.get_weather_history(start, start + timedelta(days=4))
+
+    assert sorted(history) == [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(5)]
+    assert len(history[start.strftime("%Y-%m-%d")]["temperature"]) == 24
+    assert meteo.requests == [("/v1/forecast", meteo.requests[0][1])]
+    assert meteo.requests[0][1]["start_date"] == start.strftime("%Y-%m-%d")
+    assert meteo.requests[0][1]["end_date"] == (start + timedelta(days=4)).strftime("%Y-%m-%d")
+
+
+def test_old_days_come_from_the_archive(meteo):
+    old = date.today() - timedelta(days=weather.FORECAST_HISTORY_DAYS + 5)
+    recent = date.today() - timedelta(days=3)
+    weather.get_weather_history(old, old + timedelta(days=1))
+    weather.get_weather_history(recent, recent)
+
+    assert [path for path, _ in meteo.requests] == ["/v1/archive", "/v1/forecast"]
+
+
+def test_final_days_are_never_fetched_again(meteo, monkeypatch):
+    start = date.today() - timedelta(days=20)
+    end = date.today() - timedelta(days=weather.FINAL_AFTER_DAYS + 1)
+    weather.get_weather_history(start, end)
+    assert len(meteo.requests) == 1
+
+    # Even with an expired refresh interval, final days stay as stored
+    monkeypatch.setattr(weather, "NON_FINAL_TTL", -1)
+    weather.get_weather_history(start, end)
+    assert len(meteo.requests) == 1
+    assert all(final for _, final, _ in get_weather_days([end.strftime("%Y-%m-%d")]).values())
+
+
+def test_recent_days_are_refreshed_after_the_ttl(meteo, monkeypatch):
+    today = date.today()
+    weather.get_weather_history(today, today)
+    weather.get_weather_history(today, today)
+    assert len(meteo.requests) == 1
+
+    monkeypatch.setattr(weather, "NON_FINAL_TTL", -1)
+    weather.get_weather_history(today, today)
+    assert len(meteo.requests) == 2
+
+
+def test_errors_are_not_stored(meteo):
+    day = date.today() - timedelta(days=10)
+    meteo.status = 503
+    with pytest.raises(requests.HTTPError):
+        weather.get_weather_history(day, day)
+    assert get_weather_days([day.strftime("%Y-%m-%d")]) == {}
+
+    meteo.status = 200
+    assert day.strftime("%Y-%m-%d") in weather.get_weather_history(day, day)
+    assert len(meteo.requests) == 2
+
+
+def test_incomplete_days_are_not_stored(meteo, monkeypatch):
+    day = date.today() - timedelta(days=10)
+    full_hourly = meteo.hourly
+
+    def with_gap(start, end):
+        hourly = full_hourly(start, end)
+        hourly["temperature_2m"][5] = None
+        return hourly
+
+    monkeypatch.setattr(meteo, "hourly", with_gap)
+    assert weather.get_weather_history(day, day) == {}
+    assert get_weather_days([day.strftime("%Y-%m-%d")]) == {}
+
+
+def test_summarize_weather():
+    day = {
+        "time": [f"2026-01-05T{h:02d}:00" for h in range(24)],
+        "temperature": [float(h) for h in range(24)],
+        "code": [61] * 12 + [0] * 12,
+        "humidity": [50] * 24,
+    }
+    start, end, word, avg_temp, avg_humidity, temps, humidity = weather.summarize_weather(day, 6, 12)
+    assert (start, end, word, avg_temp, avg_humidity) == (6, 12, "Slight rain", 8.5, 50.0)
+    assert len(temps) == len(humidity) == 24
+
+
+@pytest.fixture
+def prefetch(meteo):
+    import funcs
+
+    funcs._weather_futures.clear()
+    yield funcs
+    funcs._weather_futures.clear()
+
+
+def test_prefetch_settles_on_success(prefetch):
+    day = date.today() - timedelta(days=10)
+    future = prefetch.prefetch_weather(day, 6, 18)
+    assert future.result()[3] == 20.0
+    assert not prefetch.weather_pending(day, 6, 18)
+    assert prefetch.prefetch_weather(day, 6, 18) is future
+
+
+def test_prefetch_backs_off_after_a_failure(prefetch, meteo):
+    day = date.today() - timedelta(days=10)
+    meteo.status = 503
+    future = prefetch.prefetch_weather(day, 6, 18)
+    assert future.result()[3] is None
+    sent = len(meteo.requests)
+
+    # Within the backoff the failed lookup is returned as is, but still counts as pending
+    for _ in range(5):
+        assert prefetch.prefetch_weather(day, 6, 18) is future
+    assert len(meteo.requests) == sent
+    assert prefetch.weather_pending(day, 6, 18)
+
+
+def test_prefetch_stops_retrying_after_the_cap(prefetch, meteo, monkeypatch):
+    day = date.today() - timedelta(days=10)
+    monkeypatch.setattr(prefetch, "WEATHER_RETRY_SECONDS", 0)
+    meteo.status = 503
+    attempts = 0
+    while True:
+        future = prefetch.prefetch_weather(day, 6, 18)
+        future.result()
+        # Let the done callback record the finish time before the next call
+        time.sleep(0.01)
+        if not prefetch.weather_pending(day, 6, 18):
+            break
+        attempts += 1
+        assert attempts < 10
+    sent = len(meteo.requests)
+    assert prefetch.prefetch_weather(day, 6, 18).result()[3] is None
+    assert len(meteo.requests) == sent
+    assert prefetch._weather_futures()[(day.strftime("%Y-%m-%d"), 6, 18)]["attempt"] == prefetch.WEATHER_MAX_ATTEMPTS
+
+
+def test_prefetch_of_a_recent_day_expires_with_the_store_ttl(prefetch, meteo, monkeypatch):
+    today, old = date.today(), date.today() - timedelta(days=10)
+    first, first_old = prefetch.prefetch_weather(today, 6, 18), prefetch.prefetch_weather(old, 6, 18)
+    first.result(), first_old.result()
+    time.sleep(0.01)
+    assert prefetch.prefetch_weather(today, 6, 18) is first
+
+    monkeypatch.setattr(weather, "NON_FINAL_TTL", 0)
+    again = prefetch.prefetch_weather(today, 6, 18)
+    assert again is not first
+    assert again.result()[3] == 20.0
+    # Final days are never looked up again
+    assert prefetch.prefetch_weather(old, 6, 18) is first_old
+
+
+def test_prefetch_keeps_a_bounded_number_of_lookups(prefetch, monkeypatch):
+    monkeypatch.setattr(prefetch, "WEATHER_MAX_ENTRIES", 3)
+    days = [date.today() - timedelta(days=30 + i) for i in range(5)]
+    for day in days:
+        prefetch.prefetch_weather(day, 6, 18).result()
+        time.sleep(0.01)
+
+    assert [key[0] for key in prefetch._weather_futures()] == [d.strftime("%Y-%m-%d") for d in days[-3:]]
@@ -0,0 +1,154 @@
+import os
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import requests
+
+import perf
+from local_store import get_weather_days, put_weather_days
+
+# Open-Meteo endpoints; override them to point the app (or a test) at a local stand-in server
+FORECAST_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+ARCHIVE_URL = os.environ.get("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+LATITUDE, LONGITUDE = 7.095024817437363, 80.36483435225661
+TIMEZONE = "Asia/Colombo"
+HOURLY_FIELDS = ["temperature_2m", "weather_code", "relative_humidity_2m"]
+
+# Days older than this are final and never fetched again
+FINAL_AFTER_DAYS = 2
+# Days older than this are past the forecast endpoint's history and come from the archive
+FORECAST_HISTORY_DAYS = 90
+# Seconds before a non-final (recent or future) day is refreshed
+NON_FINAL_TTL = 3600
+REQUEST_TIMEOUT = 10
+
+weather_map = {
+    0: "Sunny", 1: "Mainly clear", 2: "Partly cloudy", 3: "Cloudy",
+    45: "Foggy", 48: "Depositing rime fog", 51: "Light drizzle",
+    53: "Drizzle", 55: "Dense drizzle", 56: "Freezing drizzle",
+    57: "Dense freezing drizzle", 61: "Slight rain", 63: "Rain",
+    65: "Heavy rain", 66: "Freezing rain", 67: "Heavy freezing rain",
+    71: "Slight snow fall", 73: "Snow fall", 75: "Heavy snow fall",
+    77: "Snow grains", 80: "Slight rain showers", 81: "Rain showers",
+    82: "Violent rain showers", 85: "Slight snow showers",
+    86: "Heavy snow showers", 95: "Thunderstorm",
+    96: "Thunderstorm with hail", 99: "Thunderstorm with heavy hail"
+}
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _date_range(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def fetch_weather_range(start_date, end_date, url=None):
+    """
+    Fetches hourly weather for a whole date range in one request.
+    Returns {"YYYY-MM-DD": {"time": [...], "temperature": [...], "code": [...], "humidity": [...]}}.
+    Raises on HTTP or payload errors.
+    """
+    params = {
+        "latitude": LATITUDE,
+        "longitude": LONGITUDE,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "hourly": ",".join(HOURLY_FIELDS),
+        "timezone": TIMEZONE,
+    }
+    url = url or FORECAST_URL
+    with perf.span("open_meteo archive" if url == ARCHIVE_URL else "open_meteo forecast") as call:
+        resp = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        call["bytes"] = len(resp.content)
+        resp.raise_for_status()
+    hourly = resp.json()["hourly"]
+
+    days = {}
+    for i, t in enumerate(hourly["time"]):
+        day = days.setdefault(t[:10], {"time": [], "temperature": [], "code": [], "humidity": []})
+        day["time"].append(t)
+        day["temperature"].append(hourly["temperature_2m"][i])
+        day["code"].append(hourly["weather_code"][i])
+        day["humidity"].append(hourly["relative_humidity_2m"][i])
+    return days
+
+
+@perf.timed("weather.get_weather_history")
+def get_weather_history(start_date, end_date):
+    """
+    Hourly weather for every day in the range, served from the local weather store.
+    Only days that are missing, or not final and older than NON_FINAL_TTL, are fetched,
+    with at most one request per endpoint. Failed fetches raise and are not stored.
+    """
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    today = date.today()
+    dates = _date_range(start_date, end_date)
+    stored = get_weather_days([d.strftime("%Y-%m-%d") for d in dates])
+
+    now = time.time()
+    to_fetch = []
+    for d in dates:
+        entry = stored.get(d.strftime("%Y-%m-%d"))
+        if entry is None:
+            to_fetch.append(d)
+        else:
+            hourly, final, fetched_at = entry
+            if not final and now - fetched_at > NON_FINAL_TTL:
+                to_fetch.append(d)
+
+    if to_fetch:
+        archive_cutoff = today - timedelta(days=FORECAST_HISTORY_DAYS)
+        archived = [d for d in to_fetch if d < archive_cutoff]
+        recent = [d for d in to_fetch if d >= archive_cutoff]
+        fetched = {}
+        if archived:
+            fetched.update(fetch_weather_range(archived[0], archived[-1], url=ARCHIVE_URL))
+        if recent:
+            fetched.update(fetch_weather_range(recent[0], recent[-1]))
+
+        final_before = today - timedelta(days=FINAL_AFTER_DAYS)
+        entries = [
+            (date_str, hourly, _as_date(date_str) <= final_before)
+            for date_str, hourly in fetched.items()
+            if hourly["temperature"] and None not in hourly["temperature"]
+        ]
+        put_weather_days(entries)
+        for date_str, hourly, final in entries:
+            stored[date_str] = (hourly, final, now)
+
+    return {date_str: entry[0] for date_str, entry in sorted(stored.items())}
+
+
+def summarize_weather(hourly, start_hour, end_hour):
+    """
+    Reduces one day of hourly weather to
+    (start_hour, end_hour, weather word, avg temp, avg humidity, 24h temps, 24h humidity).
+    """
+    # 24 values for full day
+    full_day_temps = hourly["temperature"][:24]
+    full_day_humidity = hourly["humidity"][:24]
+
+    # Filter for given time range
+    hour_indices = [
+        i for i, t in enumerate(hourly["time"])
+        if start_hour <= int(t.split("T")[1][:2]) < end_hour
+    ]
+    if not hour_indices:
+        return None, None, "Weather data unavailable for period", None, None, [], []
+
+    period_temps = [hourly["temperature"][i] for i in hour_indices]
+    period_codes = [hourly["code"][i] for i in hour_indices]
+    period_humidity = [hourly["humidity"][i] for i in hour_indices]
+    avg_temp = sum(period_temps) / len(period_temps)
+    avg_humidity = sum(period_humidity) / len(period_humidity)
+    code = Counter(period_codes).most_common(1)[0][0]
+
+    weather_word = weather_map.get(code, "Unknown")
+    return start_hour, end_hour, weather_word, round(avg_temp, 1), round(avg_humidity, 1), full_day_temps, full_day_humidity